@@ -0,0 +1,81 @@
+"""add_compressed_dense_embeddings_indexes
+
+Revision ID: 145bc1a7227f
+Revises: 89370db95812
+Create Date: 2026-10-19 16:21:08.274193
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "145bc1a7227f"
+down_revision: str | None = "89370db95812"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "embeddings_collections", sa.Column("dense_index", sa.String(), nullable=False, server_default="vector")
+    )
+    op.add_column("embeddings", sa.Column("dense_index", sa.String(), nullable=False, server_default="vector"))
+
+    # every chunk is only part of the dense index of its collection, the fp32 index is replaced by a partial one
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "hnsw_cosine_dense_vector_idx",
+            "embeddings",
+            [sa.text("embedding vector_cosine_ops")],
+            postgresql_using="hnsw",
+            postgresql_with={"m": 24, "ef_construction": 128},
+            postgresql_where=sa.text("dense_index = 'vector'"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index("hnsw_cosine_dense_idx", table_name="embeddings", postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            "hnsw_cosine_dense_halfvec_idx",
+            "embeddings",
+            [sa.text("(embedding::halfvec(1024)) halfvec_cosine_ops")],
+            postgresql_using="hnsw",
+            postgresql_with={"m": 24, "ef_construction": 128},
+            postgresql_where=sa.text("dense_index = 'halfvec'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "hnsw_hamming_dense_binary_idx",
+            "embeddings",
+            [sa.text("(binary_quantize(embedding)::bit(1024)) bit_hamming_ops")],
+            postgresql_using="hnsw",
+            postgresql_with={"m": 24, "ef_construction": 128},
+            postgresql_where=sa.text("dense_index = 'binary'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "hnsw_cosine_dense_idx",
+            "embeddings",
+            [sa.text("embedding vector_cosine_ops")],
+            postgresql_using="hnsw",
+            postgresql_with={"m": 24, "ef_construction": 128},
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "hnsw_hamming_dense_binary_idx", table_name="embeddings", postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            "hnsw_cosine_dense_halfvec_idx", table_name="embeddings", postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            "hnsw_cosine_dense_vector_idx", table_name="embeddings", postgresql_concurrently=True, if_exists=True
+        )
+
+    op.drop_column("embeddings", "dense_index")
+    op.drop_column("embeddings_collections", "dense_index")
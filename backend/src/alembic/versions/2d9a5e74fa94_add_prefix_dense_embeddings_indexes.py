@@ -0,0 +1,48 @@
+"""add_prefix_dense_embeddings_indexes
+
+Revision ID: 2d9a5e74fa94
+Revises: 145bc1a7227f
+Create Date: 2026-10-19 17:02:45.918306
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2d9a5e74fa94"
+down_revision: str | None = "145bc1a7227f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("embeddings_collections", sa.Column("rescore_factor", sa.Integer(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        for dimensions in (256, 512):
+            op.create_index(
+                f"hnsw_cosine_dense_prefix_{dimensions}_idx",
+                "embeddings",
+                [sa.text(f"(subvector(embedding, 1, {dimensions})::vector({dimensions})) vector_cosine_ops")],
+                postgresql_using="hnsw",
+                postgresql_with={"m": 24, "ef_construction": 128},
+                postgresql_where=sa.text(f"dense_index = 'prefix-{dimensions}'"),
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for dimensions in (512, 256):
+            op.drop_index(
+                f"hnsw_cosine_dense_prefix_{dimensions}_idx",
+                table_name="embeddings",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.drop_column("embeddings_collections", "rescore_factor")
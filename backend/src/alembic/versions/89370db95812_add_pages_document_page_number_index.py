@@ -0,0 +1,38 @@
+"""add_pages_document_page_number_index
+
+Revision ID: 89370db95812
+Revises: b623ca069bf5
+Create Date: 2026-10-19 14:03:27.519834
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "89370db95812"
+down_revision: str | None = "b623ca069bf5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # pages are inserted while documents are read, so the index is built concurrently
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_pages_document_id_page_number",
+            "pages",
+            ["document_id", "page_number"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_pages_document_id_page_number",
+            table_name="pages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
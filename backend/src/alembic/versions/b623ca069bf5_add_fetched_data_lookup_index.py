@@ -0,0 +1,41 @@
+"""add_fetched_data_lookup_index
+
+Revision ID: b623ca069bf5
+Revises: 556e6bab86d4
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b623ca069bf5"
+down_revision: str | None = "556e6bab86d4"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # fetched_data stores PDFs inline and is written by the data fetcher while being read by the
+    # transform tasks, so the index is built concurrently to not block either of them
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_fetched_data_fetcher_entity_created_at",
+            "fetched_data",
+            ["data_fetcher", "entity", sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_fetched_data_fetcher_entity_created_at",
+            table_name="fetched_data",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
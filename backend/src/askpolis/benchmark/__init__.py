@@ -0,0 +1,22 @@
+from .corpus import (
+    create_document,
+    generate_dense_vector,
+    generate_lexical_weights,
+    generate_markdown_pages,
+    generate_paragraph,
+    load_corpus,
+)
+from .harness import BenchmarkResults, StageResult, get_environment_metadata, stage_key
+
+__all__ = [
+    "BenchmarkResults",
+    "StageResult",
+    "create_document",
+    "generate_dense_vector",
+    "generate_lexical_weights",
+    "generate_markdown_pages",
+    "generate_paragraph",
+    "get_environment_metadata",
+    "load_corpus",
+    "stage_key",
+]
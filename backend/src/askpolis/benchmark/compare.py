@@ -0,0 +1,42 @@
+"""Compare two benchmark result files, e.g. of the main branch and a feature branch.
+
+Usage: python -m askpolis.benchmark.compare baseline.json current.json
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from .harness import stage_key
+
+
+def load_stages(path: Path) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    content = json.loads(path.read_text())
+    return content, {stage_key(stage): stage for stage in content["stages"]}
+
+
+def compare(baseline_path: Path, current_path: Path) -> list[str]:
+    baseline, baseline_stages = load_stages(baseline_path)
+    current, current_stages = load_stages(current_path)
+    lines = [
+        f"baseline {baseline.get('commit')} (corpus {baseline.get('corpus_size')}) vs "
+        f"current {current.get('commit')} (corpus {current.get('corpus_size')})",
+        f"{'stage':<80} {'p50 ms':>12} {'p95 ms':>12} {'throughput/s':>14} {'p95 change':>11}",
+    ]
+    for key, stage in current_stages.items():
+        before = baseline_stages.get(key)
+        change = f"{(stage['p95_ms'] / before['p95_ms'] - 1) * 100:+.1f}%" if before and before["p95_ms"] else "new"
+        metrics = " ".join(f"{name}={value:.4g}" for name, value in sorted(stage.get("metrics", {}).items()))
+        lines.append(
+            f"{key:<80} {stage['p50_ms']:>12.3f} {stage['p95_ms']:>12.3f} "
+            f"{stage['throughput_per_s']:>14.1f} {change:>11} {metrics}".rstrip()
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    print("\n".join(compare(Path(sys.argv[1]), Path(sys.argv[2]))))
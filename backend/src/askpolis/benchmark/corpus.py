@@ -0,0 +1,136 @@
+import datetime
+from typing import Any
+
+import numpy as np
+import uuid_utils.compat as uuid
+from langchain_core.documents import Document as LangchainDocument
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from askpolis.core import Document, DocumentType, Page
+from askpolis.search import Embeddings, EmbeddingsCollection, EmbeddingsCollectionRepository
+from askpolis.search.models import DENSE_INDEX_VECTOR, convert_to_sparse_vector
+
+WORDS = [
+    "Bildung",
+    "Klimaschutz",
+    "Rente",
+    "Steuern",
+    "Digitalisierung",
+    "Gesundheit",
+    "Pflege",
+    "Wohnen",
+    "Mobilität",
+    "Energie",
+    "Landwirtschaft",
+    "Europa",
+    "Sicherheit",
+    "Migration",
+    "Arbeit",
+    "Familie",
+    "Kinder",
+    "Wirtschaft",
+    "Innovation",
+    "Forschung",
+    "Verwaltung",
+    "Kommunen",
+    "Bahn",
+    "Wasserstoff",
+    "Mindestlohn",
+    "Bürgergeld",
+    "Schulden",
+    "Investitionen",
+    "Infrastruktur",
+    "Demokratie",
+    "Bundeswehr",
+    "Gerechtigkeit",
+]
+
+DENSE_DIMENSIONS = 1024
+SPARSE_TERMS_PER_CHUNK = 60
+# the vocabulary of BGE-M3 has 250k tokens, but chunks of election programs share a much smaller part of it
+SPARSE_VOCABULARY_SIZE = 30_000
+LOAD_BATCH_SIZE = 2_000
+
+
+def generate_paragraph(rng: np.random.Generator, sentences: int = 5) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS, size=int(rng.integers(8, 20)))).capitalize() + "." for _ in range(sentences)
+    )
+
+
+def generate_markdown_pages(rng: np.random.Generator, pages: int) -> list[LangchainDocument]:
+    """Pages shaped like parsed election programs, with headers and paragraphs."""
+    documents = []
+    for page_number in range(1, pages + 1):
+        sections = [f"## {' '.join(rng.choice(WORDS, size=3))}\n\n{generate_paragraph(rng)}" for _ in range(3)]
+        content = f"# Kapitel {page_number}\n\n" + "\n\n".join(sections)
+        documents.append(LangchainDocument(page_content=content, metadata={"page": page_number}))
+    return documents
+
+
+def generate_lexical_weights(rng: np.random.Generator, terms: int = SPARSE_TERMS_PER_CHUNK) -> dict[str, float]:
+    token_ids = rng.choice(SPARSE_VOCABULARY_SIZE, size=terms, replace=False)
+    return {str(token_id): float(weight) for token_id, weight in zip(token_ids, rng.random(terms), strict=True)}
+
+
+def generate_dense_vector(rng: np.random.Generator) -> list[float]:
+    vector = rng.standard_normal(DENSE_DIMENSIONS).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()  # type: ignore[no-any-return]
+
+
+def create_document(db: Session, pages: int = 1) -> tuple[Document, list[Page]]:
+    document = Document(name=f"Benchmark {uuid.uuid7()}", document_type=DocumentType.ELECTION_PROGRAM)
+    db.add(document)
+    db.flush()
+    document_pages = [
+        Page(
+            document_id=document.id,
+            page_number=page_number,
+            content="content",
+            raw_content="content",
+            page_metadata={"page": page_number},
+        )
+        for page_number in range(1, pages + 1)
+    ]
+    db.add_all(document_pages)
+    db.commit()
+    return document, document_pages
+
+
+def load_corpus(
+    db: Session, rng: np.random.Generator, chunks: int, dense_index: str = DENSE_INDEX_VECTOR
+) -> EmbeddingsCollection:
+    """Load a collection of random but normalised embeddings with bulk inserts, bypassing the ORM unit of work.
+
+    FakeModel returns the same vector for every text, which would make the HNSW index degenerate, so the corpus uses
+    random vectors instead.
+    """
+    collection = EmbeddingsCollection(
+        name=f"benchmark-{chunks}", version="v0", description="Synthetic corpus", dense_index=dense_index
+    )
+    EmbeddingsCollectionRepository(db).save(collection)
+    document, pages = create_document(db, pages=100)
+
+    created_at = datetime.datetime.now(datetime.UTC)
+    for batch_start in range(0, chunks, LOAD_BATCH_SIZE):
+        rows: list[dict[str, Any]] = []
+        for chunk_id in range(batch_start, min(batch_start + LOAD_BATCH_SIZE, chunks)):
+            rows.append(
+                {
+                    "id": uuid.uuid7(),
+                    "collection_id": collection.id,
+                    "document_id": document.id,
+                    "page_id": pages[chunk_id % len(pages)].id,
+                    "chunk": generate_paragraph(rng, sentences=1),
+                    "chunk_id": chunk_id,
+                    "embedding": generate_dense_vector(rng),
+                    "sparse_embedding": convert_to_sparse_vector(generate_lexical_weights(rng)),
+                    "chunk_metadata": {"page": chunk_id % len(pages) + 1},
+                    "dense_index": dense_index,
+                    "created_at": created_at,
+                }
+            )
+        db.execute(insert(Embeddings), rows)
+        db.commit()
+    return collection
@@ -0,0 +1,94 @@
+import datetime
+import json
+import platform
+import subprocess
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+
+class StageResult(NamedTuple):
+    stage: str
+    params: dict[str, Any]
+    rounds: int
+    items_per_round: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    throughput_per_s: float
+    metrics: dict[str, float]
+
+
+class BenchmarkResults:
+    """Latencies of the benchmarked stages, written to a JSON file that can be compared across commits."""
+
+    def __init__(self, metadata: dict[str, Any]) -> None:
+        self.metadata = metadata
+        self.stages: list[StageResult] = []
+
+    def measure(
+        self,
+        stage: str,
+        run: Callable[[], Any],
+        items_per_round: int = 1,
+        rounds: int = 20,
+        warmup: int = 2,
+        params: dict[str, Any] | None = None,
+        metrics: dict[str, float] | None = None,
+    ) -> StageResult:
+        """Run `run` a number of times and record the latency percentiles and the items processed per second.
+
+        `metrics` are recorded next to the latencies, e.g. the size of an index or the recall of a search.
+        """
+        for _ in range(warmup):
+            run()
+
+        latencies = []
+        for _ in range(rounds):
+            started_at = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - started_at)
+
+        latencies_ms = np.array(latencies) * 1000
+        total_seconds = float(np.sum(latencies))
+        result = StageResult(
+            stage=stage,
+            params=params or {},
+            rounds=rounds,
+            items_per_round=items_per_round,
+            p50_ms=float(np.percentile(latencies_ms, 50)),
+            p95_ms=float(np.percentile(latencies_ms, 95)),
+            p99_ms=float(np.percentile(latencies_ms, 99)),
+            mean_ms=float(np.mean(latencies_ms)),
+            throughput_per_s=rounds * items_per_round / total_seconds if total_seconds > 0 else 0.0,
+            metrics=metrics or {},
+        )
+        self.stages.append(result)
+        return result
+
+    def write(self, path: Path) -> None:
+        content = {
+            **self.metadata,
+            "created_at": datetime.datetime.now(datetime.UTC).isoformat(),
+            "stages": [result._asdict() for result in self.stages],
+        }
+        path.write_text(json.dumps(content, indent=2) + "\n")
+
+
+def get_environment_metadata() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "machine": platform.machine()}
+
+
+def stage_key(stage: dict[str, Any]) -> str:
+    params = ",".join(f"{key}={value}" for key, value in sorted(stage["params"].items()))
+    return f"{stage['stage']}[{params}]"
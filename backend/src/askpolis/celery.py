@@ -1,7 +1,12 @@
+from typing import Any
+
 import celery_typed_tasks
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 
+from askpolis.db import ROLE_WORKER, reset_engine
 from askpolis.logging import get_logger
+from askpolis.metrics import register_backlog_gauges
 
 logger = get_logger(__name__)
 logger.info("Starting Celery worker...")
@@ -10,7 +15,10 @@ app = Celery("askpolis", task_cls=celery_typed_tasks.TypedTask)
 app.conf.update(worker_hijack_root_logger=False)
 
 app.conf.beat_schedule = {
-    "fetch-data/bundestag-from-abgeordnetenwatch": {"task": "fetch_bundestag_from_abgeordnetenwatch", "schedule": 3600},
+    "fetch-data/parliaments-from-abgeordnetenwatch": {
+        "task": "fetch_parliaments_from_abgeordnetenwatch",
+        "schedule": 3600,
+    },
     "cleanup/outdated-data-of-data-fetchers": {"task": "cleanup_outdated_data", "schedule": 1800},
     "transform-data/core-data-models": {"task": "transform_fetched_data_to_core_models", "schedule": 1800},
     "transform-data/read-parse-election-programs": {
@@ -20,4 +28,13 @@ app.conf.beat_schedule = {
     "qa/answer_stale_questions_task": {"task": "answer_stale_questions_task", "schedule": 1800},
 }
 
+
+@worker_init.connect
+@worker_process_init.connect
+def init_worker_process(**_: Any) -> None:
+    # prefork children must not share the pooled connections of the parent process
+    reset_engine(ROLE_WORKER)
+    register_backlog_gauges()
+
+
 app.autodiscover_tasks(packages=["askpolis.core", "askpolis.data_fetcher", "askpolis.qa", "askpolis.search"])
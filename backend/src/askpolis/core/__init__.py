@@ -1,11 +1,15 @@
 from askpolis.db import get_db
 
 from .dependencies import (
+    get_async_document_repository,
+    get_async_party_repository,
     get_document_repository,
     get_parliament_repository,
 )
 from .markdown_splitter import MarkdownSplitter
 from .models import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
     Base,
     Document,
     DocumentResponse,
@@ -13,21 +17,29 @@ from .models import (
     ElectionProgram,
     Page,
     PageResponse,
+    PaginatedResponse,
     Parliament,
     ParliamentPeriod,
     Party,
+    PartyResponse,
 )
 from .pdf_reader import PdfDocument, PdfPage, PdfReader
-from .repositories import DocumentRepository, ParliamentRepository
+from .repositories import AsyncDocumentRepository, AsyncPartyRepository, DocumentRepository, ParliamentRepository
 from .routes import router
 
 __all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "AsyncDocumentRepository",
+    "AsyncPartyRepository",
     "Base",
     "Document",
     "DocumentResponse",
     "DocumentRepository",
     "DocumentType",
     "ElectionProgram",
+    "get_async_document_repository",
+    "get_async_party_repository",
     "get_db",
     "get_document_repository",
     "get_parliament_repository",
@@ -35,10 +47,12 @@ __all__ = [
     "router",
     "Page",
     "PageResponse",
+    "PaginatedResponse",
     "Parliament",
     "ParliamentRepository",
     "ParliamentPeriod",
     "Party",
+    "PartyResponse",
     "PdfDocument",
     "PdfReader",
     "PdfPage",
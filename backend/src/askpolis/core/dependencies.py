@@ -1,16 +1,25 @@
 from typing import Annotated
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from askpolis.db import get_db
+from askpolis.db import get_async_read_db, get_db
 
-from .repositories import DocumentRepository, ParliamentRepository
+from .repositories import AsyncDocumentRepository, AsyncPartyRepository, DocumentRepository, ParliamentRepository
 
 
 def get_document_repository(db: Annotated[Session, Depends(get_db)]) -> DocumentRepository:
     return DocumentRepository(db)
 
 
+def get_async_document_repository(db: Annotated[AsyncSession, Depends(get_async_read_db)]) -> AsyncDocumentRepository:
+    return AsyncDocumentRepository(db)
+
+
 def get_parliament_repository(db: Annotated[Session, Depends(get_db)]) -> ParliamentRepository:
     return ParliamentRepository(db)
+
+
+def get_async_party_repository(db: Annotated[AsyncSession, Depends(get_async_read_db)]) -> AsyncPartyRepository:
+    return AsyncPartyRepository(db)
@@ -1,6 +1,6 @@
 import datetime
 import enum
-from typing import Any
+from typing import Any, Generic, TypeVar
 
 import uuid_utils.compat as uuid
 from langchain_core.documents import Document as LangchainDocument
@@ -23,6 +23,11 @@ from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 
 Base = declarative_base()
 
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 
 class Page(Base):
     __tablename__ = "pages"
@@ -55,6 +60,8 @@ class Page(Base):
 
     document: Mapped["Document"] = relationship("Document", back_populates="pages")
 
+    __table_args__ = (Index("idx_pages_document_id_page_number", "document_id", "page_number"),)
+
     def to_langchain_document(self) -> LangchainDocument:
         return LangchainDocument(page_content=self.content, metadata=self.page_metadata)
 
@@ -137,8 +144,8 @@ class Party(Base):
         self.updated_at = datetime.datetime.now(datetime.UTC)
 
     id: Mapped[uuid.UUID] = mapped_column(DB_UUID(as_uuid=True), primary_key=True)
-    name = Column(String, nullable=False)
-    short_name = Column(String, nullable=False)
+    name: str = Column(String, nullable=False)
+    short_name: str = Column(String, nullable=False)
     updated_at = Column(DateTime, nullable=False, default=lambda: datetime.datetime.now(datetime.UTC))
 
 
@@ -233,3 +240,15 @@ class PageResponse(BaseModel):
     page_number: int
     content: str
     page_metadata: dict[str, Any] | None = None
+
+
+class PartyResponse(BaseModel):
+    id: uuid.UUID
+    name: str
+    short_name: str
+
+
+class PaginatedResponse(BaseModel, Generic[T]):
+    items: list[T]
+    # pass as `after` to get the next page, None on the last page
+    next_cursor: str | None = None
@@ -1,8 +1,10 @@
 import uuid
+from collections.abc import AsyncIterator
 from datetime import date
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
 
 from .models import Document, ElectionProgram, Page, Parliament, ParliamentPeriod, Party
 
@@ -36,16 +38,49 @@ class DocumentRepository:
         self.db.commit()
 
     def get_pages(self, document_id: uuid.UUID) -> list[Page]:
-        document = self.get(document_id)
-        if document is None:
-            return []
-        return list(document.pages)
+        return list(
+            self.db.scalars(select(Page).where(Page.document_id == document_id).order_by(Page.page_number)).all()
+        )
+
+
+class AsyncDocumentRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, document_id: uuid.UUID) -> Document | None:
+        return await self.db.get(Document, document_id)
 
-    def get_page(self, document_id: uuid.UUID, page_id: uuid.UUID) -> Page | None:
-        document = self.get(document_id)
-        if document is None:
-            return None
-        return next((p for p in document.pages if p.id == page_id), None)
+    async def get_page(self, document_id: uuid.UUID, page_id: uuid.UUID) -> Page | None:
+        page: Page | None = await self.db.scalar(
+            select(Page).where(Page.id == page_id, Page.document_id == document_id)
+        )
+        return page
+
+    async def get_pages_by_ids(self, page_ids: list[uuid.UUID]) -> list[Page]:
+        if len(page_ids) == 0:
+            return []
+        return list((await self.db.scalars(select(Page).where(Page.id.in_(page_ids)))).all())
+
+    async def get_all_after(self, after: uuid.UUID | None, limit: int) -> list[Document]:
+        """Get documents in creation order, continuing after the given id, which is a time-ordered UUIDv7."""
+        query = select(Document).order_by(Document.id).limit(limit)
+        if after is not None:
+            query = query.where(Document.id > after)
+        return list((await self.db.scalars(query)).all())
+
+    async def get_pages_after(self, document_id: uuid.UUID, after: int | None, limit: int) -> list[Page]:
+        query = select(Page).where(Page.document_id == document_id).order_by(Page.page_number).limit(limit)
+        if after is not None:
+            query = query.where(Page.page_number > after)
+        return list((await self.db.scalars(query)).all())
+
+    async def stream_pages(self, document_id: uuid.UUID | None = None, batch_size: int = 500) -> AsyncIterator[Page]:
+        """Iterate over all pages with a server-side cursor, fetching `batch_size` rows at a time."""
+        query = select(Page).order_by(Page.id).execution_options(yield_per=batch_size)
+        if document_id is not None:
+            query = query.where(Page.document_id == document_id)
+        async for page in await self.db.stream_scalars(query):
+            yield page
 
 
 class ParliamentRepository:
@@ -78,6 +113,17 @@ class PartyRepository:
         self.db.commit()
 
 
+class AsyncPartyRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_after(self, after: uuid.UUID | None, limit: int) -> list[Party]:
+        query = select(Party).order_by(Party.id).limit(limit)
+        if after is not None:
+            query = query.where(Party.id > after)
+        return list((await self.db.scalars(query)).all())
+
+
 class ParliamentPeriodRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -108,9 +154,7 @@ class ElectionProgramRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get(
-        self, party: Party, parliament_period: ParliamentPeriod, label: str = "default"
-    ) -> ElectionProgram | None:
+    def get(self, party: Party, parliament_period: ParliamentPeriod, label: str = "default") -> ElectionProgram | None:
         return (
             self.db.query(ElectionProgram)
             .filter(
@@ -126,6 +170,12 @@ class ElectionProgramRepository:
         self.db.commit()
 
     def get_all_without_referenced_document(self) -> list[ElectionProgram]:
+        return self._query_without_referenced_document().all()
+
+    def count_without_referenced_document(self) -> int:
+        return self._query_without_referenced_document().count()
+
+    def _query_without_referenced_document(self) -> Query[ElectionProgram]:
         return (
             self.db.query(ElectionProgram)
             .outerjoin(
@@ -136,5 +186,4 @@ class ElectionProgramRepository:
                 ),
             )
             .filter(Document.id == None)  # noqa: E711
-            .all()
         )
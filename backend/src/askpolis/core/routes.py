@@ -1,22 +1,39 @@
+from collections.abc import AsyncIterator
 from typing import Annotated
 
 import uuid_utils.compat as uuid
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from askpolis.http_caching import (
+    IMMUTABLE_CACHE_CONTROL,
+    ResponseCache,
+    cached_json_response,
+    compute_etag,
+    get_response_cache,
+)
 
 from .dependencies import (
-    get_document_repository,
+    get_async_document_repository,
+    get_async_party_repository,
     get_parliament_repository,
 )
 from .models import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
     CreateParliamentRequest,
     DocumentResponse,
+    Page,
     PageResponse,
+    PaginatedResponse,
     Parliament,
     ParliamentResponse,
+    PartyResponse,
 )
-from .repositories import DocumentRepository, ParliamentRepository
+from .repositories import AsyncDocumentRepository, AsyncPartyRepository, ParliamentRepository
+
+MAX_PAGES_PER_REQUEST = 100
 
 router = APIRouter()
 
@@ -45,19 +62,72 @@ def create_parliament(
     )
 
 
+@router.get("/parties", response_model=PaginatedResponse[PartyResponse], tags=["parties"])
+async def get_parties(
+    party_repository: Annotated[AsyncPartyRepository, Depends(get_async_party_repository)],
+    after: Annotated[uuid.UUID | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> PaginatedResponse[PartyResponse]:
+    parties = await party_repository.get_all_after(after, limit + 1)
+    return PaginatedResponse(
+        items=[PartyResponse(id=p.id, name=p.name, short_name=p.short_name) for p in parties[:limit]],
+        next_cursor=str(parties[limit - 1].id) if len(parties) > limit else None,
+    )
+
+
+@router.get("/documents", response_model=PaginatedResponse[DocumentResponse], tags=["documents"])
+async def get_documents(
+    document_repository: Annotated[AsyncDocumentRepository, Depends(get_async_document_repository)],
+    after: Annotated[uuid.UUID | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> PaginatedResponse[DocumentResponse]:
+    documents = await document_repository.get_all_after(after, limit + 1)
+    return PaginatedResponse(
+        items=[DocumentResponse(id=d.id, name=d.name, document_type=d.document_type) for d in documents[:limit]],
+        next_cursor=str(documents[limit - 1].id) if len(documents) > limit else None,
+    )
+
+
 @router.get(
     "/documents/{document_id}",
     response_model=DocumentResponse,
     tags=["documents"],
 )
-def get_document(
+async def get_document(
+    request: Request,
     document_id: Annotated[uuid.UUID, Path()],
-    document_repository: Annotated[DocumentRepository, Depends(get_document_repository)],
-) -> DocumentResponse:
-    document = document_repository.get(document_id)
+    document_repository: Annotated[AsyncDocumentRepository, Depends(get_async_document_repository)],
+) -> Response:
+    document = await document_repository.get(document_id)
     if document is None:
         raise HTTPException(status_code=404, detail="Document not found")
-    return DocumentResponse(id=document.id, name=document.name, document_type=document.document_type)
+
+    async def build() -> DocumentResponse:
+        return DocumentResponse(id=document.id, name=document.name, document_type=document.document_type)
+
+    return await cached_json_response(
+        request, compute_etag(request, document.id, document.updated_at), IMMUTABLE_CACHE_CONTROL, build
+    )
+
+
+@router.get(
+    "/documents/{document_id}/pages",
+    response_model=PaginatedResponse[PageResponse],
+    tags=["documents"],
+)
+async def get_document_pages(
+    document_id: Annotated[uuid.UUID, Path()],
+    document_repository: Annotated[AsyncDocumentRepository, Depends(get_async_document_repository)],
+    after: Annotated[int | None, Query(description="Page number to continue after")] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> PaginatedResponse[PageResponse]:
+    pages = await document_repository.get_pages_after(document_id, after, limit + 1)
+    if len(pages) == 0 and await document_repository.get(document_id) is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return PaginatedResponse(
+        items=[_to_page_response(page) for page in pages[:limit]],
+        next_cursor=str(pages[limit - 1].page_number) if len(pages) > limit else None,
+    )
 
 
 @router.get(
@@ -65,17 +135,71 @@ def get_document(
     response_model=PageResponse,
     tags=["documents"],
 )
-def get_document_page(
+async def get_document_page(
+    request: Request,
     document_id: Annotated[uuid.UUID, Path()],
     page_id: Annotated[uuid.UUID, Path()],
-    document_repository: Annotated[DocumentRepository, Depends(get_document_repository)],
-) -> PageResponse:
-    document = document_repository.get(document_id)
-    if document is None:
-        raise HTTPException(status_code=404, detail="Document not found")
-    page = document_repository.get_page(document_id, page_id)
+    document_repository: Annotated[AsyncDocumentRepository, Depends(get_async_document_repository)],
+    response_cache: Annotated[ResponseCache | None, Depends(get_response_cache)],
+) -> Response:
+    page = await document_repository.get_page(document_id, page_id)
     if page is None:
+        if await document_repository.get(document_id) is None:
+            raise HTTPException(status_code=404, detail="Document not found")
         raise HTTPException(status_code=404, detail="Page not found")
+
+    async def build() -> PageResponse:
+        return _to_page_response(page)
+
+    return await cached_json_response(
+        request, compute_etag(request, page.id, page.updated_at), IMMUTABLE_CACHE_CONTROL, build, response_cache
+    )
+
+
+@router.get(
+    "/pages",
+    response_model=list[PageResponse],
+    tags=["documents"],
+)
+async def get_pages(
+    ids: Annotated[list[uuid.UUID], Query(alias="id")],
+    document_repository: Annotated[AsyncDocumentRepository, Depends(get_async_document_repository)],
+) -> list[PageResponse]:
+    """Get several pages by id in one query, e.g. to render the citations of search results.
+
+    Pages are returned in the requested order and unknown ids are skipped.
+    """
+    if len(ids) > MAX_PAGES_PER_REQUEST:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_PAGES_PER_REQUEST} pages can be requested")
+    page_ids = list(dict.fromkeys(ids))
+    pages = {page.id: page for page in await document_repository.get_pages_by_ids(page_ids)}
+    return [_to_page_response(pages[page_id]) for page_id in page_ids if page_id in pages]
+
+
+@router.get(
+    "/pages/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    tags=["documents"],
+)
+async def export_pages(
+    document_repository: Annotated[AsyncDocumentRepository, Depends(get_async_document_repository)],
+    document_id: Annotated[uuid.UUID | None, Query()] = None,
+) -> StreamingResponse:
+    """Export all pages, or the pages of one document, as newline-delimited JSON with one page per line.
+
+    Pages are read with a server-side cursor and written as they arrive, so the memory of an export does not grow
+    with the number of pages.
+    """
+
+    async def lines() -> AsyncIterator[str]:
+        async for page in document_repository.stream_pages(document_id):
+            yield _to_page_response(page).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _to_page_response(page: Page) -> PageResponse:
     return PageResponse(
         id=page.id,
         document_id=page.document_id,
@@ -1,4 +1,5 @@
 import re
+import time
 from datetime import date, datetime
 from typing import Any
 
@@ -19,6 +20,7 @@ from askpolis.data_fetcher import FetchedData, FetchedDataRepository
 from askpolis.data_fetcher.abgeordnetenwatch import DATA_FETCHER_ID
 from askpolis.db import get_db
 from askpolis.logging import get_logger
+from askpolis.metrics import parse_duration, parsed_documents, parsed_pages
 
 logger = get_logger(__name__)
 
@@ -112,11 +114,16 @@ def transform_fetched_data_to_core_models() -> None:
                     )
                     continue
 
+                fetched_parties = fetched_data_repository.get_latest_by_data_fetcher_and_entities(
+                    DATA_FETCHER_ID,
+                    [
+                        FetchedData.get_entity_for_party(election_program_json["party"]["id"])
+                        for election_program_json in election_programs.json_data
+                    ],
+                )
                 for election_program_json in election_programs.json_data:
                     party_id = election_program_json["party"]["id"]
-                    party_json = fetched_data_repository.get_by_data_fetcher_and_entity(
-                        DATA_FETCHER_ID, FetchedData.get_entity_for_party(party_id)
-                    )
+                    party_json = fetched_parties.get(FetchedData.get_entity_for_party(party_id))
 
                     if party_json is None:
                         logger.warning_with_attrs("No party found", {"party_id": party_id})
@@ -207,9 +214,12 @@ def read_and_parse_election_programs_to_documents() -> None:
                     },
                 )
 
+                started_at = time.perf_counter()
                 pdf_reader = PdfReader(election_program.file_data)
                 pdf_document = pdf_reader.to_markdown()
+                parse_duration.record(time.perf_counter() - started_at)
                 if pdf_document is None:
+                    parsed_documents.add(1, {"outcome": "failed"})
                     logger.warning_with_attrs(
                         "Failed to parse PDF to markdown",
                         {
@@ -247,6 +257,8 @@ def read_and_parse_election_programs_to_documents() -> None:
                     for pdf_page in pdf_document.pages
                 ]
                 document_repository.add_pages(document, pages)
+                parsed_documents.add(1, {"outcome": "parsed"})
+                parsed_pages.add(len(pages))
     finally:
         session.close()
 
@@ -1,4 +1,15 @@
+from .fetch_engine import FetchEngine, FetchError, FetchReport, RetryPolicy
 from .models import Base, DataFetcherType, EntityType, FetchedData
 from .repositories import FetchedDataRepository
 
-__all__ = ["Base", "DataFetcherType", "EntityType", "FetchedDataRepository", "FetchedData"]
+__all__ = [
+    "Base",
+    "DataFetcherType",
+    "EntityType",
+    "FetchEngine",
+    "FetchError",
+    "FetchReport",
+    "FetchedDataRepository",
+    "FetchedData",
+    "RetryPolicy",
+]
@@ -3,6 +3,11 @@ from typing import Any
 import requests
 
 from askpolis.data_fetcher import DataFetcherType, FetchedData
+from askpolis.data_fetcher.fetch_engine import FetchError, parse_retry_after
+from askpolis.metrics import downloaded_bytes
+
+REQUEST_TIMEOUT = 30
+FILE_DOWNLOAD_TIMEOUT = 120
 
 
 class AbgeordnetenwatchClient:
@@ -44,9 +49,9 @@ class AbgeordnetenwatchClient:
         )
 
     def get_election_program(self, party_id: int, parliament_period_id: int, url: str) -> FetchedData:
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception(f"Failed to get election program from {url}")
+        response = requests.get(url, timeout=FILE_DOWNLOAD_TIMEOUT)
+        _raise_for_status(url, response)
+        downloaded_bytes.add(len(response.content), {"data_fetcher": DataFetcherType.ABGEORDNETENWATCH.value})
         return FetchedData.create_election_program(
             data_fetcher_type=DataFetcherType.ABGEORDNETENWATCH,
             party_id=party_id,
@@ -67,7 +72,11 @@ class AbgeordnetenwatchClient:
 
 
 def _get_request(url: str, params: Any | None = None) -> Any:
-    response = requests.get(url, headers={"Accept": "application/json"}, params=params)
-    if response.status_code != 200:
-        raise Exception(f"Failed to get data from {url}")
+    response = requests.get(url, headers={"Accept": "application/json"}, params=params, timeout=REQUEST_TIMEOUT)
+    _raise_for_status(url, response)
     return response.json()
+
+
+def _raise_for_status(url: str, response: requests.Response) -> None:
+    if response.status_code != 200:
+        raise FetchError(url, response.status_code, parse_retry_after(response.headers.get("Retry-After")))
@@ -1,5 +1,9 @@
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
 
-from askpolis.data_fetcher import FetchedData, FetchedDataRepository
+from askpolis.data_fetcher import FetchedData, FetchedDataRepository, FetchEngine, FetchReport
 from askpolis.data_fetcher.abgeordnetenwatch.client import AbgeordnetenwatchClient
 from askpolis.logging import get_logger
 
@@ -9,80 +13,180 @@ DATA_FETCHER_ID = "abgeordnetenwatch/election_programs/v1"
 
 
 class AbgeordnetenwatchDataFetcher:
-    def __init__(self, repository: FetchedDataRepository, client: AbgeordnetenwatchClient | None = None) -> None:
+    def __init__(
+        self,
+        repository: FetchedDataRepository,
+        client: AbgeordnetenwatchClient | None = None,
+        engine_factory: Callable[[], FetchEngine] = FetchEngine,
+    ) -> None:
         self._client = client or AbgeordnetenwatchClient()
         self._repository = repository
+        self._engine_factory = engine_factory
 
-    def fetch_election_programs(self, parliament_id: int) -> None:
+    def fetch_election_programs(self, parliament_id: int) -> FetchReport:
+        """Fetch all election programs of a parliament.
+
+        Every fetched entity is stored right away and entities that are already stored are not fetched again, so a
+        run that partially failed is resumed by the next run.
+        """
+        engine = self._engine_factory()
+        asyncio.run(self._fetch_election_programs(engine, parliament_id))
+        return engine.report
+
+    def fetch_election_programs_of_all_parliaments(self) -> FetchReport:
+        """Fetch the election programs of every parliament in the parliaments list in parallel.
+
+        All parliaments share one engine, so parties and other entities referenced by several parliaments are only
+        fetched once and the politeness limit applies to the run as a whole.
+        """
+        engine = self._engine_factory()
+        asyncio.run(self._fetch_election_programs_of_all_parliaments(engine))
+        return engine.report
+
+    async def _fetch_election_programs_of_all_parliaments(self, engine: FetchEngine) -> None:
+        logger.info("Start fetching of election programs of all parliaments...")
+
+        parliaments = await self._get_parliaments(engine)
+        if parliaments is None:
+            return
+
+        await asyncio.gather(
+            *[self._fetch_election_programs_of_parliament(engine, parliament["id"]) for parliament in parliaments]
+        )
+
+        logger.info("Finished fetching of election programs of all parliaments.")
+
+    async def _fetch_election_programs(self, engine: FetchEngine, parliament_id: int) -> None:
         logger.info("Start fetching of election programs...")
 
+        parliaments = await self._get_parliaments(engine)
+        if parliaments is None:
+            return
+
+        if not any(parliament["id"] == parliament_id for parliament in parliaments):
+            logger.warning_with_attrs("Parliament not found, stop data fetching", {"parliament_id": parliament_id})
+            return
+
+        await self._fetch_election_programs_of_parliament(engine, parliament_id)
+
+        logger.info("Finished fetching of election programs.")
+
+    async def _get_parliaments(self, engine: FetchEngine) -> list[dict[str, Any]] | None:
         logger.info("Fetching all parliaments...")
-        parliaments = self._repository.get_by_data_fetcher_and_entity(
-            DATA_FETCHER_ID, FetchedData.get_entity_for_list_of_parliaments()
+        parliaments = await self._get_or_fetch(
+            engine, FetchedData.get_entity_for_list_of_parliaments(), self._client.get_all_parliaments
         )
         if parliaments is None:
-            parliaments = self._client.get_all_parliaments()
-            parliaments.data_fetcher = DATA_FETCHER_ID
-            self._repository.save(parliaments)
+            logger.warning("Failed to fetch parliaments, stop data fetching")
+            return None
 
         assert parliaments.json_data is not None
-        if not any(parliament["id"] == parliament_id for parliament in parliaments.json_data):
-            logger.warning_with_attrs("Parliament not found, stop data fetching", {"parliament_id": parliament_id})
-            return
+        return parliaments.json_data
 
+    async def _fetch_election_programs_of_parliament(self, engine: FetchEngine, parliament_id: int) -> None:
+        started_at = time.perf_counter()
         logger.info_with_attrs("Fetching all parliament periods...", {"parliament_id": parliament_id})
-        parliament_periods = self._repository.get_by_data_fetcher_and_entity(
-            DATA_FETCHER_ID, FetchedData.get_entity_for_list_of_parliament_periods(parliament_id)
+        parliament_periods = await self._get_or_fetch(
+            engine,
+            FetchedData.get_entity_for_list_of_parliament_periods(parliament_id),
+            lambda: self._client.get_all_parliament_periods(parliament_id),
         )
         if parliament_periods is None:
-            parliament_periods = self._client.get_all_parliament_periods(parliament_id)
-            parliament_periods.data_fetcher = DATA_FETCHER_ID
-            self._repository.save(parliament_periods)
-
-        assert parliament_periods.json_data is not None
-        for parliament_period in parliament_periods.json_data:
-            if parliament_period["type"] == "election":
-                parliament_period_id = parliament_period["id"]
-                logger.info_with_attrs(
-                    "Fetching election programs for parliament period...",
-                    {"parliament_period_id": parliament_period_id},
+            logger.warning_with_attrs(
+                "Failed to fetch parliament periods, stop data fetching", {"parliament_id": parliament_id}
+            )
+        else:
+            assert parliament_periods.json_data is not None
+            await asyncio.gather(
+                *[
+                    self._fetch_election_programs_of_period(engine, parliament_period["id"])
+                    for parliament_period in parliament_periods.json_data
+                    if parliament_period["type"] == "election"
+                ]
+            )
+
+        duration = time.perf_counter() - started_at
+        engine.report.durations[str(parliament_id)] = duration
+        logger.info_with_attrs(
+            "Finished fetching of parliament", {"parliament_id": parliament_id, "duration_seconds": round(duration, 3)}
+        )
+
+    async def _fetch_election_programs_of_period(self, engine: FetchEngine, parliament_period_id: int) -> None:
+        logger.info_with_attrs(
+            "Fetching election programs for parliament period...",
+            {"parliament_period_id": parliament_period_id},
+        )
+        election_programs = await self._get_or_fetch(
+            engine,
+            FetchedData.get_entity_for_list_of_election_programs(parliament_period_id),
+            lambda: self._client.get_all_election_programs(parliament_period_id),
+        )
+        if election_programs is None:
+            return
+
+        assert election_programs.json_data is not None
+        existing_entities = self._repository.get_existing_entities(
+            DATA_FETCHER_ID,
+            [
+                entity
+                for election_program in election_programs.json_data
+                for entity in (
+                    FetchedData.get_entity_for_party(election_program["party"]["id"]),
+                    FetchedData.get_entity_for_election_program(election_program["party"]["id"], parliament_period_id),
                 )
-                election_programs = self._repository.get_by_data_fetcher_and_entity(
-                    DATA_FETCHER_ID, FetchedData.get_entity_for_list_of_election_programs(parliament_period_id)
+            ],
+        )
+        await asyncio.gather(
+            *[
+                self._fetch_election_program(engine, parliament_period_id, election_program, existing_entities)
+                for election_program in election_programs.json_data
+            ]
+        )
+
+    async def _fetch_election_program(
+        self,
+        engine: FetchEngine,
+        parliament_period_id: int,
+        election_program: dict[str, Any],
+        existing_entities: set[str],
+    ) -> None:
+        party_id = election_program["party"]["id"]
+        party_entity = FetchedData.get_entity_for_party(party_id)
+        if party_entity not in existing_entities:
+            logger.info_with_attrs("Fetching party...", {"party_id": party_id})
+            party = await engine.fetch(
+                party_entity, lambda: self._client.get_party(party_id, election_program["party"]["api_url"])
+            )
+            if party is not None:
+                self._save(party)
+
+        election_program_entity = FetchedData.get_entity_for_election_program(party_id, parliament_period_id)
+        if election_program_entity not in existing_entities:
+            file_to_download = election_program["file"]
+            if file_to_download is None:
+                logger.warning_with_attrs(
+                    "No election program file to download", {"election_program_id": election_program["id"]}
                 )
-                if election_programs is None:
-                    election_programs = self._client.get_all_election_programs(parliament_period_id)
-                    election_programs.data_fetcher = DATA_FETCHER_ID
-                    self._repository.save(election_programs)
-
-                assert election_programs.json_data is not None
-                for election_program in election_programs.json_data:
-                    party_id = election_program["party"]["id"]
-                    party = self._repository.get_by_data_fetcher_and_entity(
-                        DATA_FETCHER_ID, FetchedData.get_entity_for_party(party_id)
-                    )
-                    if party is None:
-                        logger.info_with_attrs("Fetching party...", {"party_id": party_id})
-                        party = self._client.get_party(party_id, election_program["party"]["api_url"])
-                        party.data_fetcher = DATA_FETCHER_ID
-                        self._repository.save(party)
-
-                    election_program_file = self._repository.get_by_data_fetcher_and_entity(
-                        DATA_FETCHER_ID, FetchedData.get_entity_for_election_program(party_id, parliament_period_id)
-                    )
-                    if election_program_file is None:
-                        file_to_download = election_program["file"]
-                        if file_to_download is None:
-                            logger.warning_with_attrs(
-                                "No election program file to download", {"election_program_id": election_program["id"]}
-                            )
-                            continue
-
-                        logger.info_with_attrs("Downloading election program file...", {"file": file_to_download})
-                        election_program_file = self._client.get_election_program(
-                            party_id, parliament_period_id, file_to_download
-                        )
-                        election_program_file.data_fetcher = DATA_FETCHER_ID
-                        self._repository.save(election_program_file)
+                return
 
-        logger.info("Finished fetching of election programs.")
+            logger.info_with_attrs("Downloading election program file...", {"file": file_to_download})
+            election_program_file = await engine.fetch(
+                election_program_entity,
+                lambda: self._client.get_election_program(party_id, parliament_period_id, file_to_download),
+            )
+            if election_program_file is not None:
+                self._save(election_program_file)
+
+    async def _get_or_fetch(
+        self, engine: FetchEngine, entity: str, request: Callable[[], FetchedData]
+    ) -> FetchedData | None:
+        fetched_data = self._repository.get_by_data_fetcher_and_entity(DATA_FETCHER_ID, entity)
+        if fetched_data is None:
+            fetched_data = await engine.fetch(entity, request)
+            if fetched_data is not None:
+                self._save(fetched_data)
+        return fetched_data
+
+    def _save(self, fetched_data: FetchedData) -> None:
+        fetched_data.data_fetcher = DATA_FETCHER_ID
+        self._repository.save(fetched_data)
@@ -0,0 +1,177 @@
+import asyncio
+import datetime
+import email.utils
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar, cast
+
+import requests
+from pydantic import BaseModel
+
+from askpolis.logging import get_logger
+from askpolis.metrics import fetched_entities
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    def __init__(self, url: str, status_code: int | None = None, retry_after: float | None = None) -> None:
+        super().__init__(f"Failed to get data from {url} (status code: {status_code})")
+        self.url = url
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def is_retryable(self) -> bool:
+        return self.status_code is None or self.status_code in RETRYABLE_STATUS_CODES
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.UTC)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.UTC)).total_seconds())
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Exponential backoff with full jitter. A Retry-After sent by the server is a lower bound.
+
+        Returns None if the server asks to wait longer than max_delay, as retrying earlier would only fail again.
+        """
+        if retry_after is not None and retry_after > self.max_delay:
+            return None
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if retry_after is not None:
+            return max(backoff, retry_after)
+        return backoff
+
+
+class TokenBucket:
+    """Politeness limiter allowing short bursts while keeping the average request rate."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated_at = clock()
+        self._lock: asyncio.Lock | None = None
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await self._sleep((1 - self._tokens) / self._rate)
+
+
+class FetchReport(BaseModel):
+    fetched: list[str] = []
+    failed: list[str] = []
+    # wall time in seconds per fetched source, e.g. per parliament
+    durations: dict[str, float] = {}
+
+
+class FetchEngine:
+    """Runs fetch work items concurrently with retries, backoff and a politeness limit.
+
+    Each work item is identified by the entity it fetches. Concurrent requests for the same entity within one run
+    are only sent once, and an item that fails permanently is reported without aborting the other items. Engines
+    are bound to the event loop of the run they are used in.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        requests_per_second: float = 2.0,
+        burst: int = 4,
+        retry_policy: RetryPolicy | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_second, burst)
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._sleep = sleep
+        self._in_flight: dict[str, asyncio.Future[object | None]] = {}
+        self.report = FetchReport()
+
+    async def fetch(self, entity: str, request: Callable[[], T]) -> T | None:
+        """Fetch a single work item, returning None if it could not be fetched after all retries."""
+        in_flight = self._in_flight.get(entity)
+        if in_flight is not None:
+            return cast(T | None, await in_flight)
+
+        future: asyncio.Future[object | None] = asyncio.get_running_loop().create_future()
+        self._in_flight[entity] = future
+        try:
+            result = await self._fetch_with_retries(entity, request)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    async def _fetch_with_retries(self, entity: str, request: Callable[[], T]) -> T | None:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    result = await asyncio.to_thread(request)
+                self.report.fetched.append(entity)
+                fetched_entities.add(1, {"outcome": "fetched"})
+                return result
+            except (FetchError, requests.RequestException) as e:
+                retryable = e.is_retryable if isinstance(e, FetchError) else True
+                retry_after = e.retry_after if isinstance(e, FetchError) else None
+                attempt += 1
+                delay = None
+                if retryable and attempt < self._retry_policy.max_attempts:
+                    delay = self._retry_policy.delay(attempt, retry_after)
+                if delay is None:
+                    logger.error_with_attrs(
+                        "Failed to fetch entity, giving up",
+                        {"entity": entity, "attempts": attempt, "retry_after": retry_after, "error": e},
+                    )
+                    self.report.failed.append(entity)
+                    fetched_entities.add(1, {"outcome": "failed"})
+                    return None
+
+                logger.warning_with_attrs(
+                    "Failed to fetch entity, retrying",
+                    {"entity": entity, "attempt": attempt, "delay": delay, "error": e},
+                )
+                await self._sleep(delay)
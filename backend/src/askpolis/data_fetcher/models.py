@@ -3,7 +3,7 @@ import enum
 from typing import Any
 
 import uuid_utils.compat as uuid
-from sqlalchemy import UUID, Boolean, Column, DateTime, LargeBinary, String
+from sqlalchemy import UUID, Boolean, Column, DateTime, Index, LargeBinary, String, text
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
@@ -51,6 +51,10 @@ class FetchedData(Base):
     json_data: list[dict[str, Any]] | None = Column(JSONB, nullable=True)
     file_data = Column(LargeBinary, nullable=True)
 
+    __table_args__ = (
+        Index("idx_fetched_data_fetcher_entity_created_at", "data_fetcher", "entity", text("created_at DESC")),
+    )
+
     @property
     def json_with_data_field(self) -> dict[str, Any]:
         def is_actual_list() -> bool:
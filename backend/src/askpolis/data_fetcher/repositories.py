@@ -1,9 +1,30 @@
+import time
+import uuid
+from typing import NamedTuple, cast
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, defer
 
 from askpolis.data_fetcher.models import DataFetcherType, FetchedData
 from askpolis.logging import get_logger
 
+DEFAULT_DELETION_BATCH_SIZE = 100
+DEFAULT_DELETION_TIME_BUDGET = 300.0
+
+
+class DeletedBatch(NamedTuple):
+    first_id: uuid.UUID
+    last_id: uuid.UUID
+    rows: int
+    bytes: int
+
+
+class OutdatedDataDeletion(NamedTuple):
+    data_fetcher_type: DataFetcherType
+    rows: int
+    batches: list[DeletedBatch]
+    completed: bool
+
 
 class FetchedDataRepository:
     _logger = get_logger(__name__)
@@ -26,37 +47,106 @@ class FetchedDataRepository:
             .first()
         )
 
-    def delete_outdated_data(self) -> list[tuple[DataFetcherType, int]]:
-        deleted_rows: list[tuple[DataFetcherType, int]] = []
+    def get_existing_entities(self, data_fetcher: str, entities: list[str]) -> set[str]:
+        """Return the subset of entities for which fetched data exists, without loading the data itself."""
+        if len(entities) == 0:
+            return set()
+        rows = self.session.execute(
+            select(FetchedData.entity)
+            .filter(FetchedData.data_fetcher == data_fetcher, FetchedData.entity.in_(entities))
+            .distinct()
+        ).scalars()
+        return {entity for entity in rows if entity is not None}
+
+    def get_latest_by_data_fetcher_and_entities(self, data_fetcher: str, entities: list[str]) -> dict[str, FetchedData]:
+        """Return the latest snapshot per entity in one query. File data is loaded lazily on access."""
+        if len(entities) == 0:
+            return {}
+        latest = (
+            self.session.query(FetchedData)
+            .options(defer(FetchedData.file_data))
+            .filter(FetchedData.data_fetcher == data_fetcher, FetchedData.entity.in_(entities))
+            .distinct(FetchedData.entity)
+            .order_by(FetchedData.entity, FetchedData.created_at.desc())
+            .all()
+        )
+        return {fetched_data.entity: fetched_data for fetched_data in latest if fetched_data.entity is not None}
+
+    def delete_outdated_data(
+        self, batch_size: int = DEFAULT_DELETION_BATCH_SIZE, time_budget_seconds: float = DEFAULT_DELETION_TIME_BUDGET
+    ) -> list[OutdatedDataDeletion]:
+        """Delete data of outdated data fetcher versions in bounded batches.
+
+        Each batch covers a contiguous id range and is committed on its own, so a run never holds one huge
+        transaction. Deletion stops once the time budget is used up; the remaining rows are picked up by the next run.
+        """
+        deadline = time.monotonic() + time_budget_seconds
+        deletions: list[OutdatedDataDeletion] = []
         for data_fetcher_type in DataFetcherType:
             self._logger.info_with_attrs(
                 "Deleting outdated data for data fetcher:", {"data_fetcher": data_fetcher_type}
             )
-            deleted_rows.append(self._delete_outdated_data_for_data_fetcher(data_fetcher_type))
-        return deleted_rows
+            deletions.append(self._delete_outdated_data_for_data_fetcher(data_fetcher_type, batch_size, deadline))
+        return deletions
 
-    def _delete_outdated_data_for_data_fetcher(self, data_fetcher_type: DataFetcherType) -> tuple[DataFetcherType, int]:
-        last_fetched_data = (
-            self.session.query(FetchedData)
-            .filter_by(data_fetcher_type=data_fetcher_type)
+    def _delete_outdated_data_for_data_fetcher(
+        self, data_fetcher_type: DataFetcherType, batch_size: int, deadline: float
+    ) -> OutdatedDataDeletion:
+        last_data_fetcher = self.session.execute(
+            select(FetchedData.data_fetcher)
+            .filter(FetchedData.data_fetcher_type == data_fetcher_type)
             .order_by(FetchedData.created_at.desc())
-            .first()
-        )
+            .limit(1)
+        ).scalar_one_or_none()
 
-        if last_fetched_data is None:
+        if last_data_fetcher is None:
             self._logger.info_with_attrs("No data to delete for data fetcher:", {"data_fetcher": data_fetcher_type})
-            return data_fetcher_type, 0
+            return OutdatedDataDeletion(data_fetcher_type, 0, [], True)
 
-        rows = (
-            self.session.query(FetchedData)
-            .filter(
-                FetchedData.data_fetcher_type == data_fetcher_type,
-                FetchedData.data_fetcher != last_fetched_data.data_fetcher,
-            )
-            .delete(synchronize_session=False)
+        outdated = (
+            FetchedData.data_fetcher_type == data_fetcher_type,
+            FetchedData.data_fetcher != last_data_fetcher,
         )
+        batches: list[DeletedBatch] = []
+        last_deleted_id: uuid.UUID | None = None
+        while True:
+            if time.monotonic() >= deadline:
+                self._logger.info_with_attrs(
+                    "Time budget exhausted, continuing deletion in next run:",
+                    {"data_fetcher": data_fetcher_type, "batches": len(batches)},
+                )
+                return OutdatedDataDeletion(data_fetcher_type, sum(b.rows for b in batches), batches, False)
+
+            ids_query = select(FetchedData.id).filter(*outdated).order_by(FetchedData.id).limit(batch_size)
+            if last_deleted_id is not None:
+                ids_query = ids_query.filter(FetchedData.id > last_deleted_id)
+            ids = cast(list[uuid.UUID], list(self.session.execute(ids_query).scalars()))
+            if len(ids) == 0:
+                break
+
+            deleted_sizes = self.session.execute(
+                delete(FetchedData)
+                .where(*outdated, FetchedData.id >= ids[0], FetchedData.id <= ids[-1])
+                .returning(
+                    func.coalesce(func.octet_length(FetchedData.file_data), 0)
+                    + func.coalesce(func.octet_length(FetchedData.text_data), 0)
+                    + func.coalesce(func.pg_column_size(FetchedData.json_data), 0)
+                )
+                .execution_options(synchronize_session=False)
+            ).scalars()
+            sizes = list(deleted_sizes)
+            self.session.commit()
+
+            batch = DeletedBatch(first_id=ids[0], last_id=ids[-1], rows=len(sizes), bytes=sum(sizes))
+            batches.append(batch)
+            last_deleted_id = ids[-1]
+            self._logger.debug_with_attrs(
+                "Deleted batch for data fetcher:",
+                {"data_fetcher": data_fetcher_type, "rows": batch.rows, "bytes": batch.bytes},
+            )
+
+        rows = sum(b.rows for b in batches)
         self._logger.info_with_attrs(
             "Deleted rows for data fetcher:", {"data_fetcher": data_fetcher_type, "rows": rows}
         )
-        self.session.commit()
-        return data_fetcher_type, rows
+        return OutdatedDataDeletion(data_fetcher_type, rows, batches, True)
@@ -14,8 +14,32 @@ def fetch_bundestag_from_abgeordnetenwatch() -> dict[str, Any]:
     session = next(get_db())
     try:
         data_fetcher = AbgeordnetenwatchDataFetcher(FetchedDataRepository(session))
-        data_fetcher.fetch_election_programs(bundestag_id)
-        return build_task_result("success", str(bundestag_id), {"action": "fetch_election_programs"})
+        report = data_fetcher.fetch_election_programs(bundestag_id)
+        return build_task_result(
+            "success" if len(report.failed) == 0 else "partial_failure",
+            str(bundestag_id),
+            {"action": "fetch_election_programs", "fetched": len(report.fetched), "failed": report.failed},
+        )
+    finally:
+        session.close()
+
+
+@shared_task(name="fetch_parliaments_from_abgeordnetenwatch")
+def fetch_parliaments_from_abgeordnetenwatch() -> dict[str, Any]:
+    session = next(get_db())
+    try:
+        data_fetcher = AbgeordnetenwatchDataFetcher(FetchedDataRepository(session))
+        report = data_fetcher.fetch_election_programs_of_all_parliaments()
+        return build_task_result(
+            "success" if len(report.failed) == 0 else "partial_failure",
+            None,
+            {
+                "action": "fetch_election_programs_of_all_parliaments",
+                "fetched": len(report.fetched),
+                "failed": report.failed,
+                "durations": report.durations,
+            },
+        )
     finally:
         session.close()
 
@@ -24,7 +48,30 @@ def fetch_bundestag_from_abgeordnetenwatch() -> dict[str, Any]:
 def cleanup_outdated_data() -> dict[str, Any]:
     session = next(get_db())
     try:
-        FetchedDataRepository(session).delete_outdated_data()
-        return build_task_result("success", None, {"action": "cleanup_outdated_data"})
+        deletions = FetchedDataRepository(session).delete_outdated_data()
+        return build_task_result(
+            "success",
+            None,
+            {
+                "action": "cleanup_outdated_data",
+                "deletions": [
+                    {
+                        "data_fetcher_type": deletion.data_fetcher_type.value,
+                        "rows": deletion.rows,
+                        "completed": deletion.completed,
+                        "batches": [
+                            {
+                                "first_id": str(batch.first_id),
+                                "last_id": str(batch.last_id),
+                                "rows": batch.rows,
+                                "bytes": batch.bytes,
+                            }
+                            for batch in deletion.batches
+                        ],
+                    }
+                    for deletion in deletions
+                ],
+            },
+        )
     finally:
         session.close()
@@ -1,3 +1,14 @@
-from .dependencies import get_db
+from .dependencies import get_async_db, get_async_read_db, get_db, reset_engine
+from .engine import ROLE_API, ROLE_WORKER, create_async_db_engine, create_db_engine, get_pool_usage
 
-__all__ = ["get_db"]
+__all__ = [
+    "ROLE_API",
+    "ROLE_WORKER",
+    "create_async_db_engine",
+    "create_db_engine",
+    "get_async_db",
+    "get_async_read_db",
+    "get_db",
+    "get_pool_usage",
+    "reset_engine",
+]
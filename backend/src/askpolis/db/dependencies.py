@@ -1,12 +1,29 @@
-import os
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Any
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
+from askpolis.env import get_float_env
+
+from .engine import (
+    ROLE_API,
+    create_async_db_engine,
+    create_db_engine,
+    dispose_engine,
+    get_read_database_url,
+)
+from .replica import ReplicaLagMonitor, get_replication_lag
+
+role = ROLE_API
 engine: Engine | None = None
 DbSession: sessionmaker[Session] | None = None
+async_engine: AsyncEngine | None = None
+AsyncDbSession: async_sessionmaker[AsyncSession] | None = None
+async_read_engine: AsyncEngine | None = None
+AsyncReadDbSession: async_sessionmaker[AsyncSession] | None = None
+replica_lag_monitor: ReplicaLagMonitor | None = None
 
 
 def get_db() -> Generator[Session, Any, None]:
@@ -14,9 +31,7 @@ def get_db() -> Generator[Session, Any, None]:
     global engine, DbSession
     if not engine:
         try:
-            engine = create_engine(
-                os.getenv("DATABASE_URL") or "postgresql+psycopg://postgres@postgres:5432/askpolis-db"
-            )
+            engine = create_db_engine(role)
         except Exception as e:
             raise Exception("Error while connecting to database") from e
 
@@ -28,3 +43,82 @@ def get_db() -> Generator[Session, Any, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an asyncio database session for async request handlers."""
+    async with _get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an asyncio database session for read-only queries.
+
+    The session reads from the replica at DATABASE_READ_URL as long as it does not lag behind the primary by more
+    than DATABASE_READ_MAX_LAG_SECONDS, otherwise and if no replica is configured it reads from the primary.
+    """
+    session_maker = await _get_async_read_sessionmaker()
+    async with session_maker() as db:
+        yield db
+
+
+def _get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global async_engine, AsyncDbSession
+    if not async_engine:
+        try:
+            async_engine = create_async_db_engine(role)
+        except Exception as e:
+            raise Exception("Error while connecting to database") from e
+
+    if not AsyncDbSession:
+        # lazy loading is not possible in async sessions, so loaded objects must stay usable after a commit
+        AsyncDbSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    return AsyncDbSession
+
+
+async def _get_async_read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global async_read_engine, AsyncReadDbSession, replica_lag_monitor
+    if get_read_database_url() is None:
+        return _get_async_sessionmaker()
+
+    if not async_read_engine:
+        try:
+            async_read_engine = create_async_db_engine(role, read_only=True)
+        except Exception as e:
+            raise Exception("Error while connecting to read replica") from e
+
+    if not AsyncReadDbSession:
+        AsyncReadDbSession = async_sessionmaker(bind=async_read_engine, expire_on_commit=False)
+
+    if not replica_lag_monitor:
+        replica_lag_monitor = ReplicaLagMonitor(
+            get_replication_lag(async_read_engine), get_float_env("DATABASE_READ_MAX_LAG_SECONDS", 5.0)
+        )
+
+    if not await replica_lag_monitor.is_fresh():
+        return _get_async_sessionmaker()
+    return AsyncReadDbSession
+
+
+def reset_engine(new_role: str) -> None:
+    """Drop the engines inherited from a parent process and use the given role for the next ones.
+
+    A forked child must not use the connections of its parent, as both would then talk over the same sockets.
+    """
+    global role, engine, DbSession, async_engine, AsyncDbSession, async_read_engine, AsyncReadDbSession
+    global replica_lag_monitor
+    if engine is not None:
+        dispose_engine(engine)
+    if async_engine is not None:
+        dispose_engine(async_engine.sync_engine)
+    if async_read_engine is not None:
+        dispose_engine(async_read_engine.sync_engine)
+    role = new_role
+    engine = None
+    DbSession = None
+    async_engine = None
+    AsyncDbSession = None
+    async_read_engine = None
+    AsyncReadDbSession = None
+    replica_lag_monitor = None
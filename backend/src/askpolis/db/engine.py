@@ -0,0 +1,109 @@
+import os
+from typing import Any
+
+from opentelemetry import metrics
+from sqlalchemy import Engine, QueuePool, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from askpolis.env import get_int_env
+
+DEFAULT_DATABASE_URL = "postgresql+psycopg://postgres@postgres:5432/askpolis-db"
+
+ROLE_API = "api"
+ROLE_WORKER = "worker"
+
+# API requests should fail fast instead of holding a connection, while workers run long batch statements
+DEFAULT_STATEMENT_TIMEOUTS_MS = {ROLE_API: 15_000, ROLE_WORKER: 600_000}
+
+_meter = metrics.get_meter(__name__)
+_engines: dict[str, Engine] = {}
+
+
+def create_db_engine(role: str = ROLE_API) -> Engine:
+    """Create an engine for the given role with pool settings from the environment.
+
+    Connections are pinged on checkout and recycled after DB_POOL_RECYCLE seconds, so connections dropped by
+    Postgres or a proxy in between are replaced instead of failing the next request. Each role has its own statement
+    timeout, which can be overridden with DB_STATEMENT_TIMEOUT_<ROLE>_MS.
+    """
+    engine = create_engine(get_database_url(), **_get_engine_options(role))
+    _engines[role] = engine
+    return engine
+
+
+def create_async_db_engine(role: str = ROLE_API, read_only: bool = False) -> AsyncEngine:
+    """Create an asyncio engine for the given role with the same settings as `create_db_engine`.
+
+    A read-only engine connects to the replica at DATABASE_READ_URL and runs every transaction read-only.
+    """
+    url = get_read_database_url() if read_only else None
+    options = _get_engine_options(role)
+    if read_only:
+        options["connect_args"]["options"] += " -c default_transaction_read_only=on"
+    engine = create_async_engine(url or get_database_url(), **options)
+    _engines[f"{role}_async_read" if read_only else f"{role}_async"] = engine.sync_engine
+    return engine
+
+
+def get_database_url() -> str:
+    return os.getenv("DATABASE_URL") or DEFAULT_DATABASE_URL
+
+
+def get_read_database_url() -> str | None:
+    return os.getenv("DATABASE_READ_URL") or None
+
+
+def _get_engine_options(role: str) -> dict[str, Any]:
+    statement_timeout = get_int_env(
+        f"DB_STATEMENT_TIMEOUT_{role.upper()}_MS", DEFAULT_STATEMENT_TIMEOUTS_MS.get(role, 0)
+    )
+    return {
+        "pool_size": get_int_env("DB_POOL_SIZE", 5),
+        "max_overflow": get_int_env("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": get_int_env("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": get_int_env("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": True,
+        "connect_args": {
+            "options": f"-c statement_timeout={statement_timeout}",
+            "application_name": f"askpolis-{role}",
+        },
+    }
+
+
+def dispose_engine(engine: Engine) -> None:
+    """Dispose the pool of an engine inherited from a parent process without closing the connections of the parent."""
+    engine.dispose(close=False)
+    for role, registered_engine in list(_engines.items()):
+        if registered_engine is engine:
+            del _engines[role]
+
+
+def get_pool_usage() -> dict[str, dict[str, int]]:
+    """Return the usage of the connection pool of every engine created in this process by role."""
+    usage = {}
+    for role, engine in _engines.items():
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            usage[role] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            }
+    return usage
+
+
+def _observe_pool_usage(state: str) -> metrics.CallbackT:
+    def callback(_: metrics.CallbackOptions) -> list[metrics.Observation]:
+        return [metrics.Observation(pool_usage[state], {"role": role}) for role, pool_usage in get_pool_usage().items()]
+
+    return callback
+
+
+for _state in ("size", "checked_out", "idle", "overflow"):
+    _meter.create_observable_gauge(
+        f"askpolis.db.pool.{_state}",
+        callbacks=[_observe_pool_usage(_state)],
+        unit="{connection}",
+        description=f"Connections of the SQLAlchemy pool in state {_state}",
+    )
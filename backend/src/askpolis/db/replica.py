@@ -0,0 +1,71 @@
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from askpolis.logging import get_logger
+
+logger = get_logger(__name__)
+
+# replay lag in seconds, which is 0 if the replica has replayed everything it received or is not a replica at all
+REPLICATION_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReplicaLagMonitor:
+    """Decides whether reads may go to the replica given how far it lags behind the primary.
+
+    The lag is measured at most once per check interval and a replica that cannot be reached counts as stale, so
+    reads fall back to the primary until the replica has caught up again.
+    """
+
+    def __init__(
+        self,
+        get_lag: Callable[[], Awaitable[float | None]],
+        max_lag_seconds: float,
+        check_interval_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._get_lag = get_lag
+        self._max_lag_seconds = max_lag_seconds
+        self._check_interval_seconds = check_interval_seconds
+        self._clock = clock
+        self._checked_at: float | None = None
+        self._is_fresh = False
+
+    async def is_fresh(self) -> bool:
+        now = self._clock()
+        if self._checked_at is not None and now - self._checked_at < self._check_interval_seconds:
+            return self._is_fresh
+
+        self._checked_at = now
+        try:
+            lag = await self._get_lag()
+        except Exception as e:
+            lag = None
+            logger.warning_with_attrs("Failed to get replication lag of read replica", {"error": e})
+
+        is_fresh = lag is not None and lag <= self._max_lag_seconds
+        if is_fresh != self._is_fresh:
+            logger.info_with_attrs(
+                "Read replica is fresh" if is_fresh else "Read replica is stale, reading from primary",
+                {"lag_seconds": lag, "max_lag_seconds": self._max_lag_seconds},
+            )
+        self._is_fresh = is_fresh
+        return is_fresh
+
+
+def get_replication_lag(engine: AsyncEngine) -> Callable[[], Awaitable[float | None]]:
+    async def get_lag() -> float | None:
+        async with engine.connect() as connection:
+            lag = await connection.scalar(REPLICATION_LAG_QUERY)
+        return None if lag is None else float(lag)
+
+    return get_lag
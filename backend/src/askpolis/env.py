@@ -0,0 +1,25 @@
+import os
+
+from askpolis.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value:
+        try:
+            return int(value)
+        except ValueError:
+            logger.warning_with_attrs("Ignoring invalid integer environment variable", {"name": name, "value": value})
+    return default
+
+
+def get_float_env(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            logger.warning_with_attrs("Ignoring invalid number environment variable", {"name": name, "value": value})
+    return default
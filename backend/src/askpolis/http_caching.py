@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol, cast
+
+import redis.asyncio as redis_asyncio
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from askpolis.env import get_int_env
+from askpolis.logging import get_logger
+
+logger = get_logger(__name__)
+
+# documents and pages are written once by the ingestion and then only read
+IMMUTABLE_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+# completed answers can still be regenerated, so they are revalidated more often
+COMPLETED_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
+# pending questions and answers change as soon as the answer is generated
+PENDING_CACHE_CONTROL = "no-cache"
+
+RESPONSE_CACHE_KEY_PREFIX = "response-cache:"
+
+
+def compute_etag(request: Request, *parts: Any) -> str:
+    """Compute a strong ETag for a representation from the id and `updated_at` of the entities it is built from.
+
+    The route name and the base URL are part of the tag because the same entity has different representations per
+    route and the representations contain absolute URLs.
+    """
+    values = [getattr(request.scope.get("route"), "name", request.url.path), str(request.base_url)]
+    for part in parts:
+        values.append(part.isoformat() if isinstance(part, datetime.datetime) else str(part))
+    return f'"{hashlib.sha256("|".join(values).encode()).hexdigest()[:32]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a weak validator of a compressing proxy matches as well
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCache(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes) -> None: ...
+
+
+class InProcessResponseCache:
+    """Bounded LRU of serialised response bodies of the current process."""
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisResponseCache:
+    """Response bodies shared by all API processes, expiring after `ttl` seconds.
+
+    The cache is an optimisation only, so Redis errors are logged and treated as cache misses.
+    """
+
+    def __init__(self, redis_client: Any, ttl: int = 3600) -> None:
+        self._redis = redis_client
+        self._ttl = ttl
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return cast(bytes | None, await self._redis.get(key))
+        except Exception as e:
+            logger.warning_with_attrs("Failed to read response from cache", {"key": key, "error": e})
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self._redis.set(key, value, ex=self._ttl)
+        except Exception as e:
+            logger.warning_with_attrs("Failed to write response to cache", {"key": key, "error": e})
+
+
+_response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the response cache configured with RESPONSE_CACHE, which is either `memory`, `redis` or unset."""
+    global _response_cache
+    if _response_cache is None:
+        backend = os.getenv("RESPONSE_CACHE", "").lower()
+        if backend == "memory":
+            _response_cache = InProcessResponseCache(get_int_env("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+        elif backend == "redis":
+            url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            _response_cache = RedisResponseCache(
+                cast(Any, redis_asyncio).from_url(url), get_int_env("RESPONSE_CACHE_TTL_SECONDS", 3600)
+            )
+    return _response_cache
+
+
+async def cached_json_response(
+    request: Request,
+    etag: str,
+    cache_control: str,
+    build: Callable[[], Awaitable[BaseModel]],
+    response_cache: ResponseCache | None = None,
+) -> Response:
+    """Answer with 304 if the client has the current representation, otherwise serve it from cache or build it.
+
+    The ETag is the cache key, so an entry becomes unreachable as soon as its entities are updated.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if is_not_modified(request, etag):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = RESPONSE_CACHE_KEY_PREFIX + etag.strip('"')
+    body = await response_cache.get(key) if response_cache is not None else None
+    if body is None:
+        body = (await build()).model_dump_json().encode()
+        if response_cache is not None:
+            await response_cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
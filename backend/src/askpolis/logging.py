@@ -3,34 +3,76 @@ import os
 from logging import Logger
 from typing import Any, cast
 
+ATTRIBUTE_PREFIX = "askpolis."
+
 _configured = False
+_level = logging.INFO
 
 
 class AttributesAwareLogger(Logger):
-    def debug_with_attrs(self: Logger, message: str, attrs: dict[str, Any]) -> None:
-        return self.debug(_expand_message(message, attrs))
+    """Logger taking attributes in addition to a message.
+
+    Attributes are appended to the message as `key=value` pairs and are passed as `askpolis.<key>` record attributes,
+    which the OpenTelemetry log handler exports as structured attributes. Nothing is formatted for disabled levels and
+    the message is only built once a handler formats the record.
+    """
+
+    def debug_with_attrs(self, message: str, attrs: dict[str, Any]) -> None:
+        if self.isEnabledFor(logging.DEBUG):
+            self._log_with_attrs(logging.DEBUG, message, attrs)
+
+    def info_with_attrs(self, message: str, attrs: dict[str, Any]) -> None:
+        if self.isEnabledFor(logging.INFO):
+            self._log_with_attrs(logging.INFO, message, attrs)
+
+    def warning_with_attrs(self, message: str, attrs: dict[str, Any]) -> None:
+        if self.isEnabledFor(logging.WARNING):
+            self._log_with_attrs(logging.WARNING, message, attrs)
+
+    def error_with_attrs(self, message: str, attrs: dict[str, Any]) -> None:
+        if self.isEnabledFor(logging.ERROR):
+            self._log_with_attrs(logging.ERROR, message, attrs)
+
+    def _log_with_attrs(self, level: int, message: str, attrs: dict[str, Any]) -> None:
+        if len(attrs) == 0:
+            self._log(level, message, (), stacklevel=3)
+            return
+        # the message is an argument and not the format string, so a % in it is not interpreted
+        self._log(
+            level,
+            "%s %s",
+            (message, _FormattedAttributes(attrs)),
+            extra={
+                ATTRIBUTE_PREFIX + key: _to_attribute_value(value) for key, value in attrs.items() if value is not None
+            },
+            stacklevel=3,
+        )
+
 
-    def info_with_attrs(self: Logger, message: str, attrs: dict[str, Any]) -> None:
-        return self.info(_expand_message(message, attrs))
+class _FormattedAttributes:
+    __slots__ = ("attrs",)
 
-    def warning_with_attrs(self: Logger, message: str, attrs: dict[str, Any]) -> None:
-        return self.warning(_expand_message(message, attrs))
+    def __init__(self, attrs: dict[str, Any]) -> None:
+        self.attrs = attrs
 
-    def error_with_attrs(self: Logger, message: str, attrs: dict[str, Any]) -> None:
-        return self.error(_expand_message(message, attrs))
+    def __str__(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.attrs.items())
 
 
 def get_logger(name: str) -> AttributesAwareLogger:
     _configure_logging()
     logger = cast(AttributesAwareLogger, logging.getLogger(name))
-    logger.setLevel(_get_log_level_from_otel_default_env_var())
+    # setting a level clears the level cache of all loggers, so it is only done once per logger
+    if logger.level == logging.NOTSET:
+        logger.setLevel(_level)
     return logger
 
 
 def _configure_logging() -> None:
-    global _configured
+    global _configured, _level
     if not _configured:
         logging.setLoggerClass(AttributesAwareLogger)
+        _level = _get_log_level_from_otel_default_env_var()
         _configured = True
 
 
@@ -45,6 +87,8 @@ def _get_log_level_from_otel_default_env_var() -> int:
     return logging.ERROR
 
 
-def _expand_message(message: str, attrs: dict[str, Any]) -> str:
-    attrs_str = " ".join(f"{k}={v}" for k, v in attrs.items())
-    return f"{message} {attrs_str}".strip()
+def _to_attribute_value(value: Any) -> Any:
+    # OpenTelemetry attributes only support primitive values
+    if isinstance(value, str | bool | int | float):
+        return value
+    return str(value)
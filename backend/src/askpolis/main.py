@@ -1,8 +1,11 @@
+import os
+
 from fastapi import FastAPI
 from pydantic import BaseModel
 
 from askpolis.core import router as core_router
 from askpolis.logging import get_logger
+from askpolis.metrics import register_backlog_gauges
 from askpolis.qa import router as qa_router
 from askpolis.rate_limiting import RateLimitMiddleware
 from askpolis.search import router as search_router
@@ -14,10 +17,13 @@ api_version = "v0"
 api_base_path = f"/{api_version}"
 
 app = FastAPI(docs_url="/")
-app.add_middleware(RateLimitMiddleware)
+if os.getenv("RATE_LIMIT_ENABLED", "true") == "true":
+    app.add_middleware(RateLimitMiddleware)
 app.include_router(core_router, prefix=api_base_path)
 app.include_router(qa_router, prefix=api_base_path)
 app.include_router(search_router, prefix=api_base_path)
+# the workers report the backlog, the API only if enabled explicitly
+register_backlog_gauges(enabled_by_default=False)
 
 
 class HealthResponse(BaseModel):
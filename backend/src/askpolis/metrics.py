@@ -0,0 +1,92 @@
+import os
+from collections.abc import Callable, Iterable
+
+from opentelemetry import metrics
+from sqlalchemy.orm import Session
+
+from askpolis.db import get_db
+from askpolis.logging import get_logger
+
+logger = get_logger(__name__)
+
+_meter = metrics.get_meter(__name__)
+
+fetched_entities = _meter.create_counter(
+    "askpolis.fetch.entities", unit="{entity}", description="Entities fetched by data fetchers by outcome"
+)
+downloaded_bytes = _meter.create_counter(
+    "askpolis.fetch.downloaded_bytes", unit="By", description="Bytes of files downloaded by data fetchers"
+)
+parsed_documents = _meter.create_counter(
+    "askpolis.ingestion.parsed_documents", unit="{document}", description="PDF documents parsed by outcome"
+)
+parsed_pages = _meter.create_counter(
+    "askpolis.ingestion.parsed_pages", unit="{page}", description="Pages parsed from PDF documents"
+)
+parse_duration = _meter.create_histogram(
+    "askpolis.ingestion.parse_duration", unit="s", description="Time to read and parse one PDF document"
+)
+embedded_chunks = _meter.create_counter(
+    "askpolis.ingestion.embedded_chunks", unit="{chunk}", description="Chunks embedded and stored"
+)
+embedding_duration = _meter.create_histogram(
+    "askpolis.ingestion.embedding_duration", unit="s", description="Time to split, embed and store one document"
+)
+chunks_per_document = _meter.create_histogram(
+    "askpolis.ingestion.chunks_per_document", unit="{chunk}", description="Chunks a document is split into"
+)
+
+_backlog_gauges_registered = False
+
+
+def register_backlog_gauges(enabled_by_default: bool = True) -> None:
+    """Register gauges of the work waiting for the scheduled tasks, observed with one count query each per export.
+
+    The gauges are meant for alerting and autoscaling of workers, so they are reported by the workers and only by
+    other processes if BACKLOG_METRICS_ENABLED=true. BACKLOG_METRICS_ENABLED=false switches them off everywhere.
+    """
+    global _backlog_gauges_registered
+    enabled = os.getenv("BACKLOG_METRICS_ENABLED", "true" if enabled_by_default else "false") == "true"
+    if _backlog_gauges_registered or not enabled:
+        return
+    _backlog_gauges_registered = True
+
+    # imported here as the repositories depend on modules that report metrics
+    from askpolis.core.repositories import ElectionProgramRepository
+    from askpolis.qa.repositories import QuestionRepository
+    from askpolis.search.repositories import EmbeddingsRepository
+
+    backlogs: dict[str, tuple[str, Callable[[Session], int]]] = {
+        "documents_without_embeddings": (
+            "{document}",
+            lambda db: EmbeddingsRepository(db).count_documents_without_embeddings(),
+        ),
+        "election_programs_without_documents": (
+            "{election_program}",
+            lambda db: ElectionProgramRepository(db).count_without_referenced_document(),
+        ),
+        "stale_questions": ("{question}", lambda db: QuestionRepository(db).count_stale_questions()),
+    }
+    for name, (unit, count) in backlogs.items():
+        _meter.create_observable_gauge(
+            f"askpolis.backlog.{name}",
+            callbacks=[_observe_backlog(name, count)],
+            unit=unit,
+            description=f"Backlog of {name.replace('_', ' ')}",
+        )
+
+
+def _observe_backlog(
+    name: str, count: Callable[[Session], int]
+) -> Callable[[metrics.CallbackOptions], Iterable[metrics.Observation]]:
+    def callback(_: metrics.CallbackOptions) -> list[metrics.Observation]:
+        session = next(get_db())
+        try:
+            return [metrics.Observation(count(session))]
+        except Exception as e:
+            logger.warning_with_attrs("Failed to observe backlog", {"backlog": name, "error": e})
+            return []
+        finally:
+            session.close()
+
+    return callback
@@ -7,14 +7,16 @@ from pydantic_ai.settings import ModelSettings
 
 from askpolis.logging import get_logger
 from askpolis.search import SearchServiceBase
+from askpolis.tracing import traced
 
 from .models import Answer, AnswerContent, Citation, Question
 
 logger = get_logger(__name__)
 
+_model_name = os.getenv("OLLAMA_MODEL") or "mistral:7b"
 _agent = Agent(
     OpenAIChatModel(
-        model_name=os.getenv("OLLAMA_MODEL") or "mistral:7b",
+        model_name=_model_name,
         provider=OpenAIProvider(base_url=os.getenv("OLLAMA_URL") or "http://localhost:11434/v1", api_key="ollama"),
     ),
     model_settings=ModelSettings(
@@ -41,7 +43,12 @@ class AnswerAgent:
 
         logger.info("Invoking LLM chain...")
         content = "\n\n".join([r.matching_text for r in results])
-        answer = _agent.run_sync(user_prompt=f"Query: {question}\n\nContent:\n\n{content}")
+        with traced("qa.llm", {"model": _model_name, "results": len(results)}) as span:
+            answer = _agent.run_sync(user_prompt=f"Query: {question}\n\nContent:\n\n{content}")
+            if answer is not None:
+                usage = answer.usage
+                span.set_attribute("input_tokens", usage.input_tokens)
+                span.set_attribute("output_tokens", usage.output_tokens)
         if answer is None:
             logger.warning_with_attrs("No answer was generated", attrs={"question": question.content})
             return None
@@ -0,0 +1,49 @@
+import datetime
+import uuid
+from collections import OrderedDict
+
+from .models import Answer, HydratedCitation
+from .repositories import AsyncCitationRepository
+
+
+class CitationCache:
+    """Bounded LRU of hydrated citations by answer.
+
+    Answers are not changed once written, but the key includes `updated_at` so a regenerated answer is not served
+    the citations of its previous version.
+    """
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[uuid.UUID, datetime.datetime], list[HydratedCitation]] = OrderedDict()
+
+    def get(self, answer: Answer) -> list[HydratedCitation] | None:
+        key = (answer.id, answer.updated_at)
+        citations = self._entries.get(key)
+        if citations is not None:
+            self._entries.move_to_end(key)
+        return citations
+
+    def put(self, answer: Answer, citations: list[HydratedCitation]) -> None:
+        key = (answer.id, answer.updated_at)
+        self._entries[key] = citations
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class CitationService:
+    def __init__(self, citation_repository: AsyncCitationRepository, cache: CitationCache | None = None) -> None:
+        self._citation_repository = citation_repository
+        self._cache = cache
+
+    async def get_citations(self, answer: Answer) -> list[HydratedCitation]:
+        if len(answer.citations) == 0:
+            return []
+
+        citations = self._cache.get(answer) if self._cache is not None else None
+        if citations is None:
+            citations = await self._citation_repository.get_hydrated_citations(answer.id)
+            if self._cache is not None:
+                self._cache.put(answer, citations)
+        return citations
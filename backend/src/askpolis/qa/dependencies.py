@@ -1,17 +1,21 @@
 from typing import Annotated
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from askpolis.core import ParliamentRepository
-from askpolis.db import get_db
+from askpolis.db import get_async_db, get_async_read_db, get_db
 from askpolis.search import EmbeddingsRepository, get_search_service
 
 from .agents import AnswerAgent
+from .citation_service import CitationCache, CitationService
 from .qa_service import QAService
-from .repositories import QuestionRepository
+from .repositories import AsyncCitationRepository, AsyncQuestionRepository, QuestionRepository
 from .tasks import CeleryQuestionScheduler
 
+citation_cache = CitationCache()
+
 
 def get_question_repository(
     db: Annotated[Session, Depends(get_db)],
@@ -19,6 +23,24 @@ def get_question_repository(
     return QuestionRepository(db)
 
 
+def get_async_question_repository(
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+) -> AsyncQuestionRepository:
+    return AsyncQuestionRepository(db)
+
+
+def get_async_primary_question_repository(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> AsyncQuestionRepository:
+    return AsyncQuestionRepository(db)
+
+
+def get_citation_service(
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+) -> CitationService:
+    return CitationService(AsyncCitationRepository(db), citation_cache)
+
+
 def get_qa_service(
     db: Annotated[Session, Depends(get_db)],
 ) -> QAService:
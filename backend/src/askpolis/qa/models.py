@@ -1,5 +1,5 @@
 import datetime
-from typing import Any
+from typing import Any, NamedTuple
 
 import uuid_utils.compat as uuid
 from pydantic import BaseModel, Field
@@ -72,6 +72,22 @@ class Citation(Base):
     )
 
 
+class QuestionSummary(NamedTuple):
+    """Question listed without its answers, only whether it has been answered."""
+
+    question: "Question"
+    answered: bool
+
+
+class HydratedCitation(NamedTuple):
+    """Citation with the fields shown to users, read in one query instead of loading documents and embeddings."""
+
+    document_id: uuid.UUID
+    page_id: uuid.UUID | None
+    title: str | None
+    content: str | None
+
+
 class Answer(Base):
     __tablename__ = "answers"
 
@@ -2,6 +2,7 @@ import uuid
 
 from askpolis.core.repositories import ParliamentRepository
 from askpolis.logging import get_logger
+from askpolis.tracing import traced
 
 from .agents import AnswerAgent
 from .models import Question
@@ -58,6 +59,7 @@ class QAService:
         if answer is not None:
             answer.parliament_id = bundestag.id
             question.answers.append(answer)
-            self._question_repository.save(question)
+            with traced("qa.persist_answer", {"citations": len(answer.citations)}):
+                self._question_repository.save(question)
 
         return question
@@ -1,10 +1,14 @@
 import datetime
 import uuid
 
-from sqlalchemy import not_
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, not_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, raiseload
 
-from .models import Answer, Question
+from askpolis.core import Document
+from askpolis.search import Embeddings
+
+from .models import Answer, Citation, HydratedCitation, Question, QuestionSummary
 
 
 class QuestionRepository:
@@ -22,8 +26,34 @@ class QuestionRepository:
         self.db.commit()
 
     def get_stale_questions(self) -> list[Question]:
+        return self._query_stale_questions().all()
+
+    def count_stale_questions(self) -> int:
+        return self._query_stale_questions().count()
+
+    def _query_stale_questions(self) -> Query[Question]:
         two_hours_ago = datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=2)
-        return self.db.query(Question).filter(not_(Question.answers.any()), Question.created_at <= two_hours_ago).all()
+        return self.db.query(Question).filter(not_(Question.answers.any()), Question.created_at <= two_hours_ago)
+
+
+class AsyncQuestionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, question_id: uuid.UUID) -> Question | None:
+        # answers with their contents and citations are loaded eagerly by selectin relationships
+        return await self.db.get(Question, question_id)
+
+    async def get_all_after(self, after: uuid.UUID | None, limit: int) -> list[QuestionSummary]:
+        """Get questions in creation order, continuing after the given id, which is a time-ordered UUIDv7.
+
+        Only whether a question has an answer is queried, the answers with their contents and citations aren't loaded.
+        """
+        answered = exists().where(Answer.question_id == Question.id)
+        query = select(Question, answered).options(raiseload(Question.answers)).order_by(Question.id).limit(limit)
+        if after is not None:
+            query = query.where(Question.id > after)
+        return [QuestionSummary(*row) for row in await self.db.execute(query)]
 
 
 class AnswerRepository:
@@ -36,3 +66,24 @@ class AnswerRepository:
     def save(self, answer: Answer) -> None:
         self.db.add(answer)
         self.db.commit()
+
+
+class AsyncCitationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_hydrated_citations(self, answer_id: uuid.UUID) -> list[HydratedCitation]:
+        """Get the citations of an answer joined with document names and chunks, without loading the vectors."""
+        rows = await self.db.execute(
+            select(
+                Citation.document_id,
+                func.coalesce(Citation.page_id, Embeddings.page_id),
+                Document.name,
+                Embeddings.chunk,
+            )
+            .outerjoin(Document, Document.id == Citation.document_id)
+            .outerjoin(Embeddings, Embeddings.id == Citation.embeddings_id)
+            .where(Citation.answer_id == answer_id)
+            .order_by(Citation.id)
+        )
+        return [HydratedCitation(*row) for row in rows]
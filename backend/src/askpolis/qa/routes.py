@@ -1,31 +1,94 @@
 from typing import Annotated
 
 import uuid_utils.compat as uuid
-from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
-from askpolis.core import Document, DocumentRepository, get_document_repository
-from askpolis.search import Embeddings, EmbeddingsRepository, get_embeddings_repository
+from askpolis.core import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PaginatedResponse
+from askpolis.http_caching import (
+    COMPLETED_CACHE_CONTROL,
+    PENDING_CACHE_CONTROL,
+    ResponseCache,
+    cached_json_response,
+    compute_etag,
+    get_response_cache,
+)
 
-from .dependencies import get_qa_service, get_question_repository
+from .citation_service import CitationService
+from .dependencies import (
+    get_async_primary_question_repository,
+    get_async_question_repository,
+    get_citation_service,
+    get_qa_service,
+)
 from .models import AnswerResponse, CitationResponse, CreateQuestionRequest, Question, QuestionResponse
 from .qa_service import QAService
-from .repositories import QuestionRepository
+from .repositories import AsyncQuestionRepository
 
 router = APIRouter(prefix="/questions", responses={404: {"description": "Question not found"}}, tags=["questions"])
 
 
-def get_question_from_path(
+async def get_question_from_path(
     question_id: Annotated[uuid.UUID, Path()],
-    question_repository: Annotated[QuestionRepository, Depends(get_question_repository)],
+    question_repository: Annotated[AsyncQuestionRepository, Depends(get_async_question_repository)],
+    primary_question_repository: Annotated[AsyncQuestionRepository, Depends(get_async_primary_question_repository)],
 ) -> Question:
-    question = question_repository.get(question_id)
+    question = await question_repository.get(question_id)
+    if question is None:
+        # a question that was just created might not have been replicated yet
+        question = await primary_question_repository.get(question_id)
     if question is None:
         raise HTTPException(status_code=404, detail="Question not found")
     return question
 
 
+async def get_answer_response(
+    request: Request,
+    question: Question,
+    citation_service: CitationService,
+) -> AnswerResponse:
+    if len(question.answers) == 0:
+        return AnswerResponse(status="in_progress", citations=[])
+
+    answer = question.answers[0]
+    if len(answer.contents) == 0:
+        raise HTTPException(status_code=500, detail="Answer without content pieces should not exist")
+
+    citation_responses: list[CitationResponse] = []
+    for citation in await citation_service.get_citations(answer):
+        url = None
+        if citation.page_id is not None:
+            url = str(request.url_for("get_document_page", document_id=citation.document_id, page_id=citation.page_id))
+        citation_responses.append(
+            CitationResponse(
+                title=citation.title or "Unknown",
+                content=citation.content or "Unknown",
+                url=url,
+            )
+        )
+
+    return AnswerResponse(
+        answer=answer.contents[0].content,
+        language=answer.contents[0].language.strip(),
+        status="completed",
+        citations=citation_responses,
+        created_at=answer.created_at.isoformat(),
+        updated_at=answer.updated_at.isoformat(),
+    )
+
+
+def get_question_etag(request: Request, question: Question) -> tuple[str, str]:
+    """Return the ETag and Cache-Control header of the representations of a question and its answer."""
+    if len(question.answers) == 0:
+        return compute_etag(request, question.id, question.updated_at), PENDING_CACHE_CONTROL
+    answer = question.answers[0]
+    return (
+        compute_etag(request, question.id, question.updated_at, answer.id, answer.updated_at),
+        COMPLETED_CACHE_CONTROL,
+    )
+
+
 @router.post(path="/", status_code=status.HTTP_201_CREATED, response_model=QuestionResponse)
 def create_question(
     request: Request, payload: CreateQuestionRequest, qa_service: Annotated[QAService, Depends(get_qa_service)]
@@ -47,72 +110,52 @@ def create_question(
     )
 
 
-@router.get(path="/{question_id}", response_model=QuestionResponse)
-def get_question(
+@router.get(path="/", response_model=PaginatedResponse[QuestionResponse])
+async def get_questions(
     request: Request,
-    question: Annotated[Question, Depends(get_question_from_path)],
-    document_repository: Annotated[DocumentRepository, Depends(get_document_repository)],
-    embeddings_repository: Annotated[EmbeddingsRepository, Depends(get_embeddings_repository)],
-) -> QuestionResponse:
-    if len(question.answers) == 0:
-        answer_response = AnswerResponse(status="in_progress", citations=[])
-    else:
-        answer = question.answers[0]
-        if len(answer.contents) == 0:
-            raise HTTPException(status_code=500, detail="Answer without content pieces should not exist")
-
-        document_ids = [cit.document_id for cit in answer.citations]
-        embedding_ids = [cit.embeddings_id for cit in answer.citations]
-
-        documents = {
-            doc.id: doc for doc in document_repository.db.query(Document).filter(Document.id.in_(document_ids)).all()
-        }
-        embeddings = {
-            emb.id: emb
-            for emb in embeddings_repository.db.query(Embeddings).filter(Embeddings.id.in_(embedding_ids)).all()
-        }
-
-        citation_responses: list[CitationResponse] = []
-        for cit in answer.citations:
-            doc = documents.get(cit.document_id)
-            emb = embeddings.get(cit.embeddings_id)
-
-            title = doc.name if doc and doc.name else "Unknown"
-            content = emb.chunk if emb and emb.chunk else "Unknown"
-            url = str(
-                request.url_for(
-                    "get_document_page",
-                    document_id=cit.document_id,
-                    page_id=cit.page_id,
-                )
+    question_repository: Annotated[AsyncQuestionRepository, Depends(get_async_question_repository)],
+    after: Annotated[uuid.UUID | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+) -> PaginatedResponse[QuestionResponse]:
+    """List questions without their answers, which are linked by `answer_url`."""
+    questions = await question_repository.get_all_after(after, limit + 1)
+    return PaginatedResponse(
+        items=[
+            QuestionResponse(
+                id=question.id,
+                content=question.content,
+                status="answered" if answered else "pending",
+                answer_url=str(request.url_for("get_answer", question_id=question.id)),
+                created_at=question.created_at.isoformat(),
+                updated_at=question.updated_at.isoformat(),
             )
+            for question, answered in questions[:limit]
+        ],
+        next_cursor=str(questions[limit - 1].question.id) if len(questions) > limit else None,
+    )
 
-            citation_responses.append(
-                CitationResponse(
-                    title=title,
-                    content=content,
-                    url=url,
-                )
-            )
 
-        answer_response = AnswerResponse(
-            answer=answer.contents[0].content,
-            language=answer.contents[0].language.strip(),
-            status="completed",
-            citations=citation_responses,
-            created_at=answer.created_at.isoformat(),
-            updated_at=answer.updated_at.isoformat(),
+@router.get(path="/{question_id}", response_model=QuestionResponse)
+async def get_question(
+    request: Request,
+    question: Annotated[Question, Depends(get_question_from_path)],
+    citation_service: Annotated[CitationService, Depends(get_citation_service)],
+    response_cache: Annotated[ResponseCache | None, Depends(get_response_cache)],
+) -> Response:
+    async def build() -> QuestionResponse:
+        answer_response = await get_answer_response(request, question, citation_service)
+        return QuestionResponse(
+            id=question.id,
+            content=question.content,
+            status="pending" if len(question.answers) == 0 else "answered",
+            answer_url=str(request.url_for("get_answer", question_id=question.id)),
+            created_at=question.created_at.isoformat(),
+            updated_at=question.updated_at.isoformat(),
+            answer=answer_response,
         )
 
-    return QuestionResponse(
-        id=question.id,
-        content=question.content,
-        status="pending" if len(question.answers) == 0 else "answered",
-        answer_url=str(request.url_for("get_answer", question_id=question.id)),
-        created_at=question.created_at.isoformat(),
-        updated_at=question.updated_at.isoformat(),
-        answer=answer_response,
-    )
+    etag, cache_control = get_question_etag(request, question)
+    return await cached_json_response(request, etag, cache_control, build, response_cache)
 
 
 @router.get(
@@ -122,58 +165,14 @@ def get_question(
         500: {"description": "Answer without content pieces should not exist"},
     },
 )
-def get_answer(
+async def get_answer(
     request: Request,
     question: Annotated[Question, Depends(get_question_from_path)],
-    document_repository: Annotated[DocumentRepository, Depends(get_document_repository)],
-    embeddings_repository: Annotated[EmbeddingsRepository, Depends(get_embeddings_repository)],
-) -> AnswerResponse:
-    if len(question.answers) == 0:
-        return AnswerResponse(
-            status="in_progress",
-            citations=[],
-        )
-
-    answer = question.answers[0]
-    if len(answer.contents) == 0:
-        raise HTTPException(status_code=500, detail="Answer without content pieces should not exist")
-
-    document_ids = [cit.document_id for cit in answer.citations]
-    embedding_ids = [cit.embeddings_id for cit in answer.citations]
-
-    documents = {
-        doc.id: doc for doc in document_repository.db.query(Document).filter(Document.id.in_(document_ids)).all()
-    }
-    embeddings = {
-        emb.id: emb for emb in embeddings_repository.db.query(Embeddings).filter(Embeddings.id.in_(embedding_ids)).all()
-    }
-
-    citation_responses: list[CitationResponse] = []
-    for cit in answer.citations:
-        doc = documents.get(cit.document_id)
-        emb = embeddings.get(cit.embeddings_id)
-        title = doc.name if doc and doc.name else "Unknown"
-        content = emb.chunk if emb and emb.chunk else "Unknown"
-        url = str(
-            request.url_for(
-                "get_document_page",
-                document_id=cit.document_id,
-                page_id=cit.page_id,
-            )
-        )
-        citation_responses.append(
-            CitationResponse(
-                title=title,
-                content=content,
-                url=url,
-            )
-        )
-
-    return AnswerResponse(
-        answer=answer.contents[0].content,
-        language=answer.contents[0].language.strip(),
-        status="completed",
-        citations=citation_responses,
-        created_at=answer.created_at.isoformat(),
-        updated_at=answer.updated_at.isoformat(),
-    )
+    citation_service: Annotated[CitationService, Depends(get_citation_service)],
+    response_cache: Annotated[ResponseCache | None, Depends(get_response_cache)],
+) -> Response:
+    async def build() -> AnswerResponse:
+        return await get_answer_response(request, question, citation_service)
+
+    etag, cache_control = get_question_etag(request, question)
+    return await cached_json_response(request, etag, cache_control, build, response_cache)
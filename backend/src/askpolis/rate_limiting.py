@@ -1,38 +1,206 @@
 from __future__ import annotations
 
+import hashlib
+import math
 import os
-from collections.abc import Awaitable, Callable
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
 from typing import Any, Protocol, cast
 
 import redis.asyncio as redis_asyncio
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from pydantic import BaseModel, TypeAdapter
+from redis.exceptions import NoScriptError
+from starlette.requests import HTTPConnection
 from starlette.responses import Response
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from askpolis.env import get_float_env
+from askpolis.logging import get_logger
+
+logger = get_logger(__name__)
 
 # paths that are not rate limited
 EXCLUDED_PATHS = {"/", "/openapi.json", "/healthz", "/readyz"}
 
+# Generic cell rate algorithm (GCRA): the key stores the theoretical arrival time (TAT) of the next request in
+# milliseconds. A request is allowed if it does not push the TAT further than one period into the future, which
+# allows a burst of `limit` requests and then spaces requests evenly instead of resetting at fixed window edges.
+#
+# KEYS[1] - rate limit key
+# ARGV[1] - emission interval in milliseconds (period / limit)
+# ARGV[2] - period in milliseconds
+# ARGV[3] - cost of the request
+# ARGV[4] - cost of requests that were already served without asking Redis, charged even if the request is denied
+#
+# Returns {allowed, retry_after_ms}.
+GCRA_SCRIPT = """
+local emission_interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local spent = tonumber(ARGV[4])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tat = tonumber(redis.call("GET", KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+tat = tat + emission_interval * spent
+local new_tat = tat + emission_interval * cost
+local allow_at = new_tat - period
+if allow_at > now then
+    if spent > 0 then
+        redis.call("SET", KEYS[1], math.floor(tat + 0.5), "PX", math.ceil(tat - now))
+    end
+    return {0, math.ceil(allow_at - now)}
+end
+redis.call("SET", KEYS[1], math.floor(new_tat + 0.5), "PX", math.ceil(new_tat - now))
+return {1, 0}
+"""
+
+GCRA_SCRIPT_SHA = hashlib.sha1(GCRA_SCRIPT.encode()).hexdigest()
+
+
+TRUTHY_QUERY_VALUES = {"1", "true", "on", "yes"}
+
+
+class RateLimitRule(BaseModel):
+    """Separate rate limit budget for requests matching a path pattern.
+
+    A request is charged `cost` tokens plus the extra cost of every listed query parameter that is switched on, e.g.
+    `reranking=true`. Requests not matching any rule are charged against the default budget.
+    """
+
+    name: str
+    pattern: re.Pattern[str]
+    methods: set[str] | None = None
+    limit: int
+    period: int = 60
+    cost: int = 1
+    query_costs: dict[str, int] = {}
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and self.pattern.fullmatch(path) is not None
+
+    def get_cost(self, connection: HTTPConnection) -> int:
+        cost = self.cost
+        for name, extra_cost in self.query_costs.items():
+            if connection.query_params.get(name, "").lower() in TRUTHY_QUERY_VALUES:
+                cost += extra_cost
+        return cost
+
+
+# encoding the query and reranking the results is CPU bound and asking a question enqueues an LLM job,
+# so both get budgets of their own well below the default budget, which keeps cheap reads generous
+DEFAULT_RULES = [
+    RateLimitRule(name="search", pattern=re.compile(r"/v0/search"), limit=20, query_costs={"reranking": 5}),
+    RateLimitRule(name="questions", pattern=re.compile(r"/v0/questions/?"), methods={"POST"}, limit=20, period=3600),
+]
+
+
+def get_rules_from_env() -> list[RateLimitRule] | None:
+    """Read route rules given as JSON list in RATE_LIMIT_RULES, replacing the default rules."""
+    rules = os.getenv("RATE_LIMIT_RULES")
+    if not rules:
+        return None
+    return TypeAdapter(list[RateLimitRule]).validate_json(rules)
+
 
 class RedisLike(Protocol):
-    async def incr(self, key: str) -> int: ...
+    async def script_load(self, script: str) -> str: ...
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: str) -> Any: ...
+
+
+class LocalRateLimiter:
+    """In-process GCRA limiter over a bounded LRU of client keys.
+
+    A process only sees a share of the requests of a client, so a client that is over the limit locally is over the
+    limit globally as well. Clients blocked by Redis are remembered until their retry time so that their requests
+    are rejected without another Redis round trip. The cost of requests served without Redis is kept until it is
+    taken to be charged to the global budget.
+    """
+
+    def __init__(
+        self, limit: int, period: int, max_keys: int = 10_000, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._emission_interval = period * 1000 / limit
+        self._period = period * 1000
+        self._max_keys = max_keys
+        self._clock = clock
+        # key -> (theoretical arrival time, blocked until, cost not charged to Redis yet), times in milliseconds
+        self._states: OrderedDict[str, tuple[float, float, int]] = OrderedDict()
+
+    def acquire(self, key: str, cost: int = 1) -> tuple[bool, int]:
+        now = self._clock() * 1000
+        tat, blocked_until, unsynced = self._states.get(key, (now, 0.0, 0))
+        if blocked_until > now:
+            self._put(key, tat, blocked_until, unsynced)
+            return False, math.ceil(blocked_until - now)
+
+        new_tat = max(tat, now) + self._emission_interval * cost
+        allow_at = new_tat - self._period
+        if allow_at > now:
+            self._put(key, tat, blocked_until, unsynced)
+            return False, math.ceil(allow_at - now)
+        self._put(key, new_tat, blocked_until, unsynced + cost)
+        return True, 0
+
+    def get_usage(self, key: str) -> float:
+        """Share of the burst of `key` that is used up, 0 for an idle client and 1 for a client at its limit."""
+        now = self._clock() * 1000
+        tat, _, _ = self._states.get(key, (now, 0.0, 0))
+        return max(0.0, tat - now) / self._period
+
+    def take_unsynced(self, key: str) -> int:
+        """Take the cost acquired since the last call, limited to what still counts against the burst of `key`."""
+        now = self._clock() * 1000
+        tat, blocked_until, unsynced = self._states.get(key, (now, 0.0, 0))
+        self._put(key, tat, blocked_until, 0)
+        return min(unsynced, math.ceil(max(0.0, tat - now) / self._emission_interval))
 
-    async def expire(self, key: str, ttl: int) -> Any: ...
+    def block(self, key: str, retry_after_ms: int) -> None:
+        now = self._clock() * 1000
+        tat, _, unsynced = self._states.get(key, (now, 0.0, 0))
+        self._put(key, tat, now + retry_after_ms, unsynced)
 
+    def _put(self, key: str, tat: float, blocked_until: float, unsynced: int) -> None:
+        self._states[key] = (tat, blocked_until, unsynced)
+        self._states.move_to_end(key)
+        if len(self._states) > self._max_keys:
+            self._states.popitem(last=False)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple IP-based rate limiting middleware."""
+
+class RateLimitMiddleware:
+    """IP-based rate limiting middleware.
+
+    Implemented as plain ASGI middleware so that it does not wrap every request and response like
+    BaseHTTPMiddleware does. Requests are first checked by a local limiter, which rejects clients that are already
+    over their limit without asking Redis. Only requests of clients that used up more than `redis_threshold` of their
+    budget in this process are checked against the global budget with a Redis round trip running the GCRA script,
+    which is loaded into Redis on startup. The first of these requests also charges the cost of the requests served
+    locally since the last Redis check, so the global budget accounts for all requests while Redis is only asked
+    near the limit. `redis_threshold` is clamped to [0, 1] and can be set with RATE_LIMIT_REDIS_THRESHOLD.
+
+    If Redis fails, it is skipped for `redis_retry_seconds` and the local limiter keeps limiting each process on its
+    own instead of failing open.
+    """
 
     def __init__(
         self,
         app: ASGIApp,
         *,
         redis_client: RedisLike | None = None,
-        limit: int = 5,
+        limit: int = 60,
         period: int = 60,
+        rules: list[RateLimitRule] | None = None,
+        redis_threshold: float = 0.5,
+        redis_retry_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         if redis_client is None:
             url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
             redis_client = cast(RedisLike, cast(Any, redis_asyncio).from_url(url))
@@ -47,37 +215,108 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 pass
         self.limit = limit
         self.period = period
+        self.rules = rules if rules is not None else (get_rules_from_env() or DEFAULT_RULES)
+        self.default_rule = RateLimitRule(name="default", pattern=re.compile(".*"), limit=limit, period=period)
+        self._local_limiters = {
+            rule.name: LocalRateLimiter(rule.limit, rule.period, clock=clock)
+            for rule in [*self.rules, self.default_rule]
+        }
+        self.redis_threshold = min(1.0, max(0.0, get_float_env("RATE_LIMIT_REDIS_THRESHOLD", redis_threshold)))
+        self.redis_retry_seconds = redis_retry_seconds
+        self._clock = clock
+        # Redis is skipped until then after a failure
+        self._redis_unavailable_until: float | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+
+            async def receive_startup() -> Message:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await self.load_script()
+                return message
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-        if request.url.path in EXCLUDED_PATHS:
-            return await call_next(request)
+            await self.app(scope, receive_startup, send)
+            return
 
-        client_ip = self._get_client_ip(request)
-        key = f"rate-limit:{client_ip}"
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        rule = self._get_rule(scope["method"], scope["path"])
+        cost = rule.get_cost(connection)
+        local_limiter = self._local_limiters[rule.name]
+        client_ip = self._get_client_ip(connection)
+        key = f"rate-limit:{client_ip}" if rule is self.default_rule else f"rate-limit:{rule.name}:{client_ip}"
+
+        allowed, retry_after_ms = local_limiter.acquire(key, cost)
+        if allowed and local_limiter.get_usage(key) >= self.redis_threshold and self._is_redis_available():
+            # includes this request, which was acquired locally
+            unsynced = local_limiter.take_unsynced(key)
+            try:
+                allowed, retry_after_ms = await self._acquire(key, rule, cost, max(0, unsynced - cost))
+                if self._redis_unavailable_until is not None:
+                    logger.info("Redis is available again, leaving degraded rate limiting")
+                    self._redis_unavailable_until = None
+            except Exception as e:
+                # keep the decision of the local limiter
+                if self._redis_unavailable_until is None:
+                    logger.warning_with_attrs("Redis is unavailable, rate limiting per process", {"error": e})
+                self._redis_unavailable_until = self._clock() + self.redis_retry_seconds
+            if not allowed:
+                local_limiter.block(key, retry_after_ms)
+        if not allowed:
+            response = Response(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after_ms / 1000)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _is_redis_available(self) -> bool:
+        return self._redis_unavailable_until is None or self._clock() >= self._redis_unavailable_until
+
+    async def load_script(self) -> None:
+        """Load the GCRA script into the script cache of Redis, so that the first requests don't miss it."""
         try:
-            count = await self.redis.incr(key)
-            if count == 1:
-                await self.redis.expire(key, self.period)
-            if count > self.limit:
-                return Response(status_code=HTTP_429_TOO_MANY_REQUESTS)
-        except Exception:
-            # fail open on Redis errors
-            pass
-        return await call_next(request)
-
-    def _get_client_ip(self, request: Request) -> str:
+            await self.redis.script_load(GCRA_SCRIPT)
+        except Exception as e:
+            logger.warning_with_attrs("Failed to load rate limit script", {"error": e})
+
+    def _get_rule(self, method: str, path: str) -> RateLimitRule:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return self.default_rule
+
+    async def _acquire(self, key: str, rule: RateLimitRule, cost: int, spent: int = 0) -> tuple[bool, int]:
+        period_ms = rule.period * 1000
+        args = (key, str(period_ms / rule.limit), str(period_ms), str(cost), str(spent))
+        try:
+            result = await self.redis.evalsha(GCRA_SCRIPT_SHA, 1, *args)
+        except NoScriptError:
+            # the script is loaded at startup, but the script cache is empty after a Redis restart or failover
+            await self.redis.script_load(GCRA_SCRIPT)
+            result = await self.redis.evalsha(GCRA_SCRIPT_SHA, 1, *args)
+        allowed, retry_after_ms = result
+        return bool(int(allowed)), int(retry_after_ms)
+
+    def _get_client_ip(self, connection: HTTPConnection) -> str:
         """Determine the client IP from headers or connection info."""
-        forwarded_for = request.headers.get("x-forwarded-for")
+        forwarded_for = connection.headers.get("x-forwarded-for")
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
-        real_ip = request.headers.get("x-real-ip")
+        real_ip = connection.headers.get("x-real-ip")
         if real_ip:
             return real_ip.strip()
-        forwarded = request.headers.get("forwarded")
+        forwarded = connection.headers.get("forwarded")
         if forwarded:
             forwarded_value = forwarded.split(",")[0].strip()
             for part in forwarded_value.split(";"):
                 clean = part.strip()
                 if clean.lower().startswith("for="):
                     return clean.split("=", 1)[1].strip('"')
-        return request.client.host if request.client else "unknown"
+        return connection.client.host if connection.client else "unknown"
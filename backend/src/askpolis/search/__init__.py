@@ -1,17 +1,32 @@
-from .dependencies import get_embeddings_repository, get_search_service
+from .dependencies import (
+    get_async_embeddings_repository,
+    get_async_search_service,
+    get_embeddings_repository,
+    get_search_service,
+)
 from .embeddings_service import EmbeddingsService, get_embedding_model
 from .models import Embeddings, EmbeddingsCollection, SearchResponse, SearchResult
-from .repositories import EmbeddingsCollectionRepository, EmbeddingsRepository
+from .repositories import (
+    AsyncEmbeddingsCollectionRepository,
+    AsyncEmbeddingsRepository,
+    EmbeddingsCollectionRepository,
+    EmbeddingsRepository,
+)
 from .reranker_service import RerankerService, get_reranker_service
 from .routes import router
-from .search_service import SearchService, SearchServiceBase
+from .search_service import AsyncSearchService, SearchService, SearchServiceBase
 
 __all__ = [
+    "AsyncEmbeddingsCollectionRepository",
+    "AsyncEmbeddingsRepository",
+    "AsyncSearchService",
     "Embeddings",
     "EmbeddingsCollection",
     "EmbeddingsCollectionRepository",
     "EmbeddingsRepository",
     "EmbeddingsService",
+    "get_async_embeddings_repository",
+    "get_async_search_service",
     "get_embedding_model",
     "get_embeddings_repository",
     "get_search_service",
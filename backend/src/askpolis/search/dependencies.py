@@ -1,21 +1,33 @@
 from typing import Annotated
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from askpolis.core import DocumentRepository, MarkdownSplitter
-from askpolis.db import get_db
+from askpolis.db import get_async_read_db, get_db
 
 from .embeddings_service import EmbeddingsService, get_embedding_model
-from .repositories import EmbeddingsCollectionRepository, EmbeddingsRepository
+from .repositories import (
+    AsyncEmbeddingsCollectionRepository,
+    AsyncEmbeddingsRepository,
+    EmbeddingsCollectionRepository,
+    EmbeddingsRepository,
+)
 from .reranker_service import get_reranker_service
-from .search_service import SearchService, SearchServiceBase
+from .search_service import AsyncSearchService, SearchService, SearchServiceBase
 
 
 def get_embeddings_repository(db: Annotated[Session, Depends(get_db)]) -> EmbeddingsRepository:
     return EmbeddingsRepository(db)
 
 
+def get_async_embeddings_repository(
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+) -> AsyncEmbeddingsRepository:
+    return AsyncEmbeddingsRepository(db)
+
+
 def get_search_service(
     db: Annotated[Session, Depends(get_db)],
     embeddings_repository: Annotated[EmbeddingsRepository, Depends(get_embeddings_repository)],
@@ -25,3 +37,12 @@ def get_search_service(
     embeddings_service = EmbeddingsService(document_repository, embeddings_repository, get_embedding_model(), splitter)
     reranker_service = get_reranker_service()
     return SearchService(EmbeddingsCollectionRepository(db), embeddings_service, reranker_service)
+
+
+def get_async_search_service(
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+    embeddings_repository: Annotated[AsyncEmbeddingsRepository, Depends(get_async_embeddings_repository)],
+) -> AsyncSearchService:
+    return AsyncSearchService(
+        AsyncEmbeddingsCollectionRepository(db), embeddings_repository, get_embedding_model(), get_reranker_service()
+    )
@@ -1,4 +1,5 @@
 import os
+import time
 import uuid
 from functools import lru_cache
 from typing import Any, Protocol, TypedDict, cast
@@ -8,6 +9,8 @@ import numpy.typing as npt
 
 from askpolis.core import Document, DocumentRepository, MarkdownSplitter, Page
 from askpolis.logging import get_logger
+from askpolis.metrics import chunks_per_document, embedded_chunks, embedding_duration
+from askpolis.tracing import traced
 
 from .models import Embeddings, EmbeddingsCollection
 from .repositories import EmbeddingsRepository
@@ -31,6 +34,16 @@ def _rrf_merge(
     return merged_results
 
 
+def _fuse_results(
+    collection: EmbeddingsCollection,
+    dense_results: list[tuple[Embeddings, float]],
+    sparse_results: list[tuple[Embeddings, float]],
+    limit: int,
+) -> list[tuple[Embeddings, float]]:
+    with traced("search.rrf_merge", {"collection": collection.name}):
+        return _rrf_merge(dense_results, sparse_results)[:limit]
+
+
 def _get_page(pages: list[Page], chunk_metadata: dict[str, Any]) -> Page:
     if len(pages) == 0:
         raise ValueError("No pages provided")
@@ -92,11 +105,33 @@ class FakeModel:
         return result
 
 
+def _encode_query(model: EmbeddingModel, query: str) -> tuple[list[float], dict[str, float]]:
+    with traced("search.encode"):
+        query_embedding = model.encode(query, return_dense=True, return_sparse=True)
+    return cast(list[float], query_embedding["dense_vecs"].tolist()), query_embedding["lexical_weights"]
+
+
 @lru_cache(maxsize=1)
 def get_embedding_model() -> EmbeddingModel:
     if os.getenv("DISABLE_INFERENCE") == "true":
         return FakeModel()
 
+    inference_url = os.getenv("INFERENCE_URL")
+    if inference_url:
+        from .inference_client import get_inference_client
+
+        return get_inference_client(inference_url)
+    return load_embedding_model()
+
+
+def load_embedding_model() -> EmbeddingModel:
+    """Load BGE-M3 into this process with the backend selected by INFERENCE_BACKEND."""
+    from .onnx_models import BACKEND_ONNX_INT8, BACKEND_TORCH, get_inference_backend, load_onnx_embedding_model
+
+    backend = get_inference_backend()
+    if backend != BACKEND_TORCH:
+        return load_onnx_embedding_model(quantized=backend == BACKEND_ONNX_INT8)
+
     from FlagEmbedding import BGEM3FlagModel
 
     model: EmbeddingModel = BGEM3FlagModel(
@@ -132,15 +167,18 @@ class EmbeddingsService:
             return []
 
         logger.info_with_attrs("Searching for similar documents...", {"collection": collection.name, "limit": limit})
-        query_embedding = self._model.encode(query, return_dense=True, return_sparse=True)
-
-        dense_query_embedding = cast(list[float], query_embedding["dense_vecs"].tolist())
-        sparse_query_embedding: dict[str, float] = query_embedding["lexical_weights"]
-
-        dense_results = self._embeddings_repository.get_all_similar_to(collection, dense_query_embedding, limit * 2)
-        sparse_results = self._embeddings_repository.get_all_similar_to(collection, sparse_query_embedding, limit * 2)
-
-        return _rrf_merge(dense_results, sparse_results)[:limit]
+        dense_query_embedding, sparse_query_embedding = _encode_query(self._model, query)
+
+        attributes = {"collection": collection.name, "limit": limit * 2}
+        with traced("search.dense", attributes) as span:
+            dense_results = self._embeddings_repository.get_all_similar_to(collection, dense_query_embedding, limit * 2)
+            span.set_attribute("candidates", len(dense_results))
+        with traced("search.sparse", attributes) as span:
+            sparse_results = self._embeddings_repository.get_all_similar_to(
+                collection, sparse_query_embedding, limit * 2
+            )
+            span.set_attribute("candidates", len(sparse_results))
+        return _fuse_results(collection, dense_results, sparse_results, limit)
 
     def embed_document(self, collection: EmbeddingsCollection, document: Document) -> list[Embeddings]:
         pages = self._document_repository.get_pages(document.id)
@@ -149,14 +187,16 @@ class EmbeddingsService:
             return []
 
         logger.info_with_attrs("Embedding document...", {"document_id": document.id, "pages": len(pages)})
+        started_at = time.perf_counter()
         chunks = self._splitter.split([page.to_langchain_document() for page in pages])
         logger.info_with_attrs(
             "Split document into chunks, start computing embeddings...",
             {"document_id": document.id, "chunks": len(chunks)},
         )
-        computed_embeddings = self._model.encode_corpus(
-            [chunk.page_content for chunk in chunks], return_dense=True, return_sparse=True
-        )
+        with traced("search.encode_corpus", {"chunks": len(chunks)}):
+            computed_embeddings = self._model.encode_corpus(
+                [chunk.page_content for chunk in chunks], return_dense=True, return_sparse=True
+            )
         embeddings = [
             Embeddings(
                 collection=collection,
@@ -172,7 +212,11 @@ class EmbeddingsService:
                 chunks, computed_embeddings["dense_vecs"], computed_embeddings["lexical_weights"], strict=False
             )
         ]
-        self._embeddings_repository.save_all(embeddings)
+        with traced("search.persist_embeddings", {"embeddings": len(embeddings)}):
+            self._embeddings_repository.save_all(embeddings)
+        embedding_duration.record(time.perf_counter() - started_at)
+        chunks_per_document.record(len(chunks))
+        embedded_chunks.add(len(embeddings))
         logger.info_with_attrs(
             "Saved embeddings for document", {"document_id": document.id, "embeddings": len(embeddings)}
         )
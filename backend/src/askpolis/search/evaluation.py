@@ -0,0 +1,282 @@
+"""Offline evaluation of retrieval quality and latency with the theses and party positions of Real-O-Mat.
+
+Every party position becomes a page of a document of that party and every thesis becomes a query, for which the pages
+with the party positions on it are relevant. The evaluation reports recall@k and MRR next to p50/p95 latency for every
+combination of the given settings:
+
+    python -m askpolis.search.evaluation --chunk-sizes 500,2000 --limits 5,10 --ef-search 40,200 --reranker both
+
+With --dense-indexes, e.g. `vector,prefix-256,binary`, every chunk size is embedded into one collection per dense
+index, which shows the recall lost by compressed indexes on the real embeddings.
+
+Everything is written in one transaction that is rolled back at the end, so the database at DATABASE_URL is left as
+it was. Quality numbers are only meaningful with the real models, i.e. without DISABLE_INFERENCE=true.
+"""
+
+import argparse
+import html
+import json
+import re
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import uuid_utils.compat as uuid
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from askpolis.core import Document, DocumentRepository, DocumentType, MarkdownSplitter, Page
+from askpolis.db import ROLE_WORKER, create_db_engine
+from askpolis.logging import get_logger
+
+from .embeddings_service import EmbeddingModel, EmbeddingsService, get_embedding_model
+from .models import DENSE_INDEX_VECTOR, DENSE_INDEXES, EmbeddingsCollection
+from .repositories import EmbeddingsCollectionRepository, EmbeddingsRepository
+from .reranker_service import RerankerService
+from .search_service import SearchService
+
+logger = get_logger(__name__)
+
+DEFAULT_DATASET = Path(__file__).parents[4] / "data/real-o-mat_license_CC-BY-SA_4.0_downloaded_06022025.json"
+
+_HTML_TAG_REGEX = re.compile(r"<[^>]+>")
+
+
+class Thesis(NamedTuple):
+    id: str
+    category: str
+    thesis: str
+    positions: dict[str, str]
+
+
+class EvaluationQuery(NamedTuple):
+    query: str
+    relevant_page_ids: set[uuid.UUID]
+
+
+class EvaluationResult(NamedTuple):
+    chunk_size: int
+    dense_index: str
+    ef_search: int
+    use_reranker: bool
+    limit: int
+    queries: int
+    recall_at_k: float
+    mrr: float
+    p50_ms: float
+    p95_ms: float
+
+
+def load_theses(path: Path) -> list[Thesis]:
+    content = json.loads(path.read_text())
+    return [
+        Thesis(
+            id=entry["id"],
+            category=entry["category"],
+            thesis=entry["thesis"].strip(),
+            positions={answer["party"]: _strip_html(answer["comment"]) for answer in entry["answers"]},
+        )
+        for entry in content["data"]
+    ]
+
+
+def _strip_html(value: str) -> str:
+    return html.unescape(_HTML_TAG_REGEX.sub("", value)).strip()
+
+
+def create_evaluation_documents(db: Session, theses: list[Thesis]) -> tuple[list[Document], list[EvaluationQuery]]:
+    """Store one document per party with one page per position and return them with the theses as queries."""
+    document_repository = DocumentRepository(db)
+    documents = []
+    relevant_page_ids: dict[str, set[uuid.UUID]] = {thesis.id: set() for thesis in theses}
+    for party in sorted({party for thesis in theses for party in thesis.positions}):
+        document = Document(name=f"Real-O-Mat evaluation {party}", document_type=DocumentType.ELECTION_PROGRAM)
+        document_repository.save(document)
+        pages: list[Page] = []
+        for thesis in theses:
+            if party not in thesis.positions:
+                continue
+            page_number = len(pages) + 1
+            page = Page(
+                document_id=document.id,
+                page_number=page_number,
+                content=f"# {thesis.category}\n\n{thesis.positions[party]}",
+                raw_content=thesis.positions[party],
+                page_metadata={"page": page_number},
+            )
+            pages.append(page)
+            relevant_page_ids[thesis.id].add(page.id)
+        document_repository.add_pages(document, pages)
+        documents.append(document)
+    return documents, [EvaluationQuery(thesis.thesis, relevant_page_ids[thesis.id]) for thesis in theses]
+
+
+def recall_at_k(page_ids: list[uuid.UUID], relevant_page_ids: set[uuid.UUID], k: int) -> float:
+    if len(relevant_page_ids) == 0:
+        return 0.0
+    return len(set(page_ids[:k]) & relevant_page_ids) / len(relevant_page_ids)
+
+
+def reciprocal_rank(page_ids: list[uuid.UUID], relevant_page_ids: set[uuid.UUID]) -> float:
+    return next((1 / rank for rank, page_id in enumerate(page_ids, start=1) if page_id in relevant_page_ids), 0.0)
+
+
+def evaluate(
+    search_service: SearchService,
+    collection_name: str,
+    queries: list[EvaluationQuery],
+    limit: int,
+    use_reranker: bool,
+    chunk_size: int,
+    ef_search: int,
+    dense_index: str = DENSE_INDEX_VECTOR,
+) -> EvaluationResult:
+    recalls = []
+    reciprocal_ranks = []
+    latencies = []
+    for query in queries:
+        started_at = time.perf_counter()
+        results = search_service.find_matching_texts(
+            query.query, limit=limit, use_reranker=use_reranker, indexes=[collection_name]
+        )
+        latencies.append((time.perf_counter() - started_at) * 1000)
+        # several chunks can belong to the same page, relevance is judged per page
+        page_ids = list(dict.fromkeys(result.page_id for result in results))
+        recalls.append(recall_at_k(page_ids, query.relevant_page_ids, limit))
+        reciprocal_ranks.append(reciprocal_rank(page_ids, query.relevant_page_ids))
+
+    return EvaluationResult(
+        chunk_size=chunk_size,
+        dense_index=dense_index,
+        ef_search=ef_search,
+        use_reranker=use_reranker,
+        limit=limit,
+        queries=len(queries),
+        recall_at_k=float(np.mean(recalls)) if recalls else 0.0,
+        mrr=float(np.mean(reciprocal_ranks)) if reciprocal_ranks else 0.0,
+        p50_ms=float(np.percentile(latencies, 50)) if latencies else 0.0,
+        p95_ms=float(np.percentile(latencies, 95)) if latencies else 0.0,
+    )
+
+
+def run_evaluation(
+    db: Session,
+    theses: list[Thesis],
+    model: EmbeddingModel,
+    reranker_service: RerankerService,
+    chunk_sizes: Sequence[int],
+    limits: Sequence[int],
+    ef_searches: Sequence[int],
+    rerankers: Sequence[bool],
+    dense_indexes: Sequence[str] = (DENSE_INDEX_VECTOR,),
+) -> list[EvaluationResult]:
+    documents, queries = create_evaluation_documents(db, theses)
+    collections_repository = EmbeddingsCollectionRepository(db)
+    embeddings_repository = EmbeddingsRepository(db)
+
+    results = []
+    for chunk_size in chunk_sizes:
+        splitter = MarkdownSplitter(chunk_size=chunk_size, chunk_overlap=chunk_size // 5)
+        embeddings_service = EmbeddingsService(DocumentRepository(db), embeddings_repository, model, splitter)
+        search_service = SearchService(collections_repository, embeddings_service, reranker_service)
+        for dense_index in dense_indexes:
+            collection = EmbeddingsCollection(
+                name=f"real-o-mat-evaluation-{chunk_size}-{dense_index}",
+                version="v0",
+                description="Offline evaluation",
+                dense_index=dense_index,
+            )
+            collections_repository.save(collection)
+            for document in documents:
+                embeddings_service.embed_document(collection, document)
+
+            for ef_search in ef_searches:
+                # SET LOCAL lasts until the end of the transaction, which is only rolled back after the evaluation
+                db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+                for use_reranker in rerankers:
+                    for limit in limits:
+                        result = evaluate(
+                            search_service,
+                            collection.name,
+                            queries,
+                            limit,
+                            use_reranker,
+                            chunk_size,
+                            ef_search,
+                            dense_index,
+                        )
+                        logger.info_with_attrs("Evaluated search settings", result._asdict())
+                        results.append(result)
+    return results
+
+
+def format_results(results: list[EvaluationResult]) -> str:
+    lines = [
+        f"{'chunk size':>10} {'dense index':>11} {'ef_search':>9} {'reranker':>8} {'k':>4} {'recall@k':>9} "
+        f"{'MRR':>6} {'p50 ms':>9} {'p95 ms':>9}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.chunk_size:>10} {result.dense_index:>11} {result.ef_search:>9} {str(result.use_reranker):>8} "
+            f"{result.limit:>4} {result.recall_at_k:>9.3f} {result.mrr:>6.3f} "
+            f"{result.p50_ms:>9.1f} {result.p95_ms:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _dense_index_list(value: str) -> list[str]:
+    dense_indexes = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [dense_index for dense_index in dense_indexes if dense_index not in DENSE_INDEXES]
+    if len(unknown) > 0:
+        raise argparse.ArgumentTypeError(f"unknown dense indexes: {', '.join(unknown)}")
+    return dense_indexes
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency with Real-O-Mat theses")
+    parser.add_argument("--dataset", type=Path, default=DEFAULT_DATASET)
+    parser.add_argument("--chunk-sizes", type=_int_list, default=[2000])
+    parser.add_argument("--limits", type=_int_list, default=[5, 10])
+    parser.add_argument("--ef-search", type=_int_list, default=[40])
+    parser.add_argument("--reranker", choices=["on", "off", "both"], default="both")
+    parser.add_argument("--dense-indexes", type=_dense_index_list, default=[DENSE_INDEX_VECTOR])
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    rerankers = {"on": [True], "off": [False], "both": [False, True]}[args.reranker]
+    theses = load_theses(args.dataset)
+    engine = create_db_engine(ROLE_WORKER)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            with Session(bind=connection) as db:
+                results = run_evaluation(
+                    db,
+                    theses,
+                    get_embedding_model(),
+                    # without score cache, as cached scores would hide the latency of the reranker
+                    RerankerService(),
+                    args.chunk_sizes,
+                    args.limits,
+                    args.ef_search,
+                    rerankers,
+                    args.dense_indexes,
+                )
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+    print(format_results(results))
+    if args.output is not None:
+        args.output.write_text(json.dumps([result._asdict() for result in results], indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,62 @@
+from functools import lru_cache
+from typing import Any
+
+import httpx
+import numpy as np
+
+from .embeddings_service import Encoded, EncodedCorpus
+
+UNIX_SOCKET_SCHEME = "unix://"
+
+
+class InferenceClient:
+    """`EmbeddingModel` and `Reranker` sending requests to the inference server of `askpolis.search.inference_server`.
+
+    The URL is either an HTTP URL or `unix://<path>` for a Unix socket. Errors of the server are raised like errors of
+    a local model.
+    """
+
+    def __init__(self, url: str, client: httpx.Client | None = None, timeout: float = 120.0) -> None:
+        if client is None:
+            if url.startswith(UNIX_SOCKET_SCHEME):
+                transport = httpx.HTTPTransport(uds=url.removeprefix(UNIX_SOCKET_SCHEME))
+                client = httpx.Client(base_url="http://inference", transport=transport, timeout=timeout)
+            else:
+                client = httpx.Client(base_url=url, timeout=timeout)
+        self._client = client
+
+    def encode(self, text: str, return_dense: bool = True, return_sparse: bool = True) -> Encoded:
+        encoded = self._post("/v0/encode", {"text": text})
+        result: Encoded = {}
+        if return_dense:
+            result["dense_vecs"] = np.array(encoded["dense_vecs"], dtype=np.float32)
+        if return_sparse:
+            result["lexical_weights"] = encoded["lexical_weights"]
+        return result
+
+    def encode_corpus(self, texts: list[str], return_dense: bool = True, return_sparse: bool = True) -> EncodedCorpus:
+        results = self._post("/v0/encode_corpus", {"texts": texts})["results"]
+        corpus: EncodedCorpus = {}
+        if return_dense:
+            corpus["dense_vecs"] = [np.array(result["dense_vecs"], dtype=np.float32) for result in results]
+        if return_sparse:
+            corpus["lexical_weights"] = [result["lexical_weights"] for result in results]
+        return corpus
+
+    def compute_score(
+        self, sentence_pairs: list[tuple[str, str]], batch_size: int, max_length: int, normalize: bool
+    ) -> list[float]:
+        # the server batches pairs of all clients itself, so the batch size is not sent
+        response = self._post("/v0/rerank", {"pairs": sentence_pairs, "max_length": max_length, "normalize": normalize})
+        return [float(score) for score in response["scores"]]
+
+    def _post(self, path: str, body: dict[str, Any]) -> dict[str, Any]:
+        response = self._client.post(path, json=body)
+        response.raise_for_status()
+        result: dict[str, Any] = response.json()
+        return result
+
+
+@lru_cache(maxsize=4)
+def get_inference_client(url: str) -> InferenceClient:
+    return InferenceClient(url)
@@ -0,0 +1,224 @@
+"""Inference server owning BGE-M3 and the reranker for all API and worker processes of a node.
+
+    uvicorn askpolis.search.inference_server:app --uds /tmp/askpolis-inference.sock
+
+Clients set INFERENCE_URL to `unix:///tmp/askpolis-inference.sock` or to the HTTP URL of the server. Concurrent
+requests are collected for up to INFERENCE_MAX_WAIT_MS and run through the model as one batch of at most
+INFERENCE_MAX_BATCH_SIZE texts or pairs. Queries are batched separately from corpus texts and encoded one by one with
+`encode`, so that they get the same embeddings as with a local model.
+"""
+
+import asyncio
+import os
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Generic, TypeVar
+
+import numpy as np
+import numpy.typing as npt
+from fastapi import FastAPI, Request
+from pydantic import BaseModel
+
+from askpolis.env import get_int_env
+from askpolis.logging import get_logger
+from askpolis.tracing import traced
+
+from .embeddings_service import EmbeddingModel, FakeModel, load_embedding_model
+from .reranker_service import Reranker, load_reranker
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class DynamicBatcher(Generic[T, R]):
+    """Collects items submitted concurrently into batches processed one after another in a worker thread.
+
+    A batch is closed once it has `max_batch_size` items or `max_wait_seconds` passed since its first item.
+    """
+
+    def __init__(
+        self, name: str, process: Callable[[list[T]], list[R]], max_batch_size: int, max_wait_seconds: float
+    ) -> None:
+        self._name = name
+        self._process = process
+        self._max_batch_size = max_batch_size
+        self._max_wait_seconds = max_wait_seconds
+        self._queue: asyncio.Queue[tuple[T, asyncio.Future[R]]] = asyncio.Queue()
+        self._worker: asyncio.Task[None] | None = None
+
+    async def submit(self, items: list[T]) -> list[R]:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        loop = asyncio.get_running_loop()
+        futures: list[asyncio.Future[R]] = []
+        for item in items:
+            future = loop.create_future()
+            self._queue.put_nowait((item, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait_seconds
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            try:
+                with traced(f"inference.{self._name}", {"batch_size": len(batch)}):
+                    results = await asyncio.to_thread(self._process, [item for item, _ in batch])
+                completed = list(zip(batch, results, strict=True))
+            except Exception as e:
+                logger.error_with_attrs("Failed to process batch", {"batcher": self._name, "error": e})
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in completed:
+                if not future.done():
+                    future.set_result(result)
+
+
+class EncodeRequest(BaseModel):
+    text: str
+
+
+class EncodeCorpusRequest(BaseModel):
+    texts: list[str]
+
+
+class EncodedText(BaseModel):
+    dense_vecs: list[float]
+    lexical_weights: dict[str, float]
+
+
+class EncodeCorpusResponse(BaseModel):
+    results: list[EncodedText]
+
+
+class RerankRequest(BaseModel):
+    pairs: list[tuple[str, str]]
+    max_length: int = 512
+    normalize: bool = True
+
+
+class RerankResponse(BaseModel):
+    scores: list[float]
+
+
+class InferenceModels:
+    def __init__(self, model: EmbeddingModel, reranker: Reranker, max_batch_size: int, max_wait_seconds: float):
+        self.model = model
+        self.reranker = reranker
+        self.query_encoder = DynamicBatcher("encode", self._encode_queries, max_batch_size, max_wait_seconds)
+        self.corpus_encoder = DynamicBatcher("encode_corpus", self._encode_corpus, max_batch_size, max_wait_seconds)
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        # pairs are truncated per batch, so there is one batcher per maximum length
+        self.rerankers: dict[int, DynamicBatcher[tuple[str, str], float]] = {}
+
+    def get_reranker(self, max_length: int) -> DynamicBatcher[tuple[str, str], float]:
+        if max_length not in self.rerankers:
+            self.rerankers[max_length] = DynamicBatcher(
+                "rerank",
+                lambda pairs: self._rerank(pairs, max_length),
+                self.max_batch_size,
+                self.max_wait_seconds,
+            )
+        return self.rerankers[max_length]
+
+    async def close(self) -> None:
+        await self.query_encoder.close()
+        await self.corpus_encoder.close()
+        for batcher in self.rerankers.values():
+            await batcher.close()
+
+    def _encode_queries(self, texts: list[str]) -> list[EncodedText]:
+        results = []
+        for text in texts:
+            encoded = self.model.encode(text, return_dense=True, return_sparse=True)
+            results.append(_to_encoded_text(encoded["dense_vecs"], encoded["lexical_weights"]))
+        return results
+
+    def _encode_corpus(self, texts: list[str]) -> list[EncodedText]:
+        encoded = self.model.encode_corpus(texts, return_dense=True, return_sparse=True)
+        return [
+            _to_encoded_text(dense_vector, lexical_weights)
+            for dense_vector, lexical_weights in zip(encoded["dense_vecs"], encoded["lexical_weights"], strict=True)
+        ]
+
+    def _rerank(self, pairs: list[tuple[str, str]], max_length: int) -> list[float]:
+        # scores are normalised per request, so batches can mix requests with and without normalisation
+        scores = self.reranker.compute_score(pairs, batch_size=len(pairs), max_length=max_length, normalize=False)
+        return [float(score) for score in (scores if isinstance(scores, list) else [scores])]
+
+
+def _to_encoded_text(dense_vector: npt.NDArray[np.float32], lexical_weights: dict[str, float]) -> EncodedText:
+    return EncodedText(
+        dense_vecs=dense_vector.tolist(),
+        lexical_weights={token: float(weight) for token, weight in lexical_weights.items()},
+    )
+
+
+def load_inference_models() -> InferenceModels:
+    model = FakeModel() if os.getenv("DISABLE_INFERENCE") == "true" else load_embedding_model()
+    reranker, _ = load_reranker()
+    return InferenceModels(
+        model,
+        reranker,
+        max_batch_size=max(1, get_int_env("INFERENCE_MAX_BATCH_SIZE", 32)),
+        max_wait_seconds=max(0, get_int_env("INFERENCE_MAX_WAIT_MS", 10)) / 1000,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    logger.info("Loading inference models...")
+    app.state.models = load_inference_models()
+    yield
+    await app.state.models.close()
+
+
+app = FastAPI(lifespan=lifespan, docs_url=None, redoc_url=None)
+
+
+def _get_models(request: Request) -> InferenceModels:
+    models: InferenceModels = request.app.state.models
+    return models
+
+
+@app.post("/v0/encode")
+async def encode(request: Request, body: EncodeRequest) -> EncodedText:
+    (result,) = await _get_models(request).query_encoder.submit([body.text])
+    return result
+
+
+@app.post("/v0/encode_corpus")
+async def encode_corpus(request: Request, body: EncodeCorpusRequest) -> EncodeCorpusResponse:
+    return EncodeCorpusResponse(results=await _get_models(request).corpus_encoder.submit(body.texts))
+
+
+@app.post("/v0/rerank")
+async def rerank(request: Request, body: RerankRequest) -> RerankResponse:
+    scores = np.array(await _get_models(request).get_reranker(body.max_length).submit(body.pairs))
+    if body.normalize:
+        scores = 1 / (1 + np.exp(-scores))
+    return RerankResponse(scores=scores.tolist())
+
+
+@app.get("/healthz", include_in_schema=False)
+def liveness_probe() -> dict[str, bool]:
+    return {"healthy": True}
@@ -1,4 +1,5 @@
 import datetime
+import os
 from typing import Any
 
 import uuid_utils.compat as uuid
@@ -15,6 +16,32 @@ from askpolis.logging import get_logger
 
 logger = get_logger(__name__)
 
+DENSE_DIMENSIONS = 1024
+
+DENSE_INDEX_VECTOR = "vector"
+DENSE_INDEX_HALFVEC = "halfvec"
+DENSE_INDEX_BINARY = "binary"
+DENSE_INDEX_PREFIX_256 = "prefix-256"
+DENSE_INDEX_PREFIX_512 = "prefix-512"
+DENSE_INDEXES = (
+    DENSE_INDEX_VECTOR,
+    DENSE_INDEX_HALFVEC,
+    DENSE_INDEX_BINARY,
+    DENSE_INDEX_PREFIX_256,
+    DENSE_INDEX_PREFIX_512,
+)
+# leading dimensions of the vectors indexed by the prefix indexes
+DENSE_PREFIX_DIMENSIONS = {DENSE_INDEX_PREFIX_256: 256, DENSE_INDEX_PREFIX_512: 512}
+
+
+def get_default_dense_index() -> str:
+    """Dense index of new collections, configured with EMBEDDINGS_DENSE_INDEX."""
+    dense_index = os.getenv("EMBEDDINGS_DENSE_INDEX", DENSE_INDEX_VECTOR).lower()
+    if dense_index not in DENSE_INDEXES:
+        logger.warning_with_attrs("Unknown dense index, using vector", {"dense_index": dense_index})
+        return DENSE_INDEX_VECTOR
+    return dense_index
+
 
 def convert_to_sparse_vector(lexical_weights: dict[str, float]) -> SparseVector:
     """Convert BGE-M3 lexical weights to PGVector SparseVector."""
@@ -27,7 +54,7 @@ def convert_to_sparse_vector(lexical_weights: dict[str, float]) -> SparseVector:
         if 1 <= idx <= max_dim:
             validated.append((idx, weight))
         else:
-            logger.warning(f"Token index is out of bounds: 1 <= {idx} <= {max_dim}")
+            logger.warning_with_attrs("Token index is out of bounds", {"index": idx, "max_dim": max_dim})
 
     sorted_entries = sorted(validated, key=lambda x: x[0])
     entries = [f"{k}:{v:.9f}" for k, v in sorted_entries]
@@ -35,20 +62,45 @@ def convert_to_sparse_vector(lexical_weights: dict[str, float]) -> SparseVector:
 
 
 class EmbeddingsCollection(Base):
+    """Versioned set of embeddings, whose dense vectors are searched with one of the HNSW indexes in `DENSE_INDEXES`.
+
+    `vector` searches the fp32 vectors directly. `halfvec` and `binary` search an index on the vectors cast to half
+    precision or quantised to one bit per dimension, which is two or 32 times smaller, `prefix-256` and `prefix-512` an
+    index on the leading dimensions of the vectors. All of them rescore the candidates exactly with the fp32 vectors,
+    `rescore_factor` candidates per requested result or a default of the index if it is not set. The index of a
+    collection can't change, a new version has to be created instead.
+    """
+
     __tablename__ = "embeddings_collections"
 
-    def __init__(self, name: str, version: str, description: str, **kw: Any) -> None:
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        description: str,
+        dense_index: str = DENSE_INDEX_VECTOR,
+        rescore_factor: int | None = None,
+        **kw: Any,
+    ) -> None:
         super().__init__(**kw)
+        if dense_index not in DENSE_INDEXES:
+            raise ValueError(f"Unsupported dense index: {dense_index}")
+        if rescore_factor is not None and rescore_factor < 1:
+            raise ValueError(f"Rescore factor must be at least 1: {rescore_factor}")
         self.id = uuid.uuid7()
         self.name = name
         self.version = version
         self.description = description
+        self.dense_index = dense_index
+        self.rescore_factor = rescore_factor
         self.created_at = datetime.datetime.now(datetime.UTC)
 
     id: Mapped[uuid.UUID] = mapped_column(DB_UUID(as_uuid=True), primary_key=True)
     name = mapped_column(String, nullable=False)
     version = mapped_column(String, nullable=False)
     description = mapped_column(String, nullable=False)
+    dense_index: Mapped[str] = mapped_column(String, nullable=False, server_default=DENSE_INDEX_VECTOR)
+    rescore_factor: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at = mapped_column(DateTime, nullable=False, default=lambda: datetime.datetime.now(datetime.UTC))
 
 
@@ -77,6 +129,7 @@ class Embeddings(Base):
         self.embedding = embedding
         self.sparse_embedding = convert_to_sparse_vector(sparse_embedding)
         self.chunk_metadata = chunk_metadata
+        self.dense_index = collection.dense_index
         self.created_at = datetime.datetime.now(datetime.UTC)
 
     id: Mapped[uuid.UUID] = mapped_column(DB_UUID(as_uuid=True), primary_key=True)
@@ -87,9 +140,11 @@ class Embeddings(Base):
     page_id: Mapped[uuid.UUID] = mapped_column(DB_UUID(as_uuid=True), ForeignKey("pages.id"), nullable=False)
     chunk: Mapped[str] = mapped_column(String, nullable=False)
     chunk_id: Mapped[int] = mapped_column(Integer, nullable=False)
-    embedding: Mapped[list[float]] = mapped_column(Vector(1024), nullable=False)
+    embedding: Mapped[list[float]] = mapped_column(Vector(DENSE_DIMENSIONS), nullable=False)
     sparse_embedding: Mapped[SparseVector] = mapped_column(SPARSEVEC(250002), nullable=False)
     chunk_metadata: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    # copied from the collection, so that every dense index is a partial index on the chunks it is used for
+    dense_index: Mapped[str] = mapped_column(String, nullable=False, server_default=DENSE_INDEX_VECTOR)
     created_at = mapped_column(DateTime, nullable=False, default=lambda: datetime.datetime.now(datetime.UTC))
 
 
@@ -0,0 +1,109 @@
+"""Export BGE-M3 and the reranker to ONNX for the `onnx` and `onnx-int8` inference backends.
+
+    python -m askpolis.search.onnx_export --output-dir /app/models/onnx
+
+The ONNX files published with BGE-M3 only contain the encoder, so the export includes the sparse head needed for the
+lexical weights. Exporting needs PyTorch and the Hugging Face models, running the exported models does not. Every model
+is also quantised to int8 with dynamic quantisation of its weights.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any
+
+from askpolis.logging import get_logger
+
+from .onnx_models import EMBEDDING_MODEL_DIR, MODEL_FILE, QUANTIZED_MODEL_FILE, RERANKER_MODEL_DIR
+
+logger = get_logger(__name__)
+
+EMBEDDING_MODEL = "BAAI/bge-m3"
+RERANKER_MODEL = "BAAI/bge-reranker-v2-m3"
+OPSET_VERSION = 17
+
+
+def export_embedding_model(output_dir: Path) -> Path:
+    import torch
+    from huggingface_hub import hf_hub_download
+    from transformers import AutoModel, AutoTokenizer
+
+    class BgeM3(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.encoder = AutoModel.from_pretrained(EMBEDDING_MODEL)
+            self.sparse_linear = torch.nn.Linear(self.encoder.config.hidden_size, 1)
+            self.sparse_linear.load_state_dict(
+                torch.load(hf_hub_download(EMBEDDING_MODEL, "sparse_linear.pt"), map_location="cpu")
+            )
+
+        def forward(self, input_ids: Any, attention_mask: Any) -> tuple[Any, Any]:
+            hidden_state = self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+            dense_vecs = torch.nn.functional.normalize(hidden_state[:, 0], dim=-1)
+            token_weights = torch.relu(self.sparse_linear(hidden_state)).squeeze(-1)
+            return dense_vecs, token_weights
+
+    model_dir = output_dir / EMBEDDING_MODEL_DIR
+    model_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL)
+    tokenizer.save_pretrained(model_dir)
+    _export(BgeM3().eval(), tokenizer(["Beispiel"], return_tensors="pt"), ["dense_vecs", "token_weights"], model_dir)
+    return model_dir
+
+
+def export_reranker(output_dir: Path) -> Path:
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    class Reranker(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.model = AutoModelForSequenceClassification.from_pretrained(RERANKER_MODEL)
+
+        def forward(self, input_ids: Any, attention_mask: Any) -> Any:
+            return self.model(input_ids=input_ids, attention_mask=attention_mask).logits.view(-1)
+
+    model_dir = output_dir / RERANKER_MODEL_DIR
+    model_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(RERANKER_MODEL)
+    tokenizer.save_pretrained(model_dir)
+    _export(Reranker().eval(), tokenizer(["Frage"], ["Antwort"], return_tensors="pt"), ["logits"], model_dir)
+    return model_dir
+
+
+def _export(model: Any, sample_inputs: Any, output_names: list[str], model_dir: Path) -> None:
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model_path = model_dir / MODEL_FILE
+    logger.info_with_attrs("Exporting model to ONNX...", {"path": model_path})
+    dynamic_axes = {"input_ids": {0: "batch", 1: "sequence"}, "attention_mask": {0: "batch", 1: "sequence"}}
+    for name in output_names:
+        dynamic_axes[name] = {0: "batch", 1: "sequence"} if name == "token_weights" else {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample_inputs["input_ids"], sample_inputs["attention_mask"]),
+            str(model_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=output_names,
+            dynamic_axes=dynamic_axes,
+            opset_version=OPSET_VERSION,
+        )
+
+    quantized_path = model_dir / QUANTIZED_MODEL_FILE
+    logger.info_with_attrs("Quantising model to int8...", {"path": quantized_path})
+    quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export the embedding model and the reranker to ONNX")
+    parser.add_argument("--output-dir", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    export_embedding_model(args.output_dir)
+    export_reranker(args.output_dir)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,184 @@
+"""BGE-M3 and the reranker on ONNX Runtime, selected with INFERENCE_BACKEND.
+
+INFERENCE_BACKEND is `torch` (default), `onnx` or `onnx-int8`. The ONNX backends load the models exported by
+`askpolis.search.onnx_export` from ONNX_MODELS_DIR, `onnx-int8` the dynamically quantised variants. They only need
+onnxruntime and a tokenizer, no PyTorch.
+"""
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import numpy.typing as npt
+from transformers import AutoTokenizer
+
+from askpolis.env import get_int_env
+from askpolis.logging import get_logger
+
+if TYPE_CHECKING:
+    # the export in the Docker build only has the ONNX modules, not the rest of the package
+    from .embeddings_service import Encoded, EncodedCorpus
+
+logger = get_logger(__name__)
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+BACKEND_ONNX_INT8 = "onnx-int8"
+
+EMBEDDING_MODEL_DIR = "bge-m3"
+RERANKER_MODEL_DIR = "bge-reranker-v2-m3"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+
+
+def get_inference_backend() -> str:
+    backend = os.getenv("INFERENCE_BACKEND", BACKEND_TORCH).lower()
+    if backend not in (BACKEND_TORCH, BACKEND_ONNX, BACKEND_ONNX_INT8):
+        logger.warning_with_attrs("Unknown inference backend, using torch", {"backend": backend})
+        return BACKEND_TORCH
+    return backend
+
+
+def get_onnx_models_dir() -> Path:
+    return Path(os.getenv("ONNX_MODELS_DIR") or Path(os.getenv("HF_HOME", ".")) / "onnx")
+
+
+def create_session(model_path: Path) -> Any:
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = get_int_env("ONNX_NUM_THREADS", 0)
+    return ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def _batches_by_length(texts: list[str], batch_size: int) -> list[list[int]]:
+    # texts of similar length are batched together, so they are padded as little as possible
+    by_length = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    return [by_length[i : i + batch_size] for i in range(0, len(by_length), batch_size)]
+
+
+class OnnxEmbeddingModel:
+    """`EmbeddingModel` computing the dense and lexical weights of BGE-M3 like `BGEM3FlagModel`.
+
+    The exported graph returns the normalised CLS embedding as `dense_vecs` and the ReLU of the sparse head per token
+    as `token_weights`. Like FlagEmbedding, the lexical weight of a token is the maximum over its occurrences and
+    special tokens are left out.
+    """
+
+    def __init__(self, session: Any, tokenizer: Any, max_length: int = 8192, batch_size: int = 8) -> None:
+        self._session = session
+        self._tokenizer = tokenizer
+        self._max_length = max_length
+        self._batch_size = batch_size
+        self._special_token_ids = {
+            token_id
+            for token_id in (
+                tokenizer.cls_token_id,
+                tokenizer.eos_token_id,
+                tokenizer.pad_token_id,
+                tokenizer.unk_token_id,
+            )
+            if token_id is not None
+        }
+
+    def encode(self, text: str, return_dense: bool = True, return_sparse: bool = True) -> "Encoded":
+        corpus = self.encode_corpus([text], return_dense=return_dense, return_sparse=return_sparse)
+        result: Encoded = {}
+        if return_dense:
+            result["dense_vecs"] = corpus["dense_vecs"][0]
+        if return_sparse:
+            result["lexical_weights"] = corpus["lexical_weights"][0]
+        return result
+
+    def encode_corpus(self, texts: list[str], return_dense: bool = True, return_sparse: bool = True) -> "EncodedCorpus":
+        dense_vecs: list[npt.NDArray[np.float32]] = [np.empty(0, dtype=np.float32)] * len(texts)
+        lexical_weights: list[dict[str, float]] = [{}] * len(texts)
+        for batch in _batches_by_length(texts, self._batch_size):
+            inputs = self._tokenizer(
+                [texts[i] for i in batch],
+                padding=True,
+                truncation=True,
+                max_length=self._max_length,
+                return_tensors="np",
+            )
+            dense, token_weights = self._session.run(
+                ["dense_vecs", "token_weights"],
+                {"input_ids": inputs["input_ids"], "attention_mask": inputs["attention_mask"]},
+            )
+            for row, i in enumerate(batch):
+                dense_vecs[i] = dense[row].astype(np.float32)
+                lexical_weights[i] = self._to_lexical_weights(
+                    inputs["input_ids"][row], inputs["attention_mask"][row], token_weights[row]
+                )
+
+        result: EncodedCorpus = {}
+        if return_dense:
+            result["dense_vecs"] = dense_vecs
+        if return_sparse:
+            result["lexical_weights"] = lexical_weights
+        return result
+
+    def _to_lexical_weights(
+        self, input_ids: npt.NDArray[np.int64], attention_mask: npt.NDArray[np.int64], weights: npt.NDArray[np.float32]
+    ) -> dict[str, float]:
+        lexical_weights: dict[str, float] = {}
+        for token_id, mask, weight in zip(input_ids.tolist(), attention_mask.tolist(), weights.tolist(), strict=True):
+            if mask == 0 or token_id in self._special_token_ids or weight <= 0:
+                continue
+            key = str(token_id)
+            if weight > lexical_weights.get(key, 0.0):
+                lexical_weights[key] = float(weight)
+        return lexical_weights
+
+
+class OnnxReranker:
+    """`Reranker` on the exported cross-encoder, which returns one logit per pair like `FlagReranker`."""
+
+    def __init__(self, session: Any, tokenizer: Any) -> None:
+        self._session = session
+        self._tokenizer = tokenizer
+
+    def compute_score(
+        self, sentence_pairs: list[tuple[str, str]], batch_size: int, max_length: int, normalize: bool
+    ) -> list[float]:
+        scores: list[float] = []
+        for start in range(0, len(sentence_pairs), batch_size):
+            batch = sentence_pairs[start : start + batch_size]
+            inputs = self._tokenizer(
+                [query for query, _ in batch],
+                [passage for _, passage in batch],
+                padding=True,
+                truncation="only_second",
+                max_length=max_length,
+                return_tensors="np",
+            )
+            (logits,) = self._session.run(
+                ["logits"], {"input_ids": inputs["input_ids"], "attention_mask": inputs["attention_mask"]}
+            )
+            logits = np.asarray(logits, dtype=np.float32).reshape(-1)
+            if normalize:
+                logits = 1 / (1 + np.exp(-logits))
+            scores.extend(float(score) for score in logits)
+        return scores
+
+
+def _get_model_path(model_dir: str, quantized: bool) -> Path:
+    return get_onnx_models_dir() / model_dir / (QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+
+
+def load_onnx_embedding_model(quantized: bool) -> OnnxEmbeddingModel:
+    model_path = _get_model_path(EMBEDDING_MODEL_DIR, quantized)
+    logger.info_with_attrs("Loading ONNX embedding model...", {"path": model_path})
+    return OnnxEmbeddingModel(
+        create_session(model_path),
+        AutoTokenizer.from_pretrained(model_path.parent),
+        batch_size=max(1, get_int_env("ONNX_BATCH_SIZE", 8)),
+    )
+
+
+def load_onnx_reranker(quantized: bool) -> OnnxReranker:
+    model_path = _get_model_path(RERANKER_MODEL_DIR, quantized)
+    logger.info_with_attrs("Loading ONNX reranker...", {"path": model_path})
+    return OnnxReranker(create_session(model_path), AutoTokenizer.from_pretrained(model_path.parent))
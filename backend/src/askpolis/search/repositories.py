@@ -1,15 +1,130 @@
 import uuid
 
-from sqlalchemy import select
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import ColumnElement, Integer, Select, String, TextClause, cast, func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from askpolis.core import Document
 from askpolis.logging import get_logger
 
-from .models import Embeddings, EmbeddingsCollection, convert_to_sparse_vector
+from .models import (
+    DENSE_DIMENSIONS,
+    DENSE_INDEX_BINARY,
+    DENSE_INDEX_HALFVEC,
+    DENSE_INDEX_PREFIX_256,
+    DENSE_INDEX_PREFIX_512,
+    DENSE_INDEX_VECTOR,
+    DENSE_PREFIX_DIMENSIONS,
+    Embeddings,
+    EmbeddingsCollection,
+    convert_to_sparse_vector,
+)
 
 logger = get_logger(__name__)
 
+# default of candidates fetched from a compressed index per requested result, before they are rescored with the fp32
+# vectors, collections can override it with their rescore_factor
+RESCORE_CANDIDATES_FACTOR = {
+    DENSE_INDEX_HALFVEC: 2,
+    DENSE_INDEX_BINARY: 10,
+    DENSE_INDEX_PREFIX_256: 10,
+    DENSE_INDEX_PREFIX_512: 5,
+}
+
+HNSW_MAX_EF_SEARCH = 1000
+
+
+def _has_dense_index(dense_index: str) -> ColumnElement[bool]:
+    # rendered as a literal, otherwise generic plans of prepared statements can't use the partial indexes
+    return Embeddings.dense_index == literal(dense_index, String, literal_execute=True)
+
+
+def _quantize(query_vector: list[float]) -> str:
+    # like binary_quantize of pgvector, positive dimensions are set
+    return "".join("1" if value > 0 else "0" for value in query_vector)
+
+
+def _get_rescore_candidates(collection: EmbeddingsCollection, limit: int) -> int:
+    return limit * (collection.rescore_factor or RESCORE_CANDIDATES_FACTOR[collection.dense_index])
+
+
+def _coarse_distance(dense_index: str, query_vector: list[float]) -> ColumnElement[float]:
+    """Distance of the compressed index, the expressions have to match the ones of the partial indexes."""
+    distance: ColumnElement[float]
+    if dense_index == DENSE_INDEX_HALFVEC:
+        distance = cast(Embeddings.embedding, HALFVEC(DENSE_DIMENSIONS)).cosine_distance(query_vector)
+    elif dense_index == DENSE_INDEX_BINARY:
+        distance = cast(func.binary_quantize(Embeddings.embedding), BIT(DENSE_DIMENSIONS)).hamming_distance(
+            cast(literal(_quantize(query_vector), String), BIT(DENSE_DIMENSIONS))
+        )
+    elif dense_index in DENSE_PREFIX_DIMENSIONS:
+        dimensions = DENSE_PREFIX_DIMENSIONS[dense_index]
+        prefix = func.subvector(
+            Embeddings.embedding,
+            literal(1, Integer, literal_execute=True),
+            literal(dimensions, Integer, literal_execute=True),
+        )
+        # cosine distance normalises both vectors, so the prefixes don't have to be normalised again
+        distance = cast(prefix, Vector(dimensions)).cosine_distance(query_vector[:dimensions])
+    else:
+        raise ValueError(f"Unsupported dense index: {dense_index}")
+    return distance
+
+
+def _select_rescored(
+    collection: EmbeddingsCollection, query_vector: list[float], limit: int
+) -> Select[tuple[Embeddings, float]]:
+    candidates = (
+        select(Embeddings.id)
+        .filter(Embeddings.collection_id == collection.id, _has_dense_index(collection.dense_index))
+        .order_by(_coarse_distance(collection.dense_index, query_vector))
+        .limit(_get_rescore_candidates(collection, limit))
+    )
+    distance = Embeddings.embedding.cosine_distance(query_vector)
+    return (
+        select(Embeddings, (1.0 - distance).label("score"))
+        .filter(Embeddings.id.in_(candidates.scalar_subquery()))
+        .order_by(distance)
+        .limit(limit)
+    )
+
+
+def _set_ef_search(
+    collection: EmbeddingsCollection, query_vector: list[float] | dict[str, float], limit: int
+) -> TextClause | None:
+    """Raise hnsw.ef_search for the transaction, if the candidates to rescore are more than an HNSW scan returns."""
+    if not isinstance(query_vector, list) or collection.dense_index not in RESCORE_CANDIDATES_FACTOR:
+        return None
+    candidates = min(_get_rescore_candidates(collection, limit), HNSW_MAX_EF_SEARCH)
+    return text(
+        "SELECT set_config('hnsw.ef_search', "
+        "greatest(coalesce(nullif(current_setting('hnsw.ef_search', true), ''), '40')::int, :candidates)::text, true)"
+    ).bindparams(candidates=candidates)
+
+
+def _select_similar_to(
+    collection: EmbeddingsCollection, query_vector: list[float] | dict[str, float], limit: int
+) -> Select[tuple[Embeddings, float]]:
+    if isinstance(query_vector, list):
+        if collection.dense_index != DENSE_INDEX_VECTOR:
+            return _select_rescored(collection, query_vector, limit)
+        return (
+            select(Embeddings, 1.0 - Embeddings.embedding.cosine_distance(query_vector).label("score"))
+            .filter(Embeddings.collection_id == collection.id, _has_dense_index(DENSE_INDEX_VECTOR))
+            .order_by(Embeddings.embedding.cosine_distance(query_vector))
+            .limit(limit)
+        )
+    if isinstance(query_vector, dict):
+        sparse_vector = convert_to_sparse_vector(query_vector)
+        return (
+            select(Embeddings, 1.0 - Embeddings.sparse_embedding.cosine_distance(sparse_vector).label("score"))
+            .filter(Embeddings.collection_id == collection.id)
+            .order_by(Embeddings.sparse_embedding.cosine_distance(sparse_vector))
+            .limit(limit)
+        )
+    raise ValueError("Unsupported query_vector type")
+
 
 class EmbeddingsCollectionRepository:
     def __init__(self, db: Session):
@@ -47,29 +162,49 @@ class EmbeddingsRepository:
         if limit <= 0:
             return []
 
-        if isinstance(query_vector, list):
-            results = self.db.execute(
-                select(Embeddings, 1.0 - Embeddings.embedding.cosine_distance(query_vector).label("score"))
-                .filter(Embeddings.collection_id == collection.id)
-                .order_by(Embeddings.embedding.cosine_distance(query_vector))
-                .limit(limit)
-            ).all()
-        elif isinstance(query_vector, dict):
-            sparse_vector = convert_to_sparse_vector(query_vector)
-            results = self.db.execute(
-                select(Embeddings, 1.0 - Embeddings.sparse_embedding.cosine_distance(sparse_vector).label("score"))
-                .filter(Embeddings.collection_id == collection.id)
-                .order_by(Embeddings.sparse_embedding.cosine_distance(sparse_vector))
-                .limit(limit)
-            ).all()
-        else:
-            raise ValueError("Unsupported query_vector type")
-
+        set_ef_search = _set_ef_search(collection, query_vector, limit)
+        if set_ef_search is not None:
+            self.db.execute(set_ef_search)
+        results = self.db.execute(_select_similar_to(collection, query_vector, limit)).all()
         return [(embeddings, score) for embeddings, score in results]
 
     def get_documents_without_embeddings(self) -> list[Document]:
         return self.db.query(Document).outerjoin(Embeddings).filter(Embeddings.id.is_(None)).all()
 
+    def count_documents_without_embeddings(self) -> int:
+        return self.db.query(Document).outerjoin(Embeddings).filter(Embeddings.id.is_(None)).count()
+
     def save_all(self, embeddings: list[Embeddings]) -> None:
         self.db.add_all(embeddings)
         self.db.commit()
+
+
+class AsyncEmbeddingsCollectionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_most_recent_by_name(self, name: str) -> EmbeddingsCollection | None:
+        collection: EmbeddingsCollection | None = await self.db.scalar(
+            select(EmbeddingsCollection)
+            .where(EmbeddingsCollection.name == name)
+            .order_by(EmbeddingsCollection.created_at.desc())
+            .limit(1)
+        )
+        return collection
+
+
+class AsyncEmbeddingsRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_similar_to(
+        self, collection: EmbeddingsCollection, query_vector: list[float] | dict[str, float], limit: int = 10
+    ) -> list[tuple[Embeddings, float]]:
+        if limit <= 0:
+            return []
+
+        set_ef_search = _set_ef_search(collection, query_vector, limit)
+        if set_ef_search is not None:
+            await self.db.execute(set_ef_search)
+        results = (await self.db.execute(_select_similar_to(collection, query_vector, limit))).all()
+        return [(embeddings, score) for embeddings, score in results]
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import redis
+
+from askpolis.env import get_int_env
+from askpolis.logging import get_logger
+
+from .models import Embeddings
+
+logger = get_logger(__name__)
+
+RERANKER_SCORE_KEY_PREFIX = "reranker-score:"
+
+
+def normalise_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class RerankerScoreCache:
+    """Bounded LRU of cross-encoder scores by query and chunk, optionally backed by Redis shared by all processes.
+
+    Keys contain the hash of the normalised query, the id of the chunk and the id of its collection. Collections aren't
+    changed in place, a new version is a new collection with new chunks, so the collection id in the key invalidates
+    the scores of previous versions, which are evicted by the LRU and expire in Redis. The namespace identifies the
+    model and its truncation, as both change the scores. Redis errors are logged and treated as cache misses.
+    """
+
+    def __init__(self, max_entries: int = 10_000, redis_client: Any | None = None, ttl: int = 86400) -> None:
+        self._max_entries = max_entries
+        self._redis = redis_client
+        self._ttl = ttl
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        # reranking runs in worker threads of the API
+        self._lock = threading.Lock()
+
+    def get_many(self, namespace: str, query: str, embeddings: list[Embeddings]) -> dict[int, float]:
+        """Return the cached scores by the index of the chunk in `embeddings`."""
+        keys = _get_keys(namespace, query, embeddings)
+        scores: dict[int, float] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                score = self._entries.get(key)
+                if score is not None:
+                    self._entries.move_to_end(key)
+                    scores[i] = score
+
+        missing = [i for i in range(len(keys)) if i not in scores]
+        if self._redis is not None and len(missing) > 0:
+            try:
+                values = self._redis.mget([keys[i] for i in missing])
+            except Exception as e:
+                logger.warning_with_attrs("Failed to read reranker scores from cache", {"error": e})
+                values = [None] * len(missing)
+            redis_scores = {i: float(value) for i, value in zip(missing, values, strict=True) if value is not None}
+            self._put_local({keys[i]: score for i, score in redis_scores.items()})
+            scores.update(redis_scores)
+        return scores
+
+    def set_many(self, namespace: str, query: str, scored: list[tuple[Embeddings, float]]) -> None:
+        if len(scored) == 0:
+            return
+        entries = dict(zip(_get_keys(namespace, query, [e for e, _ in scored]), (s for _, s in scored), strict=True))
+        self._put_local(entries)
+        if self._redis is not None:
+            try:
+                pipeline = self._redis.pipeline(transaction=False)
+                for key, score in entries.items():
+                    pipeline.set(key, score, ex=self._ttl)
+                pipeline.execute()
+            except Exception as e:
+                logger.warning_with_attrs("Failed to write reranker scores to cache", {"error": e})
+
+    def _put_local(self, entries: dict[str, float]) -> None:
+        with self._lock:
+            for key, score in entries.items():
+                self._entries[key] = score
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+def _get_keys(namespace: str, query: str, embeddings: list[Embeddings]) -> list[str]:
+    query_hash = hashlib.sha256(normalise_query(query).encode()).hexdigest()[:32]
+    return [f"{RERANKER_SCORE_KEY_PREFIX}{namespace}:{e.collection_id}:{query_hash}:{e.id}" for e in embeddings]
+
+
+def get_reranker_score_cache() -> RerankerScoreCache | None:
+    """Create the cache configured with RERANKER_CACHE_MAX_ENTRIES, 0 disables it, and RERANKER_CACHE_REDIS."""
+    max_entries = get_int_env("RERANKER_CACHE_MAX_ENTRIES", 10000)
+    if max_entries <= 0:
+        return None
+    redis_client = None
+    if os.getenv("RERANKER_CACHE_REDIS", "false") == "true":
+        redis_client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return RerankerScoreCache(max_entries, redis_client, get_int_env("RERANKER_CACHE_TTL_SECONDS", 86400))
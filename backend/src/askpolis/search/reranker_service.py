@@ -1,21 +1,92 @@
 import os
+import re
+from collections.abc import Sequence
 from functools import lru_cache
+from typing import NamedTuple, Protocol
 
+from askpolis.env import get_int_env
 from askpolis.logging import get_logger
+from askpolis.tracing import traced
 
+from .inference_client import get_inference_client
 from .models import Embeddings
+from .onnx_models import BACKEND_ONNX_INT8, BACKEND_TORCH, get_inference_backend, load_onnx_reranker
+from .reranker_cache import RerankerScoreCache, get_reranker_score_cache
 
 logger = get_logger(__name__)
 
+RERANKER_MODEL = "BAAI/bge-reranker-v2-m3"
+
+# rough number of characters per token of German text, used to truncate passages before tokenisation
+CHARS_PER_TOKEN = 4
+
+_WORD_REGEX = re.compile(r"\w+")
+
+
+class Reranker(Protocol):
+    def compute_score(
+        self, sentence_pairs: list[tuple[str, str]], batch_size: int, max_length: int, normalize: bool
+    ) -> list[float] | float: ...
+
+
+class FakeReranker:
+    """Scores a pair by the share of query words in the passage, so reranking can run without a model."""
+
+    def compute_score(
+        self, sentence_pairs: list[tuple[str, str]], batch_size: int, max_length: int, normalize: bool
+    ) -> list[float]:
+        scores = []
+        for query, passage in sentence_pairs:
+            query_words = set(_WORD_REGEX.findall(query.lower()))
+            passage_words = set(_WORD_REGEX.findall(passage.lower()))
+            scores.append(len(query_words & passage_words) / len(query_words) if query_words else 0.0)
+        return scores
+
+
+class RerankerSettings(NamedTuple):
+    batch_size: int = 16
+    max_length: int = 512
+    # number of batches after which the top-k has to be unchanged to stop scoring candidates, 0 scores all
+    early_stop_patience: int = 0
+
+
+def get_reranker_settings() -> RerankerSettings:
+    return RerankerSettings(
+        batch_size=max(1, get_int_env("RERANKER_BATCH_SIZE", 16)),
+        max_length=max(1, get_int_env("RERANKER_MAX_LENGTH", 512)),
+        early_stop_patience=max(0, get_int_env("RERANKER_EARLY_STOP_PATIENCE", 0)),
+    )
+
 
 class RerankerService:
-    def __init__(self) -> None:
-        if os.getenv("DISABLE_INFERENCE") == "true":
-            self._reranker = None
-        else:
-            from FlagEmbedding import FlagReranker
+    """Reranks candidates with a cross-encoder.
+
+    Passages are truncated to the token budget of RERANKER_MAX_LENGTH and scored in batches of RERANKER_BATCH_SIZE
+    pairs of similar length, so short passages are not padded to the longest candidate. With
+    RERANKER_EARLY_STOP_PATIENCE set, candidates are scored in retrieval order and scoring stops once the top-k did not
+    change for that many batches. The remaining candidates are dropped, as they are ranked low by the retrieval.
+    Scores of pairs in the score cache are not computed again.
+    """
 
-            self._reranker = FlagReranker("BAAI/bge-reranker-v2-m3", use_fp16=False)
+    def __init__(
+        self,
+        reranker: Reranker | None = None,
+        settings: RerankerSettings | None = None,
+        score_cache: RerankerScoreCache | None = None,
+    ) -> None:
+        model_name = type(reranker).__name__
+        if reranker is None:
+            inference_url = os.getenv("INFERENCE_URL")
+            if inference_url and os.getenv("DISABLE_INFERENCE") != "true":
+                reranker = get_inference_client(inference_url)
+                model_name = f"inference:{inference_url}"
+            else:
+                reranker, model_name = load_reranker()
+        self._reranker = reranker
+        self._settings = settings or get_reranker_settings()
+        self._score_cache = score_cache
+        # scores depend on the model and on how far passages are truncated
+        self._cache_namespace = f"{model_name}:{self._settings.max_length}"
 
     def rerank(self, query: str, embeddings: list[Embeddings], limit: int = 10) -> list[tuple[Embeddings, float]]:
         if len(embeddings) == 0:
@@ -24,17 +95,89 @@ class RerankerService:
         if limit > len(embeddings):
             limit = len(embeddings)
 
-        if self._reranker is None:
-            logger.warning("No reranker model configured, will return embeddings as is with score of 1.0")
-            return [(e, 1.0) for e in embeddings]
-
         logger.info("Reranking...")
-        reranked_scores = self._reranker.compute_score([(query, doc.chunk) for doc in embeddings], normalize=True)
-        return [
-            (doc, float(score)) for score, doc in sorted(zip(reranked_scores, embeddings, strict=False), reverse=True)
-        ][:limit]
+        with traced("search.rerank", {"candidates": len(embeddings), "limit": limit}) as span:
+            cached_scores = (
+                self._score_cache.get_many(self._cache_namespace, query, embeddings) if self._score_cache else {}
+            )
+            scores = self._compute_scores(query, [e.chunk for e in embeddings], limit, cached_scores)
+            span.set_attribute("cached", len(cached_scores))
+            span.set_attribute("scored", len(scores) - len(cached_scores))
+        if self._score_cache is not None:
+            self._score_cache.set_many(
+                self._cache_namespace,
+                query,
+                [(embeddings[i], score) for i, score in scores.items() if i not in cached_scores],
+            )
+        reranked = sorted(((embeddings[i], score) for i, score in scores.items()), key=lambda x: x[1], reverse=True)
+        return reranked[:limit]
+
+    def _compute_scores(
+        self, query: str, passages: list[str], limit: int, cached_scores: dict[int, float]
+    ) -> dict[int, float]:
+        batch_size = self._settings.batch_size
+        passages = [_truncate(passage, self._settings.max_length * CHARS_PER_TOKEN) for passage in passages]
+        if self._settings.early_stop_patience == 0:
+            windows = [list(range(len(passages)))]
+        else:
+            windows = [list(range(i, min(i + batch_size, len(passages)))) for i in range(0, len(passages), batch_size)]
+
+        scores = dict(cached_scores)
+        top_k: set[int] = set()
+        stable_windows = 0
+        for window in windows:
+            unscored = [i for i in window if i not in cached_scores]
+            for batch in _length_buckets(unscored, passages, batch_size):
+                batch_scores = self._reranker.compute_score(
+                    [(query, passages[i]) for i in batch],
+                    batch_size=len(batch),
+                    max_length=self._settings.max_length,
+                    normalize=True,
+                )
+                # a single pair is scored as a float instead of a list
+                if isinstance(batch_scores, float | int):
+                    batch_scores = [batch_scores]
+                scores.update(zip(batch, (float(score) for score in batch_scores), strict=True))
+
+            if self._settings.early_stop_patience > 0 and len(scores) >= limit:
+                current_top_k = set(sorted(scores, key=lambda i: scores[i], reverse=True)[:limit])
+                stable_windows = stable_windows + 1 if current_top_k == top_k else 0
+                top_k = current_top_k
+                if stable_windows >= self._settings.early_stop_patience:
+                    break
+        return scores
+
+
+def load_reranker() -> tuple[Reranker, str]:
+    """Load the reranker into this process and return it with the name its scores are cached under."""
+    if os.getenv("DISABLE_INFERENCE") == "true":
+        return FakeReranker(), FakeReranker.__name__
+
+    backend = get_inference_backend()
+    if backend != BACKEND_TORCH:
+        return load_onnx_reranker(quantized=backend == BACKEND_ONNX_INT8), f"{RERANKER_MODEL}:{backend}"
+
+    from FlagEmbedding import FlagReranker
+
+    reranker: Reranker = FlagReranker(RERANKER_MODEL, use_fp16=False)
+    return reranker, RERANKER_MODEL
+
+
+def _truncate(passage: str, max_chars: int) -> str:
+    if len(passage) <= max_chars:
+        return passage
+    # cut at a word boundary, so the model does not see a broken word at the end
+    truncated = passage[:max_chars]
+    if passage[max_chars].isspace() or " " not in truncated:
+        return truncated
+    return truncated[: truncated.rfind(" ")]
+
+
+def _length_buckets(indices: Sequence[int], passages: list[str], batch_size: int) -> list[list[int]]:
+    by_length = sorted(indices, key=lambda i: len(passages[i]))
+    return [by_length[i : i + batch_size] for i in range(0, len(by_length), batch_size)]
 
 
 @lru_cache(maxsize=1)
 def get_reranker_service() -> RerankerService:
-    return RerankerService()
+    return RerankerService(score_cache=get_reranker_score_cache())
@@ -5,9 +5,9 @@ from fastapi.responses import JSONResponse
 
 from askpolis.celery import app as celery_app
 
-from .dependencies import get_search_service
+from .dependencies import get_async_search_service
 from .models import SearchResponse
-from .search_service import SearchService
+from .search_service import AsyncSearchService
 
 router = APIRouter()
 
@@ -25,9 +25,9 @@ def trigger_embeddings_test() -> JSONResponse:
 
 
 @router.get("/search", tags=["search"])
-def search(
+async def search(
     request: Request,
-    search_service: Annotated[SearchService, Depends(get_search_service)],
+    search_service: Annotated[AsyncSearchService, Depends(get_async_search_service)],
     query: str,
     limit: int = 5,
     reranking: bool = False,
@@ -37,7 +37,7 @@ def search(
         index = ["default"]
     if limit < 1:
         limit = 5
-    results = search_service.find_matching_texts(query, limit, reranking, index)
+    results = await search_service.find_matching_texts(query, limit, reranking, index)
     for r in results:
         r.document_url = str(request.url_for("get_document", document_id=r.document_id))
         r.page_url = str(
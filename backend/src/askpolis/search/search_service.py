@@ -1,8 +1,11 @@
+import asyncio
 from abc import ABC, abstractmethod
 
-from .embeddings_service import EmbeddingsService
-from .models import SearchResult
-from .repositories import EmbeddingsCollectionRepository
+from askpolis.tracing import traced
+
+from .embeddings_service import EmbeddingModel, EmbeddingsService, _encode_query, _fuse_results
+from .models import Embeddings, SearchResult
+from .repositories import AsyncEmbeddingsCollectionRepository, AsyncEmbeddingsRepository, EmbeddingsCollectionRepository
 from .reranker_service import RerankerService
 
 
@@ -32,7 +35,7 @@ class SearchService(SearchServiceBase):
         if limit < 1:
             return []
 
-        query_limit = limit * 2 if use_reranker else limit
+        query_limit = _get_candidate_limit(limit, use_reranker)
         similar_documents = [
             result
             for index in indexes
@@ -41,16 +44,84 @@ class SearchService(SearchServiceBase):
             )
         ]
 
-        if use_reranker:
-            similar_documents = self._reranker_service.rerank(query, [e for e, _ in similar_documents], limit)
+        return _rank(self._reranker_service, query, similar_documents, limit, use_reranker)
 
-        return [
-            SearchResult(
-                matching_text=result.chunk,
-                chunk_id=result.id,
-                document_id=result.document_id,
-                page_id=result.page_id,
-                score=score,
-            )
-            for result, score in similar_documents
-        ]
+
+class AsyncSearchService:
+    """Search for the async request path.
+
+    Database queries run on the event loop while encoding and reranking, which are CPU bound, run in worker threads.
+    """
+
+    def __init__(
+        self,
+        collections_repository: AsyncEmbeddingsCollectionRepository,
+        embeddings_repository: AsyncEmbeddingsRepository,
+        model: EmbeddingModel,
+        reranker_service: RerankerService,
+    ) -> None:
+        self._collections_repository = collections_repository
+        self._embeddings_repository = embeddings_repository
+        self._model = model
+        self._reranker_service = reranker_service
+
+    async def find_matching_texts(
+        self, query: str, limit: int = 10, use_reranker: bool = False, indexes: list[str] | None = None
+    ) -> list[SearchResult]:
+        if indexes is None:
+            indexes = ["default"]
+        if limit < 1:
+            return []
+
+        query_limit = _get_candidate_limit(limit, use_reranker)
+        dense_query_embedding, sparse_query_embedding = await asyncio.to_thread(_encode_query, self._model, query)
+
+        similar_documents: list[tuple[Embeddings, float]] = []
+        for index in indexes:
+            collection = await self._collections_repository.get_most_recent_by_name(index)
+            if collection is None:
+                continue
+            attributes = {"collection": collection.name, "limit": query_limit * 2}
+            with traced("search.dense", attributes) as span:
+                dense_results = await self._embeddings_repository.get_all_similar_to(
+                    collection, dense_query_embedding, query_limit * 2
+                )
+                span.set_attribute("candidates", len(dense_results))
+            with traced("search.sparse", attributes) as span:
+                sparse_results = await self._embeddings_repository.get_all_similar_to(
+                    collection, sparse_query_embedding, query_limit * 2
+                )
+                span.set_attribute("candidates", len(sparse_results))
+            similar_documents.extend(_fuse_results(collection, dense_results, sparse_results, query_limit))
+
+        return await asyncio.to_thread(_rank, self._reranker_service, query, similar_documents, limit, use_reranker)
+
+
+def _get_candidate_limit(limit: int, use_reranker: bool) -> int:
+    # the reranker picks the results from twice as many candidates
+    return limit * 2 if use_reranker else limit
+
+
+def _rank(
+    reranker_service: RerankerService,
+    query: str,
+    similar_documents: list[tuple[Embeddings, float]],
+    limit: int,
+    use_reranker: bool,
+) -> list[SearchResult]:
+    if use_reranker:
+        similar_documents = reranker_service.rerank(query, [e for e, _ in similar_documents], limit)
+    return _to_search_results(similar_documents)
+
+
+def _to_search_results(similar_documents: list[tuple[Embeddings, float]]) -> list[SearchResult]:
+    return [
+        SearchResult(
+            matching_text=result.chunk,
+            chunk_id=result.id,
+            document_id=result.document_id,
+            page_id=result.page_id,
+            score=score,
+        )
+        for result, score in similar_documents
+    ]
@@ -10,7 +10,7 @@ from askpolis.logging import get_logger
 from askpolis.task_utils import build_task_result
 
 from .embeddings_service import EmbeddingsService, get_embedding_model
-from .models import EmbeddingsCollection
+from .models import EmbeddingsCollection, get_default_dense_index
 from .repositories import EmbeddingsCollectionRepository, EmbeddingsRepository
 
 logger = get_logger(__name__)
@@ -74,7 +74,9 @@ def ingest_embeddings_for_one_document() -> dict[str, Any]:
         collection = collections_repository.get_most_recent_by_name("default")
         if collection is None:
             logger.info("Creating default embeddings collection...")
-            collection = EmbeddingsCollection(name="default", version="v0", description="Default collection")
+            collection = EmbeddingsCollection(
+                name="default", version="v0", description="Default collection", dense_index=get_default_dense_index()
+            )
             collections_repository.save(collection)
 
         embeddings_repository = EmbeddingsRepository(session)
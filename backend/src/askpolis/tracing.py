@@ -0,0 +1,40 @@
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from opentelemetry import metrics, trace
+from opentelemetry.util.types import AttributeValue
+
+_tracer = trace.get_tracer(__name__)
+_meter = metrics.get_meter(__name__)
+_duration = _meter.create_histogram(
+    "askpolis.operation.duration",
+    unit="s",
+    description="Duration of model, retrieval and persistence operations of the search and QA paths",
+)
+
+
+def is_tracing_enabled() -> bool:
+    return os.getenv("TRACING_ENABLED", "true") == "true"
+
+
+@contextmanager
+def traced(operation: str, attributes: dict[str, AttributeValue] | None = None) -> Iterator[trace.Span]:
+    """Run the block in a span named `askpolis.<operation>` and record its duration in a histogram.
+
+    The span is yielded so that results such as candidate counts can be attached once they are known. Spans and
+    histograms are exported by the OpenTelemetry SDK set up by `opentelemetry-instrument`, without it they are no-ops.
+    With TRACING_ENABLED=false nothing is recorded at all.
+    """
+    if not is_tracing_enabled():
+        yield trace.INVALID_SPAN
+        return
+
+    started_at = time.perf_counter()
+    with _tracer.start_as_current_span(f"askpolis.{operation}", attributes=attributes) as span:
+        try:
+            yield span
+        finally:
+            # only the operation is used as attribute to keep the number of time series small
+            _duration.record(time.perf_counter() - started_at, {"operation": operation})
@@ -0,0 +1,28 @@
+#!/bin/bash
+set -o errexit
+set -o nounset
+
+export OTEL_PYTHON_LOG_CORRELATION=true
+export OTEL_PYTHON_LOG_LEVEL=info
+export OTEL_PYTHON_LOGGING_AUTO_INSTRUMENTATION_ENABLED=true
+
+container_id=$(cat /proc/self/cgroup | grep docker | cut -d'/' -f3 | head -n 1)
+export OTEL_RESOURCE_ATTRIBUTES="container.id=${container_id},${OTEL_RESOURCE_ATTRIBUTES:-}"
+
+# the server must load the models itself instead of forwarding to another server
+unset INFERENCE_URL
+
+if [ -n "${INFERENCE_SOCKET:-}" ]; then
+  listen_args=(--uds "${INFERENCE_SOCKET}")
+else
+  listen_args=(--host 0.0.0.0 --port "${INFERENCE_PORT:-8001}")
+fi
+
+opentelemetry-instrument \
+    --traces_exporter otlp_proto_grpc \
+    --metrics_exporter otlp_proto_grpc \
+    --logs_exporter otlp_proto_grpc \
+    uvicorn askpolis.search.inference_server:app \
+    "${listen_args[@]}" \
+    --workers 1 \
+    --no-access-log
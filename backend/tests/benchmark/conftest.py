@@ -0,0 +1,72 @@
+import os
+from collections.abc import Generator
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from testcontainers.core.generic import DbContainer
+
+from askpolis.benchmark import BenchmarkResults, get_environment_metadata, load_corpus
+from askpolis.logging import get_logger
+from askpolis.search import EmbeddingsCollection
+
+from ..conftest import PostgresTestBase
+
+logger = get_logger(__name__)
+
+# the corpus size can be raised up to 1M chunks with BENCHMARK_CORPUS_SIZE, loading then takes a while
+DEFAULT_CORPUS_SIZE = 10_000
+
+
+@pytest.fixture(scope="session")
+def corpus_size() -> int:
+    return int(os.getenv("BENCHMARK_CORPUS_SIZE", str(DEFAULT_CORPUS_SIZE)))
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(corpus_size: int) -> Generator[BenchmarkResults, None, None]:
+    results = BenchmarkResults({**get_environment_metadata(), "corpus_size": corpus_size})
+    yield results
+    path = Path(os.getenv("BENCHMARK_RESULTS_FILE", "benchmark-results.json"))
+    results.write(path)
+    logger.info_with_attrs("Wrote benchmark results", {"path": path.absolute(), "stages": len(results.stages)})
+
+
+@pytest.fixture(scope="function")
+def rng() -> np.random.Generator:
+    return np.random.default_rng(42)
+
+
+@pytest.fixture(scope="session")
+def postgres_container() -> Generator[DbContainer, None, None]:
+    with PostgresTestBase.create_postgres_container(with_logging=False) as container:
+        yield container
+
+
+@pytest.fixture(scope="session")
+def database(postgres_container: DbContainer) -> Engine:
+    return PostgresTestBase.setup_database_with_migrations(postgres_container.get_connection_url())
+
+
+@pytest.fixture(scope="session")
+def session_maker(database: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=database)
+
+
+@pytest.fixture(scope="function")
+def db_session(session_maker: sessionmaker[Session]) -> Generator[Session, None, None]:
+    with session_maker() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def corpus(session_maker: sessionmaker[Session], corpus_size: int) -> EmbeddingsCollection:
+    """Collection with `corpus_size` chunks, loaded once and shared by all benchmarks of the session."""
+    with session_maker() as session:
+        collection = load_corpus(session, np.random.default_rng(7), corpus_size)
+        # let the planner know about the new rows like autovacuum would do in production
+        session.connection().exec_driver_sql("ANALYZE embeddings")
+        session.commit()
+        return collection
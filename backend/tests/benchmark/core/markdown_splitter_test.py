@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from askpolis.benchmark import BenchmarkResults, generate_markdown_pages
+from askpolis.core.markdown_splitter import MarkdownSplitter
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(500, 100), (2000, 400)])
+def test_markdown_splitter_split(
+    benchmark_results: BenchmarkResults, rng: np.random.Generator, chunk_size: int, chunk_overlap: int
+) -> None:
+    splitter = MarkdownSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    pages = generate_markdown_pages(rng, pages=50)
+
+    def split() -> list[Document]:
+        # split modifies the pages, so every round gets fresh copies
+        return splitter.split([Document(page_content=page.page_content, metadata=page.metadata) for page in pages])
+
+    result = benchmark_results.measure(
+        "core.markdown_splitter.split",
+        split,
+        items_per_round=len(pages),
+        rounds=10,
+        params={"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "pages": len(pages)},
+    )
+
+    assert len(split()) > 0
+    assert result.p50_ms > 0
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from askpolis.benchmark import BenchmarkResults, generate_dense_vector, load_corpus
+from askpolis.search import EmbeddingsCollection, EmbeddingsRepository
+
+# same expressions and parameters as the partial indexes of the migrations, but limited to one collection
+INDEX_EXPRESSIONS = {
+    "vector": "embedding vector_cosine_ops",
+    "halfvec": "(embedding::halfvec(1024)) halfvec_cosine_ops",
+    "binary": "(binary_quantize(embedding)::bit(1024)) bit_hamming_ops",
+    "prefix-256": "(subvector(embedding, 1, 256)::vector(256)) vector_cosine_ops",
+    "prefix-512": "(subvector(embedding, 1, 512)::vector(512)) vector_cosine_ops",
+}
+
+QUERIES = 50
+K = 10
+
+
+def get_exact_top_k(db: Session, collection: EmbeddingsCollection, queries: list[list[float]]) -> list[set[str]]:
+    # without index scans the nearest neighbours are computed exactly, SET LOCAL ends with the transaction
+    db.execute(text("SET LOCAL enable_indexscan = off"))
+    top_k = []
+    for query in queries:
+        rows = db.execute(
+            text(
+                "SELECT id FROM embeddings WHERE collection_id = :collection_id "
+                "ORDER BY embedding <=> CAST(:query AS vector) LIMIT :k"
+            ),
+            {"collection_id": collection.id, "query": str(query), "k": K},
+        )
+        top_k.append({str(row.id) for row in rows})
+    db.rollback()
+    return top_k
+
+
+@pytest.mark.parametrize("dense_index", list(INDEX_EXPRESSIONS))
+def test_dense_index(
+    benchmark_results: BenchmarkResults,
+    session_maker: sessionmaker[Session],
+    corpus_size: int,
+    rng: np.random.Generator,
+    dense_index: str,
+) -> None:
+    with session_maker() as db:
+        # the same seed as the shared corpus, so every dense index is built on the same vectors
+        collection = load_corpus(db, np.random.default_rng(7), corpus_size, dense_index=dense_index)
+        db.connection().exec_driver_sql("ANALYZE embeddings")
+        db.commit()
+
+        def build_index() -> None:
+            db.connection().exec_driver_sql(
+                f"CREATE INDEX benchmark_dense_idx ON embeddings USING hnsw ({INDEX_EXPRESSIONS[dense_index]}) "
+                f"WITH (m = 24, ef_construction = 128) WHERE collection_id = '{collection.id}'"
+            )
+
+        build = benchmark_results.measure(
+            "search.dense_index.build",
+            build_index,
+            items_per_round=corpus_size,
+            rounds=1,
+            warmup=0,
+            params={"dense_index": dense_index, "corpus_size": corpus_size},
+        )
+        index_bytes = db.execute(text("SELECT pg_relation_size('benchmark_dense_idx')")).scalar_one()
+        db.rollback()
+
+        queries = [generate_dense_vector(rng) for _ in range(QUERIES)]
+        exact_top_k = get_exact_top_k(db, collection, queries)
+        repository = EmbeddingsRepository(db)
+        recalls = [
+            len({str(e.id) for e, _ in repository.get_all_similar_to(collection, query, K)} & exact) / K
+            for query, exact in zip(queries, exact_top_k, strict=True)
+        ]
+        db.rollback()
+
+        query_iterator = iter(queries * 2)
+        benchmark_results.measure(
+            "search.dense_index.get_all_similar_to",
+            lambda: repository.get_all_similar_to(collection, next(query_iterator), K),
+            rounds=QUERIES,
+            params={"dense_index": dense_index, "limit": K, "corpus_size": corpus_size},
+            metrics={
+                "index_mb": index_bytes / 1024**2,
+                "build_s": build.mean_ms / 1000,
+                f"recall_at_{K}": float(np.mean(recalls)),
+            },
+        )
+
+        assert np.mean(recalls) > 0
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from askpolis.benchmark import BenchmarkResults, generate_lexical_weights, generate_paragraph
+from askpolis.core import Document, DocumentType, Page
+from askpolis.search import Embeddings, EmbeddingsCollection, RerankerService
+from askpolis.search.embeddings_service import FakeModel, _rrf_merge
+from askpolis.search.models import convert_to_sparse_vector
+from askpolis.search.reranker_service import FakeReranker, RerankerSettings
+
+
+@pytest.mark.parametrize("terms", [10, 60, 300])
+def test_convert_to_sparse_vector(benchmark_results: BenchmarkResults, rng: np.random.Generator, terms: int) -> None:
+    lexical_weights = [generate_lexical_weights(rng, terms) for _ in range(100)]
+
+    def convert() -> None:
+        for weights in lexical_weights:
+            convert_to_sparse_vector(weights)
+
+    benchmark_results.measure(
+        "search.convert_to_sparse_vector", convert, items_per_round=len(lexical_weights), params={"terms": terms}
+    )
+
+    assert len(convert_to_sparse_vector(lexical_weights[0]).indices()) == terms
+
+
+@pytest.mark.parametrize("candidates", [10, 100, 1000])
+def test_rrf_merge(benchmark_results: BenchmarkResults, rng: np.random.Generator, candidates: int) -> None:
+    collection = EmbeddingsCollection(name="benchmark", version="v0", description="Synthetic candidates")
+    document = Document(name="Benchmark", document_type=DocumentType.ELECTION_PROGRAM)
+    page = Page(document_id=document.id, page_number=1, content="content", raw_content="content")
+
+    def candidate(score: float) -> tuple[Embeddings, float]:
+        embeddings = Embeddings(collection, document, page, "chunk", 0, [], {"0": 1.0}, {})
+        return embeddings, score
+
+    dense_results = [candidate(float(score)) for score in sorted(rng.random(candidates), reverse=True)]
+    # half of the sparse candidates are also dense candidates, as it is typical for hybrid search
+    sparse_results = [(embeddings, score) for embeddings, score in dense_results[::2]] + [
+        candidate(float(score)) for score in rng.random(candidates - len(dense_results[::2]))
+    ]
+
+    benchmark_results.measure(
+        "search.rrf_merge",
+        lambda: _rrf_merge(dense_results, sparse_results),
+        rounds=100,
+        params={"candidates": candidates},
+    )
+
+    assert len(_rrf_merge(dense_results, sparse_results)) == candidates + len(sparse_results) - len(dense_results[::2])
+
+
+def test_fake_model_encode_corpus(benchmark_results: BenchmarkResults) -> None:
+    model = FakeModel()
+    texts = [f"chunk {i}" for i in range(256)]
+
+    benchmark_results.measure(
+        "search.fake_model.encode_corpus",
+        lambda: model.encode_corpus(texts),
+        items_per_round=len(texts),
+        params={"texts": len(texts)},
+    )
+
+    assert len(model.encode_corpus(texts)["dense_vecs"]) == len(texts)
+
+
+@pytest.mark.parametrize("batch_size", [4, 16, 64])
+def test_rerank_with_fake_reranker(
+    benchmark_results: BenchmarkResults, rng: np.random.Generator, batch_size: int
+) -> None:
+    collection = EmbeddingsCollection(name="benchmark", version="v0", description="Synthetic candidates")
+    document = Document(name="Benchmark", document_type=DocumentType.ELECTION_PROGRAM)
+    page = Page(document_id=document.id, page_number=1, content="content", raw_content="content")
+    candidates = [
+        Embeddings(collection, document, page, generate_paragraph(rng, int(rng.integers(1, 20))), 0, [], {}, {})
+        for _ in range(100)
+    ]
+    service = RerankerService(FakeReranker(), RerankerSettings(batch_size=batch_size))
+
+    benchmark_results.measure(
+        "search.reranker.rerank",
+        lambda: service.rerank("Wie steht die Partei zur Rente?", candidates, 10),
+        items_per_round=len(candidates),
+        params={"batch_size": batch_size, "reranker": "fake"},
+    )
+
+    assert len(service.rerank("Rente", candidates, 10)) == 10
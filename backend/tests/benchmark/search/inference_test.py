@@ -0,0 +1,82 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from askpolis.benchmark import BenchmarkResults, generate_paragraph
+from askpolis.search.onnx_models import (
+    BACKEND_ONNX,
+    BACKEND_ONNX_INT8,
+    BACKEND_TORCH,
+    EMBEDDING_MODEL_DIR,
+    MODEL_FILE,
+    RERANKER_MODEL_DIR,
+    get_onnx_models_dir,
+    load_onnx_embedding_model,
+    load_onnx_reranker,
+)
+
+BACKENDS = [BACKEND_TORCH, BACKEND_ONNX, BACKEND_ONNX_INT8]
+
+
+def load_embedding_model(backend: str) -> Any:
+    if backend == BACKEND_TORCH:
+        flag_embedding = pytest.importorskip("FlagEmbedding")
+        return flag_embedding.BGEM3FlagModel("BAAI/bge-m3", devices="cpu", use_fp16=False, normalize_embeddings=True)
+    require_onnx_model(EMBEDDING_MODEL_DIR)
+    return load_onnx_embedding_model(quantized=backend == BACKEND_ONNX_INT8)
+
+
+def load_reranker(backend: str) -> Any:
+    if backend == BACKEND_TORCH:
+        flag_embedding = pytest.importorskip("FlagEmbedding")
+        return flag_embedding.FlagReranker("BAAI/bge-reranker-v2-m3", use_fp16=False)
+    require_onnx_model(RERANKER_MODEL_DIR)
+    return load_onnx_reranker(quantized=backend == BACKEND_ONNX_INT8)
+
+
+def require_onnx_model(model_dir: str) -> None:
+    pytest.importorskip("onnxruntime")
+    if not (get_onnx_models_dir() / model_dir / MODEL_FILE).exists():
+        pytest.skip("ONNX models not exported, run askpolis.search.onnx_export first")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_encode_corpus(benchmark_results: BenchmarkResults, rng: np.random.Generator, backend: str) -> None:
+    model = load_embedding_model(backend)
+    texts = [generate_paragraph(rng, sentences=int(rng.integers(2, 20))) for _ in range(32)]
+
+    benchmark_results.measure(
+        "search.model.encode_corpus",
+        lambda: model.encode_corpus(texts, return_dense=True, return_sparse=True),
+        items_per_round=len(texts),
+        rounds=5,
+        warmup=1,
+        params={"backend": backend, "texts": len(texts)},
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_encode_query(benchmark_results: BenchmarkResults, backend: str) -> None:
+    model = load_embedding_model(backend)
+
+    benchmark_results.measure(
+        "search.model.encode",
+        lambda: model.encode("Wie steht die Partei zum Mindestlohn?", return_dense=True, return_sparse=True),
+        params={"backend": backend},
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_rerank(benchmark_results: BenchmarkResults, rng: np.random.Generator, backend: str) -> None:
+    reranker = load_reranker(backend)
+    pairs = [("Wie steht die Partei zur Rente?", generate_paragraph(rng, int(rng.integers(2, 20)))) for _ in range(20)]
+
+    benchmark_results.measure(
+        "search.model.rerank",
+        lambda: reranker.compute_score(pairs, batch_size=16, max_length=512, normalize=True),
+        items_per_round=len(pairs),
+        rounds=5,
+        warmup=1,
+        params={"backend": backend, "pairs": len(pairs)},
+    )
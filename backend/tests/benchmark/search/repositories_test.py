@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from askpolis.benchmark import BenchmarkResults, create_document, generate_dense_vector, generate_lexical_weights
+from askpolis.search import Embeddings, EmbeddingsCollection, EmbeddingsCollectionRepository, EmbeddingsRepository
+from askpolis.search.embeddings_service import FakeModel
+
+
+@pytest.mark.parametrize("batch_size", [10, 100, 1000])
+def test_save_all(benchmark_results: BenchmarkResults, db_session: Session, batch_size: int) -> None:
+    collection = EmbeddingsCollection(name="benchmark-save-all", version="v0", description="Synthetic corpus")
+    EmbeddingsCollectionRepository(db_session).save(collection)
+    document, pages = create_document(db_session)
+    repository = EmbeddingsRepository(db_session)
+    texts = [f"Chunk {i} eines Wahlprogramms" for i in range(batch_size)]
+    encoded = FakeModel().encode_corpus(texts)
+
+    def save_all() -> None:
+        repository.save_all(
+            [
+                Embeddings(
+                    collection=collection,
+                    document=document,
+                    page=pages[0],
+                    chunk=text,
+                    chunk_id=i,
+                    embedding=encoded["dense_vecs"][i].tolist(),
+                    sparse_embedding=encoded["lexical_weights"][i],
+                    chunk_metadata={"page": 1},
+                )
+                for i, text in enumerate(texts)
+            ]
+        )
+
+    benchmark_results.measure(
+        "search.repository.save_all", save_all, items_per_round=batch_size, rounds=5, params={"batch_size": batch_size}
+    )
+
+    assert len(repository.get_all_by_document(document)) == batch_size * 7
+
+
+@pytest.mark.parametrize("limit", [10, 100])
+def test_get_all_similar_to_dense(
+    benchmark_results: BenchmarkResults,
+    db_session: Session,
+    corpus: EmbeddingsCollection,
+    corpus_size: int,
+    rng: np.random.Generator,
+    limit: int,
+) -> None:
+    repository = EmbeddingsRepository(db_session)
+    queries = iter([generate_dense_vector(rng) for _ in range(100)])
+
+    benchmark_results.measure(
+        "search.repository.get_all_similar_to",
+        lambda: repository.get_all_similar_to(corpus, next(queries), limit),
+        rounds=50,
+        params={"vector": "dense", "limit": limit, "corpus_size": corpus_size},
+    )
+
+    assert len(repository.get_all_similar_to(corpus, next(queries), limit)) == min(limit, corpus_size)
+
+
+@pytest.mark.parametrize("limit", [10, 100])
+def test_get_all_similar_to_sparse(
+    benchmark_results: BenchmarkResults,
+    db_session: Session,
+    corpus: EmbeddingsCollection,
+    corpus_size: int,
+    rng: np.random.Generator,
+    limit: int,
+) -> None:
+    repository = EmbeddingsRepository(db_session)
+    queries = iter([generate_lexical_weights(rng, terms=10) for _ in range(100)])
+
+    benchmark_results.measure(
+        "search.repository.get_all_similar_to",
+        lambda: repository.get_all_similar_to(corpus, next(queries), limit),
+        rounds=50,
+        params={"vector": "sparse", "limit": limit, "corpus_size": corpus_size},
+    )
+
+    assert len(repository.get_all_similar_to(corpus, next(queries), limit)) > 0
@@ -28,6 +28,8 @@ def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item
             item.add_marker(pytest.mark.integration)
         elif "tests/end2end" in test_path:
             item.add_marker(pytest.mark.e2e)
+        elif "tests/benchmark" in test_path:
+            item.add_marker(pytest.mark.benchmark)
 
 
 def attach_log_stream(container: DockerContainer, prefix: str) -> None:
@@ -1,10 +1,12 @@
-from collections.abc import Generator
+import asyncio
+from collections.abc import Awaitable, Callable, Generator
 from pathlib import Path
 from typing import cast
 
 import pytest
 from alembic.config import Config
 from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 from testcontainers.core.generic import DbContainer
 
@@ -48,6 +50,32 @@ def db_session(session_maker: sessionmaker[Session]) -> Generator[Session, None,
     yield from create_transactional_session(session_maker)
 
 
+@pytest.fixture(scope="function")
+def run_in_async_session(
+    database: Engine, test_db_url: str
+) -> Callable[[Callable[[AsyncSession], Awaitable[None]]], None]:
+    """Run a coroutine function with an async session whose transaction is rolled back afterwards."""
+
+    def run(callback: Callable[[AsyncSession], Awaitable[None]]) -> None:
+        async def run_with_rollback() -> None:
+            engine = create_async_engine(test_db_url)
+            try:
+                async with engine.connect() as connection:
+                    transaction = await connection.begin()
+                    session = AsyncSession(bind=connection, expire_on_commit=False)
+                    try:
+                        await callback(session)
+                    finally:
+                        await session.close()
+                        await transaction.rollback()
+            finally:
+                await engine.dispose()
+
+        asyncio.run(run_with_rollback())
+
+    return run
+
+
 @pytest.fixture(scope="function")
 def resources_dir() -> Path:
     return Path(__file__).parent / "resources"
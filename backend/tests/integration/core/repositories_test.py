@@ -1,11 +1,15 @@
 import datetime
+from collections.abc import Awaitable, Callable
 
 import pytest
 import uuid_utils.compat as uuid
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from askpolis.core import (
+    AsyncDocumentRepository,
+    AsyncPartyRepository,
     Document,
     DocumentRepository,
     DocumentType,
@@ -118,3 +122,59 @@ def test_document_unique_index_on_reference_ids(db_session: Session) -> None:
     # Attempt to flush should raise IntegrityError due to a unique constraint violation
     with pytest.raises(IntegrityError):
         db_session.flush()
+
+
+def test_async_document_repository(
+    run_in_async_session: Callable[[Callable[[AsyncSession], Awaitable[None]]], None],
+) -> None:
+    async def test(session: AsyncSession) -> None:
+        document = Document(name="test", document_type=DocumentType.ELECTION_PROGRAM)
+        other_document = Document(name="other", document_type=DocumentType.ELECTION_PROGRAM)
+        page = Page(document_id=document.id, page_number=1, content="some content", raw_content="raw Content")
+        session.add_all([document, other_document, page])
+        await session.flush()
+
+        document_repository = AsyncDocumentRepository(session)
+        document_from_db = await document_repository.get(document.id)
+        assert document_from_db is not None
+        assert document_from_db.name == "test"
+
+        page_from_db = await document_repository.get_page(document.id, page.id)
+        assert page_from_db is not None
+        assert page_from_db.content == "some content"
+        assert await document_repository.get_page(other_document.id, page.id) is None
+
+        pages = await document_repository.get_pages_by_ids([page.id, uuid.uuid7()])
+        assert [p.id for p in pages] == [page.id]
+
+    run_in_async_session(test)
+
+
+def test_async_repositories_paginate_and_stream(
+    run_in_async_session: Callable[[Callable[[AsyncSession], Awaitable[None]]], None],
+) -> None:
+    async def test(session: AsyncSession) -> None:
+        documents = [Document(name=f"doc {i}", document_type=DocumentType.ELECTION_PROGRAM) for i in range(3)]
+        pages = [
+            Page(document_id=documents[0].id, page_number=i, content=f"page {i}", raw_content="raw") for i in range(3)
+        ]
+        parties = [Party(name=f"party {i}", short_name=f"p{i}") for i in range(3)]
+        session.add_all([*documents, *pages, *parties])
+        await session.flush()
+
+        document_repository = AsyncDocumentRepository(session)
+        first_page = await document_repository.get_all_after(None, 2)
+        assert [d.name for d in first_page] == ["doc 0", "doc 1"]
+        assert [d.name for d in await document_repository.get_all_after(first_page[-1].id, 2)] == ["doc 2"]
+
+        assert [p.page_number for p in await document_repository.get_pages_after(documents[0].id, 0, 10)] == [1, 2]
+        assert await document_repository.get_pages_after(documents[1].id, None, 10) == []
+
+        streamed = [page.content async for page in document_repository.stream_pages(batch_size=2)]
+        assert streamed == ["page 0", "page 1", "page 2"]
+        assert [page async for page in document_repository.stream_pages(documents[1].id)] == []
+
+        party_repository = AsyncPartyRepository(session)
+        assert [p.name for p in await party_repository.get_all_after(parties[0].id, 10)] == ["party 1", "party 2"]
+
+    run_in_async_session(test)
@@ -1,3 +1,5 @@
+import datetime
+
 from sqlalchemy.orm import Session
 
 from askpolis.data_fetcher import DataFetcherType, FetchedData, FetchedDataRepository
@@ -55,6 +57,80 @@ def test_delete_outdated_data(db_session: Session) -> None:
     assert len(FetchedDataRepository(db_session).get_all()) == 1
 
 
+def test_delete_outdated_data_in_batches(db_session: Session) -> None:
+    for parliament_id in range(5):
+        outdated = _generate_random_parliament_period(parliament_id)
+        outdated.data_fetcher = "test"
+        db_session.add(outdated)
+    db_session.flush()
+    db_session.add(_generate_random_parliament_period(99))
+    db_session.flush()
+
+    deleted_data = FetchedDataRepository(db_session).delete_outdated_data(batch_size=2)
+
+    assert deleted_data[0].rows == 5
+    assert deleted_data[0].completed
+    assert [batch.rows for batch in deleted_data[0].batches] == [2, 2, 1]
+    assert all(batch.bytes > 0 for batch in deleted_data[0].batches)
+    assert len(FetchedDataRepository(db_session).get_all()) == 1
+
+
+def test_delete_outdated_data_stops_when_time_budget_is_exhausted(db_session: Session) -> None:
+    outdated = _generate_random_parliament_period(1)
+    outdated.data_fetcher = "test"
+    db_session.add(outdated)
+    db_session.flush()
+    db_session.add(_generate_random_parliament_period(2))
+    db_session.flush()
+
+    deleted_data = FetchedDataRepository(db_session).delete_outdated_data(time_budget_seconds=0)
+
+    assert deleted_data[0].rows == 0
+    assert not deleted_data[0].completed
+    assert len(FetchedDataRepository(db_session).get_all()) == 2
+
+
+def test_get_existing_entities(db_session: Session) -> None:
+    db_session.add(_generate_random_parliament_period(1))
+    db_session.add(_generate_random_parliament_period(1))
+    db_session.add(_generate_random_parliament_period(2))
+    db_session.flush()
+
+    existing_entities = FetchedDataRepository(db_session).get_existing_entities(
+        "Abgeordnetenwatch",
+        [
+            FetchedData.get_entity_for_list_of_parliament_periods(1),
+            FetchedData.get_entity_for_list_of_parliament_periods(2),
+            FetchedData.get_entity_for_list_of_parliament_periods(3),
+        ],
+    )
+
+    assert existing_entities == {"parliament_periods.1", "parliament_periods.2"}
+
+
+def test_get_latest_by_data_fetcher_and_entities(db_session: Session) -> None:
+    older = _generate_random_parliament_period(1)
+    older.created_at = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+    newer = _generate_random_parliament_period(1)
+    newer.json_data = [{"id": 1, "name": "Bundestag (updated)"}]
+    db_session.add(older)
+    db_session.add(newer)
+    db_session.add(_generate_random_parliament_period(2))
+    db_session.flush()
+
+    latest = FetchedDataRepository(db_session).get_latest_by_data_fetcher_and_entities(
+        "Abgeordnetenwatch",
+        [
+            FetchedData.get_entity_for_list_of_parliament_periods(1),
+            FetchedData.get_entity_for_list_of_parliament_periods(2),
+        ],
+    )
+
+    assert len(latest) == 2
+    assert latest["parliament_periods.1"].id == newer.id
+    assert latest["parliament_periods.2"].json_data == [{"id": 2, "name": "Bundestag"}]
+
+
 def _generate_random_parliament_period(parliament_id: int) -> FetchedData:
     random_data = FetchedData.create_parliament_periods(
         DataFetcherType.ABGEORDNETENWATCH,
@@ -1,10 +1,18 @@
 import datetime
+from collections.abc import Awaitable, Callable
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from askpolis.core import Parliament
-from askpolis.qa.models import Answer, AnswerContent, Question
-from askpolis.qa.repositories import AnswerRepository, QuestionRepository
+from askpolis.core import Document, DocumentType, Page, Parliament
+from askpolis.qa.models import Answer, AnswerContent, Citation, HydratedCitation, Question
+from askpolis.qa.repositories import (
+    AnswerRepository,
+    AsyncCitationRepository,
+    AsyncQuestionRepository,
+    QuestionRepository,
+)
+from askpolis.search import Embeddings, EmbeddingsCollection, SearchResult
 
 
 def test_question_model(db_session: Session) -> None:
@@ -84,3 +92,93 @@ def test_get_stale_questions(db_session: Session) -> None:
     assert len(stale_questions) == 1
     assert stale_questions[0].id == q1.id
     assert stale_questions[0].content == "old question without answer"
+    assert question_repository.count_stale_questions() == 1
+
+
+def test_async_question_repository_loads_answers(
+    run_in_async_session: Callable[[Callable[[AsyncSession], Awaitable[None]]], None],
+) -> None:
+    async def test(session: AsyncSession) -> None:
+        parliament = Parliament(name="Parliament of Canada", short_name="Canada")
+        session.add(parliament)
+
+        question = Question("a test question")
+        answer = Answer(contents=[AnswerContent("en-US", "a test answer")], citations=[])
+        answer.parliament_id = parliament.id
+        question.answers.append(answer)
+        session.add(question)
+        await session.flush()
+        session.expunge_all()
+
+        question_from_db = await AsyncQuestionRepository(session).get(question.id)
+
+        assert question_from_db is not None
+        assert question_from_db.content == "a test question"
+        assert question_from_db.answers[0].contents[0].content == "a test answer"
+        assert question_from_db.answers[0].citations == []
+
+    run_in_async_session(test)
+
+
+def test_async_question_repository_paginates_in_creation_order(
+    run_in_async_session: Callable[[Callable[[AsyncSession], Awaitable[None]]], None],
+) -> None:
+    async def test(session: AsyncSession) -> None:
+        parliament = Parliament(name="Parliament of Canada", short_name="Canada")
+        questions = [Question(f"question {i}") for i in range(3)]
+        answer = Answer(contents=[AnswerContent("en-US", "an answer")], citations=[])
+        answer.parliament_id = parliament.id
+        questions[1].answers.append(answer)
+        session.add(parliament)
+        session.add_all(questions)
+        await session.flush()
+        session.expunge_all()
+
+        repository = AsyncQuestionRepository(session)
+        first_page = await repository.get_all_after(None, 2)
+        assert [(q.content, answered) for q, answered in first_page] == [("question 0", False), ("question 1", True)]
+
+        second_page = await repository.get_all_after(first_page[-1].question.id, 2)
+        assert [q.content for q, _ in second_page] == ["question 2"]
+
+    run_in_async_session(test)
+
+
+def test_async_citation_repository_hydrates_citations(
+    run_in_async_session: Callable[[Callable[[AsyncSession], Awaitable[None]]], None],
+) -> None:
+    async def test(session: AsyncSession) -> None:
+        collection = EmbeddingsCollection(name="default", version="v1", description="test")
+        document = Document(name="Program", document_type=DocumentType.ELECTION_PROGRAM)
+        page = Page(document_id=document.id, page_number=1, content="content", raw_content="raw")
+        embeddings = Embeddings(
+            collection=collection,
+            document=document,
+            page=page,
+            chunk="a chunk",
+            chunk_id=0,
+            embedding=[0.0] * 1024,
+            sparse_embedding={},
+            chunk_metadata={},
+        )
+        citation = Citation(
+            SearchResult(
+                matching_text="a chunk",
+                chunk_id=embeddings.id,
+                document_id=document.id,
+                page_id=page.id,
+                score=1.0,
+            )
+        )
+        citation.page_id = None
+        question = Question("a test question")
+        question.answers.append(Answer(contents=[AnswerContent("en-US", "a test answer")], citations=[citation]))
+        session.add_all([collection, document, page, embeddings, question])
+        await session.flush()
+
+        citations = await AsyncCitationRepository(session).get_hydrated_citations(question.answers[0].id)
+
+        # the page is taken from the embeddings if the citation has none
+        assert citations == [HydratedCitation(document.id, page.id, "Program", "a chunk")]
+
+    run_in_async_session(test)
@@ -0,0 +1,75 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from askpolis.search.onnx_models import (
+    EMBEDDING_MODEL_DIR,
+    MODEL_FILE,
+    RERANKER_MODEL_DIR,
+    get_onnx_models_dir,
+    load_onnx_embedding_model,
+    load_onnx_reranker,
+)
+
+TEXTS = [
+    "Wie steht die Partei zur Erhöhung des Mindestlohns?",
+    "Wir wollen den Ausbau der Bahn beschleunigen und die Schiene bis 2030 digitalisieren.",
+    "Das Bürgergeld soll durch eine neue Grundsicherung ersetzt werden, die Arbeit stärker belohnt.",
+]
+PAIRS = [(TEXTS[0], TEXTS[1]), (TEXTS[0], TEXTS[2]), (TEXTS[0], "Der Mindestlohn soll auf 15 Euro steigen.")]
+
+# int8 quantisation trades a little accuracy for speed, so it is compared with looser bounds
+BOUNDS = {False: {"cosine": 0.999, "score": 0.01}, True: {"cosine": 0.97, "score": 0.1}}
+
+
+def require_models() -> None:
+    pytest.importorskip("FlagEmbedding")
+    pytest.importorskip("onnxruntime")
+    for model_dir in (EMBEDDING_MODEL_DIR, RERANKER_MODEL_DIR):
+        if not (get_onnx_models_dir() / model_dir / MODEL_FILE).exists():
+            pytest.skip("ONNX models not exported, run askpolis.search.onnx_export first")
+
+
+@pytest.fixture(scope="module")
+def torch_model() -> Any:
+    require_models()
+    from FlagEmbedding import BGEM3FlagModel
+
+    return BGEM3FlagModel("BAAI/bge-m3", devices="cpu", use_fp16=False, normalize_embeddings=True)
+
+
+@pytest.fixture(scope="module")
+def torch_reranker() -> Any:
+    require_models()
+    from FlagEmbedding import FlagReranker
+
+    return FlagReranker("BAAI/bge-reranker-v2-m3", use_fp16=False)
+
+
+@pytest.mark.parametrize("quantized", [False, True])
+def test_onnx_embeddings_match_torch(torch_model: Any, quantized: bool) -> None:
+    expected = torch_model.encode_corpus(TEXTS, return_dense=True, return_sparse=True)
+    actual = load_onnx_embedding_model(quantized).encode_corpus(TEXTS)
+
+    for expected_dense, actual_dense in zip(expected["dense_vecs"], actual["dense_vecs"], strict=True):
+        cosine = float(
+            np.dot(expected_dense, actual_dense) / np.linalg.norm(expected_dense) / np.linalg.norm(actual_dense)
+        )
+        assert cosine >= BOUNDS[quantized]["cosine"]
+    for expected_weights, actual_weights in zip(expected["lexical_weights"], actual["lexical_weights"], strict=True):
+        top_expected = sorted(expected_weights, key=expected_weights.get, reverse=True)[:5]
+        assert set(top_expected) <= set(actual_weights)
+        for token in top_expected:
+            assert actual_weights[token] == pytest.approx(
+                float(expected_weights[token]), abs=BOUNDS[quantized]["score"]
+            )
+
+
+@pytest.mark.parametrize("quantized", [False, True])
+def test_onnx_reranker_matches_torch(torch_reranker: Any, quantized: bool) -> None:
+    expected = torch_reranker.compute_score(PAIRS, normalize=True)
+    actual = load_onnx_reranker(quantized).compute_score(PAIRS, batch_size=2, max_length=512, normalize=True)
+
+    assert actual == pytest.approx(expected, abs=BOUNDS[quantized]["score"])
+    assert np.argsort(actual).tolist() == np.argsort(expected).tolist()
@@ -1,10 +1,20 @@
+from collections.abc import Awaitable, Callable
 from typing import cast
 
 import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from askpolis.core import Document, DocumentRepository, DocumentType, Page
-from askpolis.search import Embeddings, EmbeddingsCollection, EmbeddingsCollectionRepository, EmbeddingsRepository
+from askpolis.search import (
+    AsyncEmbeddingsCollectionRepository,
+    AsyncEmbeddingsRepository,
+    Embeddings,
+    EmbeddingsCollection,
+    EmbeddingsCollectionRepository,
+    EmbeddingsRepository,
+)
 
 
 def test_embeddings_data_model(db_session: Session) -> None:
@@ -78,3 +88,82 @@ def test_get_all_similar_to(db_session: Session) -> None:
     assert len(similar_docs) == 1
 
     np.testing.assert_array_equal(similar_docs[0][0].embedding, random_vector)
+
+
+@pytest.mark.parametrize("dense_index", ["halfvec", "binary", "prefix-256", "prefix-512"])
+def test_get_all_similar_to_with_compressed_dense_index(db_session: Session, dense_index: str) -> None:
+    collection = EmbeddingsCollection(name="test", version="v1", description="test", dense_index=dense_index)
+    EmbeddingsCollectionRepository(db_session).save(collection)
+
+    document = Document(name="Test Document", document_type=DocumentType.ELECTION_PROGRAM)
+    page = Page(
+        document_id=document.id,
+        page_number=1,
+        content="Test Content",
+        raw_content="Raw Content",
+        page_metadata={"page": 1},
+    )
+    db_session.add(document)
+    db_session.add(page)
+
+    vectors = np.random.default_rng(42).normal(size=(20, 1024)).astype(np.float32)
+    embeddings = [
+        Embeddings(
+            collection=collection,
+            document=document,
+            page=page,
+            chunk=f"chunk {i}",
+            chunk_id=i,
+            embedding=cast(list[float], vector.tolist()),
+            sparse_embedding={"1": 0.123},
+            chunk_metadata={"key": "value"},
+        )
+        for i, vector in enumerate(vectors)
+    ]
+    EmbeddingsRepository(db_session).save_all(embeddings)
+
+    similar_docs = EmbeddingsRepository(db_session).get_all_similar_to(collection, vectors[3].tolist(), limit=2)
+
+    assert similar_docs[0][0].id == embeddings[3].id
+    assert similar_docs[0][0].dense_index == dense_index
+    assert similar_docs[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert similar_docs[0][1] >= similar_docs[1][1]
+
+
+def test_async_get_all_similar_to(
+    run_in_async_session: Callable[[Callable[[AsyncSession], Awaitable[None]]], None],
+) -> None:
+    async def test(session: AsyncSession) -> None:
+        collection = EmbeddingsCollection(name="test", version="v1", description="test collection")
+        document = Document(name="Test Document", document_type=DocumentType.ELECTION_PROGRAM)
+        page = Page(
+            document_id=document.id,
+            page_number=1,
+            content="Test Content",
+            raw_content="Raw Content",
+            page_metadata={"page": 1},
+        )
+        random_vector = cast(list[float], np.random.rand(1024).astype(np.float32).tolist())
+        embeddings = Embeddings(
+            collection=collection,
+            document=document,
+            page=page,
+            chunk="chunk",
+            chunk_id=0,
+            embedding=random_vector,
+            sparse_embedding={"1": 0.123, "11": 0.456, "123": 0.789},
+            chunk_metadata={"key": "value"},
+        )
+        session.add_all([collection, document, page, embeddings])
+        await session.flush()
+
+        collection_from_db = await AsyncEmbeddingsCollectionRepository(session).get_most_recent_by_name("test")
+        assert collection_from_db is not None
+
+        embeddings_repository = AsyncEmbeddingsRepository(session)
+        dense_results = await embeddings_repository.get_all_similar_to(collection_from_db, random_vector)
+        sparse_results = await embeddings_repository.get_all_similar_to(collection_from_db, {"1": 1.0})
+        assert [e.id for e, _ in dense_results] == [embeddings.id]
+        assert [e.id for e, _ in sparse_results] == [embeddings.id]
+
+    run_in_async_session(test)
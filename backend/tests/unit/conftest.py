@@ -0,0 +1,4 @@
+import os
+
+# route tests share the app and client address, the rate limiter has tests of its own
+os.environ["RATE_LIMIT_ENABLED"] = "false"
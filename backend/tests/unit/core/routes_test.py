@@ -1,3 +1,6 @@
+import json
+from collections.abc import AsyncIterator
+
 import uuid_utils.compat as uuid
 from fastapi.testclient import TestClient
 
@@ -5,26 +8,39 @@ from askpolis.core import (
     Document,
     DocumentType,
     Page,
-    get_document_repository,
+    Party,
+    get_async_document_repository,
+    get_async_party_repository,
 )
+from askpolis.http_caching import IMMUTABLE_CACHE_CONTROL
 from askpolis.main import app
-from askpolis.search.dependencies import get_search_service
+from askpolis.search.dependencies import get_async_search_service
 from askpolis.search.models import SearchResult
-from askpolis.search.search_service import SearchServiceBase
 
 
 def setup_client(doc: Document, page: Page) -> TestClient:
     class DocRepo:
-        def get(self, doc_id: uuid.UUID) -> Document | None:
+        async def get(self, doc_id: uuid.UUID) -> Document | None:
             return doc if doc_id == doc.id else None
 
-        def get_page(self, doc_id: uuid.UUID, page_id: uuid.UUID) -> Page | None:
+        async def get_page(self, doc_id: uuid.UUID, page_id: uuid.UUID) -> Page | None:
             if doc_id == doc.id and page_id == page.id:
                 return page
             return None
 
-    class DummySearch(SearchServiceBase):
-        def find_matching_texts(
+        async def get_pages_by_ids(self, page_ids: list[uuid.UUID]) -> list[Page]:
+            return [page] if page.id in page_ids else []
+
+        async def get_pages_after(self, doc_id: uuid.UUID, after: int | None, limit: int) -> list[Page]:
+            pages = [page] if doc_id == doc.id and (after is None or page.page_number > after) else []
+            return pages[:limit]
+
+        async def stream_pages(self, document_id: uuid.UUID | None = None) -> AsyncIterator[Page]:
+            for p in [page, page]:
+                yield p
+
+    class DummySearch:
+        async def find_matching_texts(
             self, query: str, limit: int = 5, use_reranker: bool = False, indexes: list[str] | None = None
         ) -> list[SearchResult]:
             return [
@@ -37,8 +53,8 @@ def setup_client(doc: Document, page: Page) -> TestClient:
                 )
             ]
 
-    app.dependency_overrides[get_document_repository] = lambda: DocRepo()
-    app.dependency_overrides[get_search_service] = lambda: DummySearch()
+    app.dependency_overrides[get_async_document_repository] = lambda: DocRepo()
+    app.dependency_overrides[get_async_search_service] = lambda: DummySearch()
 
     return TestClient(app)
 
@@ -59,6 +75,18 @@ def test_document_and_page_endpoints_and_search_urls() -> None:
     resp = client.get(f"/v0/documents/{document.id}/pages/{page.id}")
     assert resp.status_code == 200
     assert resp.json()["id"] == str(page.id)
+    assert resp.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+
+    resp = client.get(f"/v0/documents/{document.id}/pages/{page.id}", headers={"If-None-Match": resp.headers["ETag"]})
+    assert resp.status_code == 304
+
+    resp = client.get(f"/v0/documents/{document.id}/pages/{uuid.uuid7()}")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Page not found"
+
+    resp = client.get(f"/v0/documents/{uuid.uuid7()}/pages/{page.id}")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Document not found"
 
     resp = client.get("/v0/search", params={"query": "foo"})
     assert resp.status_code == 200
@@ -68,3 +96,70 @@ def test_document_and_page_endpoints_and_search_urls() -> None:
     assert result["page_url"].endswith(f"/v0/documents/{document.id}/pages/{page.id}")
 
     teardown_client()
+
+
+def test_get_pages_by_ids() -> None:
+    document = Document(name="Doc", document_type=DocumentType.ELECTION_PROGRAM)
+    page = Page(document_id=document.id, page_number=1, content="content", raw_content="raw content")
+    client = setup_client(document, page)
+
+    resp = client.get("/v0/pages", params={"id": [str(uuid.uuid7()), str(page.id), str(page.id)]})
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json()] == [str(page.id)]
+
+    resp = client.get("/v0/pages", params={"id": [str(uuid.uuid7()) for _ in range(101)]})
+    assert resp.status_code == 422
+
+    teardown_client()
+
+
+def test_list_pages_of_document_and_export() -> None:
+    document = Document(name="Doc", document_type=DocumentType.ELECTION_PROGRAM)
+    page = Page(document_id=document.id, page_number=1, content="content", raw_content="raw content")
+    client = setup_client(document, page)
+
+    resp = client.get(f"/v0/documents/{document.id}/pages")
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json()["items"]] == [str(page.id)]
+    assert resp.json()["next_cursor"] is None
+
+    resp = client.get(f"/v0/documents/{document.id}/pages", params={"after": 1})
+    assert resp.json()["items"] == []
+
+    resp = client.get(f"/v0/documents/{uuid.uuid7()}/pages")
+    assert resp.status_code == 404
+
+    resp = client.get("/v0/pages/export")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = resp.text.splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["id"] == str(page.id)
+
+    teardown_client()
+
+
+def test_list_parties_with_cursor() -> None:
+    parties = [Party(name=f"Party {i}", short_name=f"P{i}") for i in range(3)]
+
+    class PartyRepo:
+        async def get_all_after(self, after: uuid.UUID | None, limit: int) -> list[Party]:
+            return [p for p in parties if after is None or p.id > after][:limit]
+
+    app.dependency_overrides[get_async_party_repository] = lambda: PartyRepo()
+    client = TestClient(app)
+
+    resp = client.get("/v0/parties", params={"limit": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [p["name"] for p in data["items"]] == ["Party 0", "Party 1"]
+    assert data["next_cursor"] == str(parties[1].id)
+
+    resp = client.get("/v0/parties", params={"limit": 2, "after": data["next_cursor"]})
+    data = resp.json()
+    assert [p["name"] for p in data["items"]] == ["Party 2"]
+    assert data["next_cursor"] is None
+
+    assert client.get("/v0/parties", params={"limit": 0}).status_code == 422
+
+    teardown_client()
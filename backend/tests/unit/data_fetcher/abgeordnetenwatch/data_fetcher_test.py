@@ -1,6 +1,6 @@
 from unittest.mock import MagicMock
 
-from askpolis.data_fetcher import FetchedDataRepository
+from askpolis.data_fetcher import FetchedData, FetchedDataRepository, FetchEngine, FetchError, RetryPolicy
 from askpolis.data_fetcher.abgeordnetenwatch import AbgeordnetenwatchClient, AbgeordnetenwatchDataFetcher
 
 
@@ -17,3 +17,101 @@ def test_fetch_election_programs_returns_early_when_parliament_id_not_found() ->
 
     mock_client.get_all_parliaments.assert_not_called()
     mock_repository.save.assert_not_called()
+
+
+def test_fetch_election_programs_only_downloads_missing_entities() -> None:
+    mock_client = MagicMock(spec=AbgeordnetenwatchClient)
+    mock_repository = MagicMock(spec=FetchedDataRepository)
+    data_fetcher = AbgeordnetenwatchDataFetcher(repository=mock_repository, client=mock_client)
+
+    election_programs = [
+        {"id": 1, "party": {"id": 10, "api_url": "party-10"}, "file": "program-10.pdf"},
+        {"id": 2, "party": {"id": 20, "api_url": "party-20"}, "file": "program-20.pdf"},
+    ]
+    mock_repository.get_by_data_fetcher_and_entity.side_effect = [
+        MagicMock(json_data=[{"id": 5}]),
+        MagicMock(json_data=[{"id": 100, "type": "election"}]),
+        MagicMock(json_data=election_programs),
+    ]
+    mock_repository.get_existing_entities.return_value = {
+        FetchedData.get_entity_for_party(10),
+        FetchedData.get_entity_for_election_program(10, 100),
+        FetchedData.get_entity_for_party(20),
+    }
+
+    data_fetcher.fetch_election_programs(parliament_id=5)
+
+    mock_repository.get_existing_entities.assert_called_once()
+    mock_client.get_party.assert_not_called()
+    mock_client.get_election_program.assert_called_once_with(20, 100, "program-20.pdf")
+    assert mock_repository.save.call_count == 1
+
+
+def test_fetch_election_programs_continues_after_failed_download() -> None:
+    mock_client = MagicMock(spec=AbgeordnetenwatchClient)
+    mock_repository = MagicMock(spec=FetchedDataRepository)
+    data_fetcher = AbgeordnetenwatchDataFetcher(
+        repository=mock_repository,
+        client=mock_client,
+        engine_factory=lambda: FetchEngine(retry_policy=RetryPolicy(max_attempts=1)),
+    )
+
+    election_programs = [
+        {"id": 1, "party": {"id": 10, "api_url": "party-10"}, "file": "program-10.pdf"},
+        {"id": 2, "party": {"id": 20, "api_url": "party-20"}, "file": "program-20.pdf"},
+    ]
+    mock_repository.get_by_data_fetcher_and_entity.side_effect = [
+        MagicMock(json_data=[{"id": 5}]),
+        MagicMock(json_data=[{"id": 100, "type": "election"}]),
+        MagicMock(json_data=election_programs),
+    ]
+    mock_repository.get_existing_entities.return_value = {
+        FetchedData.get_entity_for_party(10),
+        FetchedData.get_entity_for_party(20),
+    }
+
+    def get_election_program(party_id: int, parliament_period_id: int, url: str) -> MagicMock:
+        if party_id == 10:
+            raise FetchError(url, 502)
+        return MagicMock()
+
+    mock_client.get_election_program.side_effect = get_election_program
+
+    report = data_fetcher.fetch_election_programs(parliament_id=5)
+
+    assert report.failed == [FetchedData.get_entity_for_election_program(10, 100)]
+    assert report.fetched == [FetchedData.get_entity_for_election_program(20, 100)]
+    assert mock_repository.save.call_count == 1
+
+
+def test_fetch_election_programs_of_all_parliaments_shares_parties_across_parliaments() -> None:
+    mock_client = MagicMock(spec=AbgeordnetenwatchClient)
+    mock_repository = MagicMock(spec=FetchedDataRepository)
+    data_fetcher = AbgeordnetenwatchDataFetcher(repository=mock_repository, client=mock_client)
+
+    cached_data = {
+        FetchedData.get_entity_for_list_of_parliaments(): [{"id": 5}, {"id": 6}],
+        FetchedData.get_entity_for_list_of_parliament_periods(5): [{"id": 100, "type": "election"}],
+        FetchedData.get_entity_for_list_of_parliament_periods(6): [
+            {"id": 200, "type": "election"},
+            {"id": 201, "type": "legislature"},
+        ],
+        FetchedData.get_entity_for_list_of_election_programs(100): [
+            {"id": 1, "party": {"id": 10, "api_url": "party-10"}, "file": None}
+        ],
+        FetchedData.get_entity_for_list_of_election_programs(200): [
+            {"id": 2, "party": {"id": 10, "api_url": "party-10"}, "file": None}
+        ],
+    }
+    mock_repository.get_by_data_fetcher_and_entity.side_effect = lambda _, entity: MagicMock(
+        json_data=cached_data[entity]
+    )
+    mock_repository.get_existing_entities.return_value = set()
+
+    report = data_fetcher.fetch_election_programs_of_all_parliaments()
+
+    mock_client.get_all_parliaments.assert_not_called()
+    mock_client.get_party.assert_called_once_with(10, "party-10")
+    assert report.fetched == [FetchedData.get_entity_for_party(10)]
+    assert report.failed == []
+    assert set(report.durations) == {"5", "6"}
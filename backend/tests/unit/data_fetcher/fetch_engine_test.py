@@ -0,0 +1,134 @@
+import asyncio
+import datetime
+import email.utils
+
+import pytest
+
+from askpolis.data_fetcher import FetchEngine, FetchError, RetryPolicy
+from askpolis.data_fetcher.fetch_engine import TokenBucket, parse_retry_after
+
+
+class FlakyRequest:
+    def __init__(self, errors: list[Exception], result: str = "ok") -> None:
+        self.errors = errors
+        self.result = result
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+def create_engine(delays: list[float], max_attempts: int = 5) -> FetchEngine:
+    async def record_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    return FetchEngine(
+        requests_per_second=1000,
+        burst=1000,
+        retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0.1, max_delay=10),
+        sleep=record_sleep,
+    )
+
+
+def test_retries_transient_errors() -> None:
+    delays: list[float] = []
+    engine = create_engine(delays)
+    request = FlakyRequest([FetchError("url", 502), FetchError("url", 503)])
+
+    result = asyncio.run(engine.fetch("entity", request))
+
+    assert result == "ok"
+    assert request.calls == 3
+    assert len(delays) == 2
+    assert engine.report.fetched == ["entity"]
+    assert engine.report.failed == []
+
+
+def test_honours_retry_after() -> None:
+    delays: list[float] = []
+    engine = create_engine(delays)
+    request = FlakyRequest([FetchError("url", 429, retry_after=7)])
+
+    asyncio.run(engine.fetch("entity", request))
+
+    assert delays == [7]
+
+
+def test_gives_up_if_retry_after_exceeds_max_delay() -> None:
+    delays: list[float] = []
+    engine = create_engine(delays)
+    request = FlakyRequest([FetchError("url", 429, retry_after=120)])
+
+    result = asyncio.run(engine.fetch("entity", request))
+
+    assert result is None
+    assert request.calls == 1
+    assert delays == []
+    assert engine.report.failed == ["entity"]
+    assert RetryPolicy(max_delay=60).delay(1, retry_after=120) is None
+    assert RetryPolicy(max_delay=60).delay(1, retry_after=60) == 60
+
+
+def test_does_not_retry_client_errors() -> None:
+    delays: list[float] = []
+    engine = create_engine(delays)
+    request = FlakyRequest([FetchError("url", 404)])
+
+    result = asyncio.run(engine.fetch("entity", request))
+
+    assert result is None
+    assert request.calls == 1
+    assert delays == []
+    assert engine.report.failed == ["entity"]
+
+
+def test_gives_up_after_max_attempts() -> None:
+    delays: list[float] = []
+    engine = create_engine(delays, max_attempts=3)
+    request = FlakyRequest([FetchError("url", 502) for _ in range(5)])
+
+    result = asyncio.run(engine.fetch("entity", request))
+
+    assert result is None
+    assert request.calls == 3
+    assert engine.report.failed == ["entity"]
+
+
+def test_concurrent_requests_for_same_entity_are_sent_once() -> None:
+    engine = create_engine([])
+    request = FlakyRequest([])
+
+    async def fetch_twice() -> list[str | None]:
+        return list(await asyncio.gather(engine.fetch("entity", request), engine.fetch("entity", request)))
+
+    assert asyncio.run(fetch_twice()) == ["ok", "ok"]
+    assert request.calls == 1
+
+
+def test_token_bucket_limits_rate_after_burst() -> None:
+    now = [0.0]
+
+    async def advance_clock(delay: float) -> None:
+        now[0] += delay
+
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=advance_clock)
+
+    async def acquire_three() -> None:
+        for _ in range(3):
+            await bucket.acquire()
+
+    asyncio.run(acquire_three())
+
+    assert now[0] == pytest.approx(0.5)
+
+
+def test_parse_retry_after() -> None:
+    in_ten_seconds = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=10)
+
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("invalid") is None
+    assert 0 < (parse_retry_after(email.utils.format_datetime(in_ten_seconds)) or 0) <= 10
@@ -1,9 +1,12 @@
 """Tests for data_fetcher Celery tasks."""
 
+import uuid
 from collections.abc import Iterator
 from typing import Any
 
+from askpolis.data_fetcher import DataFetcherType, FetchReport
 from askpolis.data_fetcher import tasks as df_tasks
+from askpolis.data_fetcher.repositories import DeletedBatch, OutdatedDataDeletion
 
 
 class DummySession:
@@ -20,8 +23,8 @@ def test_fetch_bundestag_from_abgeordnetenwatch_returns_result(monkeypatch: Any)
         def __init__(self, repo: Any) -> None:
             pass
 
-        def fetch_election_programs(self, parliament_id: int) -> None:  # pragma: no cover - stub
-            pass
+        def fetch_election_programs(self, parliament_id: int) -> FetchReport:
+            return FetchReport(fetched=["parliaments"])
 
     monkeypatch.setattr(df_tasks, "get_db", fake_get_db)
     monkeypatch.setattr(df_tasks, "AbgeordnetenwatchDataFetcher", DummyDataFetcher)
@@ -31,6 +34,28 @@ def test_fetch_bundestag_from_abgeordnetenwatch_returns_result(monkeypatch: Any)
     assert result["status"] == "success"
     assert result["entity_id"] == "5"
     assert result["data"]["action"] == "fetch_election_programs"
+    assert result["data"]["fetched"] == 1
+    assert result["data"]["failed"] == []
+
+
+def test_fetch_parliaments_from_abgeordnetenwatch_returns_result(monkeypatch: Any) -> None:
+    class DummyDataFetcher:
+        def __init__(self, repo: Any) -> None:
+            pass
+
+        def fetch_election_programs_of_all_parliaments(self) -> FetchReport:
+            return FetchReport(fetched=["parliaments"], failed=["party/10"], durations={"5": 1.5, "6": 0.5})
+
+    monkeypatch.setattr(df_tasks, "get_db", fake_get_db)
+    monkeypatch.setattr(df_tasks, "AbgeordnetenwatchDataFetcher", DummyDataFetcher)
+
+    result = df_tasks.fetch_parliaments_from_abgeordnetenwatch()
+
+    assert result["status"] == "partial_failure"
+    assert result["data"]["action"] == "fetch_election_programs_of_all_parliaments"
+    assert result["data"]["fetched"] == 1
+    assert result["data"]["failed"] == ["party/10"]
+    assert result["data"]["durations"] == {"5": 1.5, "6": 0.5}
 
 
 def test_cleanup_outdated_data_returns_result(monkeypatch: Any) -> None:
@@ -38,9 +63,12 @@ def test_cleanup_outdated_data_returns_result(monkeypatch: Any) -> None:
         def __init__(self, session: DummySession) -> None:
             pass
 
-        def delete_outdated_data(self) -> None:  # pragma: no cover - stub
-            pass
+        def delete_outdated_data(self) -> list[OutdatedDataDeletion]:
+            batch = DeletedBatch(first_id=first_id, last_id=last_id, rows=2, bytes=1024)
+            return [OutdatedDataDeletion(DataFetcherType.ABGEORDNETENWATCH, 2, [batch], True)]
 
+    first_id = uuid.uuid4()
+    last_id = uuid.uuid4()
     monkeypatch.setattr(df_tasks, "get_db", fake_get_db)
     monkeypatch.setattr(df_tasks, "FetchedDataRepository", DummyRepository)
 
@@ -48,3 +76,11 @@ def test_cleanup_outdated_data_returns_result(monkeypatch: Any) -> None:
 
     assert result["status"] == "success"
     assert result["data"]["action"] == "cleanup_outdated_data"
+    assert result["data"]["deletions"] == [
+        {
+            "data_fetcher_type": "abgeordnetenwatch",
+            "rows": 2,
+            "completed": True,
+            "batches": [{"first_id": str(first_id), "last_id": str(last_id), "rows": 2, "bytes": 1024}],
+        }
+    ]
@@ -0,0 +1,59 @@
+from typing import Any
+
+import pytest
+import sqlalchemy
+from sqlalchemy import Engine, QueuePool
+
+from askpolis.db import ROLE_API, ROLE_WORKER, create_db_engine, dependencies, get_pool_usage, reset_engine
+from askpolis.db import engine as engine_module
+
+
+def test_create_db_engine_uses_pool_settings_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "7")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+
+    engine = create_db_engine(ROLE_API)
+
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 7
+    assert engine.pool._recycle == 600
+    assert engine.pool._pre_ping is True
+
+
+def test_create_db_engine_sets_statement_timeout_per_role(monkeypatch: pytest.MonkeyPatch) -> None:
+    connect_args: dict[str, dict[str, Any]] = {}
+
+    def create_engine(url: str, **kwargs: Any) -> Engine:
+        connect_args[kwargs["connect_args"]["application_name"]] = kwargs["connect_args"]
+        return sqlalchemy.create_engine(url, **kwargs)
+
+    monkeypatch.setattr(engine_module, "create_engine", create_engine)
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_WORKER_MS", "1000")
+
+    create_db_engine(ROLE_API)
+    create_db_engine(ROLE_WORKER)
+
+    assert connect_args["askpolis-api"]["options"] == "-c statement_timeout=15000"
+    assert connect_args["askpolis-worker"]["options"] == "-c statement_timeout=1000"
+
+
+def test_get_pool_usage_reports_engines_by_role() -> None:
+    create_db_engine(ROLE_WORKER)
+
+    usage = get_pool_usage()
+
+    assert usage[ROLE_WORKER]["checked_out"] == 0
+    assert set(usage[ROLE_WORKER]) == {"size", "checked_out", "idle", "overflow"}
+
+
+def test_reset_engine_switches_role(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(dependencies, "engine", create_db_engine(ROLE_API))
+    monkeypatch.setattr(dependencies, "role", ROLE_API)
+
+    reset_engine(ROLE_WORKER)
+
+    assert dependencies.engine is None
+    assert dependencies.DbSession is None
+    assert dependencies.role == ROLE_WORKER
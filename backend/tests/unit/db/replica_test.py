@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from askpolis.db import dependencies
+from askpolis.db.replica import ReplicaLagMonitor
+
+
+class Lag:
+    def __init__(self, lag: float | None) -> None:
+        self.lag = lag
+        self.calls = 0
+
+    async def __call__(self) -> float | None:
+        self.calls += 1
+        if self.lag is None:
+            raise ConnectionError("replica is down")
+        return self.lag
+
+
+def test_replica_is_fresh_within_max_lag() -> None:
+    assert asyncio.run(ReplicaLagMonitor(Lag(1.0), max_lag_seconds=5).is_fresh()) is True
+    assert asyncio.run(ReplicaLagMonitor(Lag(10.0), max_lag_seconds=5).is_fresh()) is False
+
+
+def test_unreachable_replica_is_stale() -> None:
+    assert asyncio.run(ReplicaLagMonitor(Lag(None), max_lag_seconds=5).is_fresh()) is False
+
+
+def test_lag_is_checked_once_per_interval() -> None:
+    now = [0.0]
+    lag = Lag(1.0)
+    monitor = ReplicaLagMonitor(lag, max_lag_seconds=5, check_interval_seconds=5, clock=lambda: now[0])
+
+    asyncio.run(monitor.is_fresh())
+    lag.lag = 10.0
+    assert asyncio.run(monitor.is_fresh()) is True
+    assert lag.calls == 1
+
+    now[0] = 5.0
+    assert asyncio.run(monitor.is_fresh()) is False
+    assert lag.calls == 2
+
+
+def test_read_sessions_use_primary_without_replica(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("DATABASE_READ_URL", raising=False)
+    monkeypatch.setattr(dependencies, "async_engine", None)
+    monkeypatch.setattr(dependencies, "AsyncDbSession", None)
+
+    session_maker = asyncio.run(dependencies._get_async_read_sessionmaker())
+
+    assert session_maker is dependencies.AsyncDbSession
+
+
+def test_read_sessions_fall_back_to_primary_if_replica_is_stale(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_READ_URL", "postgresql+psycopg://postgres@replica:5432/askpolis-db")
+    for name in ("async_engine", "AsyncDbSession", "async_read_engine", "AsyncReadDbSession"):
+        monkeypatch.setattr(dependencies, name, None)
+
+    monkeypatch.setattr(dependencies, "replica_lag_monitor", ReplicaLagMonitor(Lag(1.0), max_lag_seconds=5))
+    assert asyncio.run(dependencies._get_async_read_sessionmaker()) is dependencies.AsyncReadDbSession
+
+    monkeypatch.setattr(dependencies, "replica_lag_monitor", ReplicaLagMonitor(Lag(10.0), max_lag_seconds=5))
+    assert asyncio.run(dependencies._get_async_read_sessionmaker()) is dependencies.AsyncDbSession
@@ -0,0 +1,40 @@
+import logging
+
+import pytest
+
+from askpolis.logging import get_logger
+
+
+class FailingToFormat:
+    def __str__(self) -> str:
+        raise AssertionError("attributes of disabled levels must not be formatted")
+
+
+def test_attributes_are_passed_as_record_attributes(caplog: pytest.LogCaptureFixture) -> None:
+    logger = get_logger("askpolis.tests.logging")
+
+    with caplog.at_level(logging.INFO, logger="askpolis.tests.logging"):
+        logger.info_with_attrs("Fetched 100% of pages", {"document": "doc", "pages": 3, "error": ValueError("x")})
+
+    record = caplog.records[0]
+    assert record.getMessage() == "Fetched 100% of pages document=doc pages=3 error=x"
+    assert record.__dict__["askpolis.document"] == "doc"
+    assert record.__dict__["askpolis.pages"] == 3
+    assert record.__dict__["askpolis.error"] == "x"
+    assert record.funcName == "test_attributes_are_passed_as_record_attributes"
+
+
+def test_disabled_levels_are_not_formatted(caplog: pytest.LogCaptureFixture) -> None:
+    logger = get_logger("askpolis.tests.logging")
+
+    with caplog.at_level(logging.WARNING, logger="askpolis.tests.logging"):
+        logger.info_with_attrs("Not logged", {"value": FailingToFormat()})
+
+    assert caplog.records == []
+
+
+def test_get_logger_keeps_level_of_existing_logger() -> None:
+    logger = get_logger("askpolis.tests.logging.level")
+    logger.setLevel(logging.DEBUG)
+
+    assert get_logger("askpolis.tests.logging.level").level == logging.DEBUG
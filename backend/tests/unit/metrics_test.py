@@ -0,0 +1,80 @@
+from collections.abc import Generator
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry import metrics as otel_metrics
+from sqlalchemy.orm import Session
+
+from askpolis import metrics
+
+
+def test_backlog_is_observed_with_a_session_per_callback(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = MagicMock()
+
+    def get_db() -> Generator[MagicMock, None, None]:
+        yield session
+
+    monkeypatch.setattr(metrics, "get_db", get_db)
+    callback = metrics._observe_backlog("stale_questions", lambda db: 3 if db is session else 0)
+
+    observations = list(callback(otel_metrics.CallbackOptions()))
+
+    assert [o.value for o in observations] == [3]
+    session.close.assert_called_once()
+
+
+def test_failing_backlog_query_is_not_observed(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = MagicMock()
+
+    def get_db() -> Generator[MagicMock, None, None]:
+        yield session
+
+    def count(_: Session) -> int:
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(metrics, "get_db", get_db)
+    callback = metrics._observe_backlog("stale_questions", count)
+
+    assert list(callback(otel_metrics.CallbackOptions())) == []
+    session.close.assert_called_once()
+
+
+def test_backlog_gauges_are_registered_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    meter = MagicMock()
+    monkeypatch.setattr(metrics, "_meter", meter)
+    monkeypatch.setattr(metrics, "_backlog_gauges_registered", False)
+
+    metrics.register_backlog_gauges()
+    metrics.register_backlog_gauges()
+
+    names = [c.args[0] for c in meter.create_observable_gauge.call_args_list]
+    assert names == [
+        "askpolis.backlog.documents_without_embeddings",
+        "askpolis.backlog.election_programs_without_documents",
+        "askpolis.backlog.stale_questions",
+    ]
+
+
+def test_backlog_gauges_can_be_switched_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    meter = MagicMock()
+    monkeypatch.setattr(metrics, "_meter", meter)
+    monkeypatch.setattr(metrics, "_backlog_gauges_registered", False)
+    monkeypatch.setenv("BACKLOG_METRICS_ENABLED", "false")
+
+    metrics.register_backlog_gauges()
+
+    meter.create_observable_gauge.assert_not_called()
+
+
+def test_backlog_gauges_are_only_registered_when_enabled_if_off_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    meter = MagicMock()
+    monkeypatch.setattr(metrics, "_meter", meter)
+    monkeypatch.setattr(metrics, "_backlog_gauges_registered", False)
+    monkeypatch.delenv("BACKLOG_METRICS_ENABLED", raising=False)
+
+    metrics.register_backlog_gauges(enabled_by_default=False)
+    meter.create_observable_gauge.assert_not_called()
+
+    monkeypatch.setenv("BACKLOG_METRICS_ENABLED", "true")
+    metrics.register_backlog_gauges(enabled_by_default=False)
+    assert meter.create_observable_gauge.call_count == 3
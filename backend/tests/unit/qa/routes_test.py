@@ -1,24 +1,46 @@
+import datetime
 import uuid
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 from fastapi.testclient import TestClient
 
-from askpolis.core import get_document_repository
+from askpolis.http_caching import (
+    COMPLETED_CACHE_CONTROL,
+    PENDING_CACHE_CONTROL,
+    InProcessResponseCache,
+    get_response_cache,
+)
 from askpolis.main import app
-from askpolis.qa.dependencies import get_question_repository
-from askpolis.qa.models import Answer, AnswerContent, Question
-from askpolis.search import get_embeddings_repository
+from askpolis.qa.citation_service import CitationCache, CitationService
+from askpolis.qa.dependencies import (
+    get_async_primary_question_repository,
+    get_async_question_repository,
+    get_citation_service,
+)
+from askpolis.qa.models import Answer, AnswerContent, Citation, HydratedCitation, Question, QuestionSummary
+from askpolis.search import SearchResult
 
 
 class DummyQuestionRepository:
-    def __init__(self, question: Question) -> None:
+    def __init__(self, question: Question | None) -> None:
         self.question = question
 
-    def get(self, question_id: uuid.UUID) -> Question | None:
-        if question_id == self.question.id:
+    async def get(self, question_id: uuid.UUID) -> Question | None:
+        if self.question is not None and question_id == self.question.id:
             return self.question
         return None
 
+    async def get_all_after(self, after: uuid.UUID | None, limit: int) -> list[QuestionSummary]:
+        if self.question is None or (after is not None and self.question.id <= after):
+            return []
+        return [QuestionSummary(self.question, len(self.question.answers) > 0)][:limit]
+
+
+def create_citation_repository(citations: list[HydratedCitation] | None = None) -> MagicMock:
+    citation_repository = MagicMock()
+    citation_repository.get_hydrated_citations = AsyncMock(return_value=citations or [])
+    return citation_repository
+
 
 def test_get_question_returns_answer() -> None:
     question = Question("What is the answer?")
@@ -26,9 +48,9 @@ def test_get_question_returns_answer() -> None:
     answer.question_id = question.id
     question.answers.append(answer)
 
-    app.dependency_overrides[get_question_repository] = lambda: DummyQuestionRepository(question)
-    app.dependency_overrides[get_document_repository] = lambda: MagicMock()
-    app.dependency_overrides[get_embeddings_repository] = lambda: MagicMock()
+    app.dependency_overrides[get_async_question_repository] = lambda: DummyQuestionRepository(question)
+    app.dependency_overrides[get_async_primary_question_repository] = lambda: DummyQuestionRepository(None)
+    app.dependency_overrides[get_citation_service] = lambda: CitationService(create_citation_repository())
 
     client = TestClient(app)
     response = client.get(f"/v0/questions/{question.id}")
@@ -46,9 +68,9 @@ def test_get_answer_trims_language_code() -> None:
     answer.question_id = question.id
     question.answers.append(answer)
 
-    app.dependency_overrides[get_question_repository] = lambda: DummyQuestionRepository(question)
-    app.dependency_overrides[get_document_repository] = lambda: MagicMock()
-    app.dependency_overrides[get_embeddings_repository] = lambda: MagicMock()
+    app.dependency_overrides[get_async_question_repository] = lambda: DummyQuestionRepository(question)
+    app.dependency_overrides[get_async_primary_question_repository] = lambda: DummyQuestionRepository(None)
+    app.dependency_overrides[get_citation_service] = lambda: CitationService(create_citation_repository())
 
     client = TestClient(app)
     response = client.get(f"/v0/questions/{question.id}/answer")
@@ -59,3 +81,131 @@ def test_get_answer_trims_language_code() -> None:
     assert data["language"] == "de"
 
     app.dependency_overrides.clear()
+
+
+def test_get_question_falls_back_to_primary_if_not_replicated_yet() -> None:
+    question = Question("What is the answer?")
+
+    app.dependency_overrides[get_async_question_repository] = lambda: DummyQuestionRepository(None)
+    app.dependency_overrides[get_async_primary_question_repository] = lambda: DummyQuestionRepository(question)
+    app.dependency_overrides[get_citation_service] = lambda: CitationService(create_citation_repository())
+
+    client = TestClient(app)
+    response = client.get(f"/v0/questions/{question.id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+
+    response = client.get(f"/v0/questions/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+    app.dependency_overrides.clear()
+
+
+def test_get_answer_supports_conditional_requests_and_response_cache() -> None:
+    question = Question("What is the answer?")
+    answer = Answer(contents=[AnswerContent("en-US", "42")], citations=[])
+    answer.question_id = question.id
+    question.answers.append(answer)
+    response_cache = InProcessResponseCache()
+
+    app.dependency_overrides[get_async_question_repository] = lambda: DummyQuestionRepository(question)
+    app.dependency_overrides[get_async_primary_question_repository] = lambda: DummyQuestionRepository(None)
+    app.dependency_overrides[get_citation_service] = lambda: CitationService(create_citation_repository())
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+
+    client = TestClient(app)
+    response = client.get(f"/v0/questions/{question.id}/answer")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == COMPLETED_CACHE_CONTROL
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/v0/questions/{question.id}/answer", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # served from the cache without building the answer again
+    answer.contents[0].content = "43"
+    response = client.get(f"/v0/questions/{question.id}/answer")
+    assert response.json()["answer"] == "42"
+
+    # the representation of the question itself has a different tag
+    response = client.get(f"/v0/questions/{question.id}")
+    assert response.headers["ETag"] != etag
+    assert response.json()["answer"]["answer"] == "43"
+
+    answer.updated_at = answer.updated_at + datetime.timedelta(seconds=1)
+    response = client.get(f"/v0/questions/{question.id}/answer", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["answer"] == "43"
+
+    app.dependency_overrides.clear()
+
+
+def test_pending_answer_is_revalidated() -> None:
+    question = Question("What is the answer?")
+
+    app.dependency_overrides[get_async_question_repository] = lambda: DummyQuestionRepository(question)
+    app.dependency_overrides[get_async_primary_question_repository] = lambda: DummyQuestionRepository(None)
+
+    client = TestClient(app)
+    response = client.get(f"/v0/questions/{question.id}/answer")
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    assert response.headers["Cache-Control"] == PENDING_CACHE_CONTROL
+
+    app.dependency_overrides.clear()
+
+
+def test_list_questions() -> None:
+    question = Question("What is the answer?")
+
+    app.dependency_overrides[get_async_question_repository] = lambda: DummyQuestionRepository(question)
+
+    client = TestClient(app)
+    response = client.get("/v0/questions/")
+    assert response.status_code == 200
+    data = response.json()
+    assert [q["id"] for q in data["items"]] == [str(question.id)]
+    assert data["items"][0]["status"] == "pending"
+    assert data["items"][0]["answer"] is None
+    assert data["next_cursor"] is None
+
+    response = client.get("/v0/questions/", params={"after": str(question.id)})
+    assert response.json()["items"] == []
+
+    app.dependency_overrides.clear()
+
+
+def test_citations_are_hydrated_once_per_answer() -> None:
+    document_id = uuid.uuid4()
+    page_id = uuid.uuid4()
+    question = Question("What is the answer?")
+    search_result = SearchResult(
+        matching_text="text", chunk_id=uuid.uuid4(), document_id=document_id, page_id=page_id, score=1.0
+    )
+    answer = Answer(contents=[AnswerContent("en-US", "42")], citations=[Citation(search_result)])
+    answer.question_id = question.id
+    question.answers.append(answer)
+    citation_repository = create_citation_repository(
+        [
+            HydratedCitation(document_id=document_id, page_id=page_id, title="Program", content="chunk"),
+            HydratedCitation(document_id=document_id, page_id=None, title=None, content=None),
+        ]
+    )
+    citation_service = CitationService(citation_repository, CitationCache())
+
+    app.dependency_overrides[get_async_question_repository] = lambda: DummyQuestionRepository(question)
+    app.dependency_overrides[get_async_primary_question_repository] = lambda: DummyQuestionRepository(None)
+    app.dependency_overrides[get_citation_service] = lambda: citation_service
+
+    client = TestClient(app)
+    citations = client.get(f"/v0/questions/{question.id}/answer").json()["citations"]
+    assert citations[0]["title"] == "Program"
+    assert citations[0]["content"] == "chunk"
+    assert citations[0]["url"].endswith(f"/v0/documents/{document_id}/pages/{page_id}")
+    assert citations[1] == {"title": "Unknown", "content": "Unknown", "url": None}
+
+    assert client.get(f"/v0/questions/{question.id}").json()["answer"]["citations"] == citations
+    assert citation_repository.get_hydrated_citations.await_count == 1
+
+    app.dependency_overrides.clear()
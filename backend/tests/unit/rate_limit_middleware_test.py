@@ -1,26 +1,69 @@
+import math
+import re
+from typing import Any
+
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from redis.exceptions import NoScriptError
 
-from askpolis.rate_limiting import RateLimitMiddleware, RedisLike
+from askpolis.rate_limiting import (
+    GCRA_SCRIPT,
+    GCRA_SCRIPT_SHA,
+    LocalRateLimiter,
+    RateLimitMiddleware,
+    RateLimitRule,
+    RedisLike,
+    get_rules_from_env,
+)
 
 
 class DummyRedis(RedisLike):
+    """Emulates the GCRA script with a manually advanced clock in milliseconds."""
+
     def __init__(self) -> None:
-        self.data: dict[str, int] = {}
+        self.now = 0.0
+        self.data: dict[str, float] = {}
+        self.scripts: set[str] = set()
+        self.calls = 0
+
+    async def script_load(self, script: str) -> str:
+        assert script == GCRA_SCRIPT
+        self.scripts.add(GCRA_SCRIPT_SHA)
+        return GCRA_SCRIPT_SHA
 
-    async def incr(self, key: str) -> int:
-        self.data[key] = self.data.get(key, 0) + 1
-        return self.data[key]
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: str) -> Any:
+        self.calls += 1
+        if sha not in self.scripts:
+            raise NoScriptError("NOSCRIPT No matching script.")
+        key, emission_interval, period, cost, spent = keys_and_args
+        tat = max(self.data.get(key, self.now), self.now) + float(emission_interval) * int(spent)
+        new_tat = tat + float(emission_interval) * int(cost)
+        allow_at = new_tat - float(period)
+        if allow_at > self.now:
+            if int(spent) > 0:
+                self.data[key] = tat
+            return [0, math.ceil(allow_at - self.now)]
+        self.data[key] = new_tat
+        return [1, 0]
 
-    async def expire(self, key: str, ttl: int) -> None:  # noqa: D401 - simple dummy
-        self.data.setdefault(key, 0)
-        return None
 
+SEARCH_RULE = RateLimitRule(name="search", pattern=re.compile(r"/search"), limit=10, query_costs={"reranking": 4})
+QUESTIONS_RULE = RateLimitRule(name="questions", pattern=re.compile(r"/questions/?"), methods={"POST"}, limit=2)
 
-def create_app() -> FastAPI:
+
+def create_app(redis_client: DummyRedis | None = None, redis_threshold: float = 0.5) -> FastAPI:
+    redis_client = redis_client or DummyRedis()
     app = FastAPI()
-    app.add_middleware(RateLimitMiddleware, redis_client=DummyRedis(), limit=5, period=60)
+    app.add_middleware(
+        RateLimitMiddleware,
+        redis_client=redis_client,
+        limit=5,
+        period=60,
+        rules=[SEARCH_RULE, QUESTIONS_RULE],
+        redis_threshold=redis_threshold,
+        clock=lambda: redis_client.now / 1000,
+    )
 
     @app.get("/")
     def read_root() -> dict[str, str]:
@@ -30,6 +73,18 @@ def create_app() -> FastAPI:
     def foo() -> dict[str, str]:
         return {"foo": "bar"}
 
+    @app.get("/search")
+    def search(reranking: bool = False) -> dict[str, bool]:
+        return {"reranking": reranking}
+
+    @app.get("/questions/")
+    def list_questions() -> list[str]:
+        return []
+
+    @app.post("/questions/")
+    def ask_question() -> dict[str, str]:
+        return {"question": "asked"}
+
     @app.get("/healthz")
     def health() -> dict[str, bool]:
         return {"healthy": True}
@@ -95,3 +150,223 @@ def test_env_var_overrides_limit(monkeypatch: pytest.MonkeyPatch) -> None:
         assert resp.status_code == 200
     resp = client.get("/foo")
     assert resp.status_code == 429
+
+
+def test_rate_limit_returns_retry_after() -> None:
+    client = TestClient(create_app())
+    for _ in range(5):
+        client.get("/foo")
+    resp = client.get("/foo")
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "12"
+
+
+def test_rate_limit_refills_gradually() -> None:
+    redis_client = DummyRedis()
+    client = TestClient(create_app(redis_client))
+    for _ in range(5):
+        assert client.get("/foo").status_code == 200
+    assert client.get("/foo").status_code == 429
+
+    # one request is regained per emission interval of period / limit instead of all at the next window edge
+    redis_client.now += 12_000
+    assert client.get("/foo").status_code == 200
+    assert client.get("/foo").status_code == 429
+
+
+def test_rate_limit_loads_script_on_startup() -> None:
+    redis_client = DummyRedis()
+    with TestClient(create_app(redis_client, redis_threshold=0)) as client:
+        assert GCRA_SCRIPT_SHA in redis_client.scripts
+        for _ in range(3):
+            client.get("/foo")
+
+    assert redis_client.calls == 3
+
+
+def test_rate_limit_asks_redis_only_near_limit() -> None:
+    redis_client = DummyRedis()
+    with TestClient(create_app(redis_client)) as client:
+        for _ in range(5):
+            assert client.get("/foo").status_code == 200
+
+    # the first two requests use less than half of the budget of five
+    assert redis_client.calls == 3
+
+
+def test_rate_limit_charges_requests_served_locally_when_asking_redis() -> None:
+    redis_client = DummyRedis()
+    first_process = TestClient(create_app(redis_client))
+    second_process = TestClient(create_app(redis_client))
+
+    for _ in range(3):
+        assert first_process.get("/foo").status_code == 200
+    # all three requests count against the global budget, not only the one that asked Redis
+    assert redis_client.data["rate-limit:testclient"] == 36_000
+
+    for _ in range(2):
+        assert second_process.get("/foo").status_code == 200
+    assert second_process.get("/foo").status_code == 429
+
+
+def test_rate_limit_clamps_redis_threshold(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RATE_LIMIT_REDIS_THRESHOLD", "-1")
+    redis_client = DummyRedis()
+    with TestClient(create_app(redis_client)) as client:
+        for _ in range(5):
+            assert client.get("/foo").status_code == 200
+
+    # a threshold of zero asks Redis for every request
+    assert redis_client.calls == 5
+
+
+def test_rate_limit_ignores_invalid_redis_threshold(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RATE_LIMIT_REDIS_THRESHOLD", "half")
+    redis_client = DummyRedis()
+    with TestClient(create_app(redis_client)) as client:
+        for _ in range(5):
+            assert client.get("/foo").status_code == 200
+
+    assert redis_client.calls == 3
+
+
+def test_rate_limit_reloads_script_once() -> None:
+    redis_client = DummyRedis()
+    client = TestClient(create_app(redis_client, redis_threshold=0))
+    for _ in range(3):
+        client.get("/foo")
+
+    # without the script, e.g. after a Redis restart, the first call fails with NOSCRIPT and is retried after loading
+    assert redis_client.calls == 4
+
+
+def test_rate_limit_falls_back_to_local_limiting_on_redis_errors() -> None:
+    class BrokenRedis(DummyRedis):
+        async def evalsha(self, sha: str, numkeys: int, *keys_and_args: str) -> Any:
+            raise ConnectionError("redis is down")
+
+    client = TestClient(create_app(BrokenRedis()))
+    for _ in range(5):
+        assert client.get("/foo").status_code == 200
+    assert client.get("/foo").status_code == 429
+
+
+def test_rate_limit_skips_redis_for_a_while_after_errors() -> None:
+    class BrokenRedis(DummyRedis):
+        async def evalsha(self, sha: str, numkeys: int, *keys_and_args: str) -> Any:
+            self.calls += 1
+            raise ConnectionError("redis is down")
+
+    redis_client = BrokenRedis()
+    client = TestClient(create_app(redis_client, redis_threshold=0))
+    for _ in range(3):
+        assert client.get("/foo").status_code == 200
+    assert redis_client.calls == 1
+
+    redis_client.now += 5_000
+    assert client.get("/foo").status_code == 200
+    assert redis_client.calls == 2
+
+
+def test_rate_limit_rejects_clients_over_local_limit_without_redis() -> None:
+    redis_client = DummyRedis()
+    client = TestClient(create_app(redis_client))
+    for _ in range(5):
+        client.get("/foo")
+    calls = redis_client.calls
+
+    for _ in range(10):
+        assert client.get("/foo").status_code == 429
+    assert redis_client.calls == calls
+
+
+def test_rate_limit_remembers_clients_blocked_by_redis() -> None:
+    redis_client = DummyRedis()
+    # requests of the client that were served by other processes
+    redis_client.data["rate-limit:testclient"] = 60_000
+    client = TestClient(create_app(redis_client, redis_threshold=0))
+
+    assert client.get("/foo").status_code == 429
+    calls = redis_client.calls
+    assert client.get("/foo").status_code == 429
+    assert redis_client.calls == calls
+
+
+def test_local_rate_limiter_evicts_least_recently_used_keys() -> None:
+    limiter = LocalRateLimiter(limit=1, period=60, max_keys=2, clock=lambda: 0.0)
+
+    assert limiter.acquire("a") == (True, 0)
+    assert limiter.acquire("b") == (True, 0)
+    assert limiter.acquire("a") == (False, 60_000)
+    assert limiter.acquire("c") == (True, 0)
+
+    # "a" was used more recently than "b", so "b" was evicted and starts over
+    assert limiter.acquire("a")[0] is False
+    assert limiter.acquire("b") == (True, 0)
+
+
+def test_expensive_routes_have_separate_budgets() -> None:
+    client = TestClient(create_app())
+    for _ in range(5):
+        assert client.get("/foo").status_code == 200
+    assert client.get("/foo").status_code == 429
+
+    assert client.get("/search").status_code == 200
+    assert client.post("/questions/").status_code == 200
+
+
+def test_query_parameters_add_cost() -> None:
+    client = TestClient(create_app())
+    # reranking costs 5 tokens of the search budget of 10
+    for _ in range(2):
+        assert client.get("/search", params={"reranking": "true"}).status_code == 200
+    assert client.get("/search", params={"reranking": "true"}).status_code == 429
+    assert client.get("/search", params={"reranking": "false"}).status_code == 429
+
+
+def test_rules_match_methods() -> None:
+    client = TestClient(create_app())
+    for _ in range(2):
+        assert client.post("/questions/").status_code == 200
+    assert client.post("/questions/").status_code == 429
+
+    # listing questions is charged against the default budget
+    assert client.get("/questions/").status_code == 200
+
+
+def test_default_rules_throttle_search_before_document_reads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("RATE_LIMIT_REQUESTS_PER_MINUTE", raising=False)
+    monkeypatch.delenv("RATE_LIMIT_RULES", raising=False)
+    redis_client = DummyRedis()
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, redis_client=redis_client, clock=lambda: redis_client.now / 1000)
+
+    @app.get("/v0/search")
+    def search() -> list[str]:
+        return []
+
+    @app.get("/v0/documents/{document_id}")
+    def get_document(document_id: str) -> dict[str, str]:
+        return {"id": document_id}
+
+    client = TestClient(app)
+    search_responses = [client.get("/v0/search").status_code for _ in range(30)]
+    document_responses = [client.get("/v0/documents/1").status_code for _ in range(30)]
+
+    assert 429 in search_responses
+    assert document_responses == [200] * 30
+
+
+def test_rules_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(
+        "RATE_LIMIT_RULES",
+        '[{"name": "search", "pattern": "/v0/search", "limit": 10, "query_costs": {"reranking": 3}}]',
+    )
+
+    rules = get_rules_from_env()
+
+    assert rules is not None
+    assert len(rules) == 1
+    assert rules[0].matches("GET", "/v0/search")
+    assert not rules[0].matches("GET", "/v0/search/more")
+    assert rules[0].query_costs == {"reranking": 3}
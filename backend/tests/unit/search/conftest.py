@@ -0,0 +1,32 @@
+from collections.abc import Callable
+
+import pytest
+
+from askpolis.core import Document, DocumentType, Page
+from askpolis.search import Embeddings, EmbeddingsCollection
+
+
+@pytest.fixture
+def collection() -> EmbeddingsCollection:
+    return EmbeddingsCollection(name="default", version="v1", description="test")
+
+
+@pytest.fixture
+def create_embeddings(collection: EmbeddingsCollection) -> Callable[..., Embeddings]:
+    """Factory of chunks of one page, stored in `collection` unless another collection is given."""
+    document = Document(name="Doc", document_type=DocumentType.ELECTION_PROGRAM)
+    page = Page(document_id=document.id, page_number=1, content="content", raw_content="raw content")
+
+    def create(chunk: str, embeddings_collection: EmbeddingsCollection | None = None) -> Embeddings:
+        return Embeddings(
+            collection=embeddings_collection or collection,
+            document=document,
+            page=page,
+            chunk=chunk,
+            chunk_id=0,
+            embedding=[0.0] * 1024,
+            sparse_embedding={},
+            chunk_metadata={},
+        )
+
+    return create
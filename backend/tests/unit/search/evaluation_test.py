@@ -0,0 +1,63 @@
+from unittest.mock import MagicMock
+
+import uuid_utils.compat as uuid
+
+from askpolis.search import SearchResult
+from askpolis.search.evaluation import (
+    DEFAULT_DATASET,
+    EvaluationQuery,
+    evaluate,
+    load_theses,
+    recall_at_k,
+    reciprocal_rank,
+)
+
+
+def create_result(page_id: uuid.UUID) -> SearchResult:
+    return SearchResult(
+        matching_text="text", chunk_id=uuid.uuid7(), document_id=uuid.uuid7(), page_id=page_id, score=1.0
+    )
+
+
+def test_load_theses_strips_html_from_positions() -> None:
+    theses = load_theses(DEFAULT_DATASET)
+
+    assert len(theses) == 20
+    assert theses[0].id == "question-0"
+    assert set(theses[0].positions) == {"spd", "cdu", "gruene", "fdp", "afd", "linke", "bsw"}
+    assert all("<a" not in position for thesis in theses for position in thesis.positions.values())
+
+
+def test_recall_at_k_counts_relevant_pages_within_k() -> None:
+    relevant = [uuid.uuid7(), uuid.uuid7()]
+    irrelevant = uuid.uuid7()
+
+    assert recall_at_k([relevant[0], irrelevant, relevant[1]], set(relevant), 2) == 0.5
+    assert recall_at_k([relevant[0], irrelevant, relevant[1]], set(relevant), 3) == 1.0
+    assert recall_at_k([irrelevant], set(), 3) == 0.0
+
+
+def test_reciprocal_rank_uses_first_relevant_page() -> None:
+    relevant = uuid.uuid7()
+
+    assert reciprocal_rank([uuid.uuid7(), relevant], {relevant}) == 0.5
+    assert reciprocal_rank([uuid.uuid7()], {relevant}) == 0.0
+
+
+def test_evaluate_judges_relevance_per_page() -> None:
+    relevant = uuid.uuid7()
+    other = uuid.uuid7()
+    search_service = MagicMock()
+    search_service.find_matching_texts.side_effect = [
+        [create_result(relevant), create_result(relevant), create_result(other)],
+        [create_result(other)],
+    ]
+    queries = [EvaluationQuery("first", {relevant}), EvaluationQuery("second", {relevant})]
+
+    result = evaluate(search_service, "collection", queries, 2, False, 500, 40)
+
+    assert result.queries == 2
+    assert result.recall_at_k == 0.5
+    assert result.mrr == 0.5
+    assert result.p95_ms >= result.p50_ms >= 0
+    search_service.find_matching_texts.assert_called_with("second", limit=2, use_reranker=False, indexes=["collection"])
@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import Generator
+from typing import cast
+
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from askpolis.search.inference_client import InferenceClient
+from askpolis.search.inference_server import DynamicBatcher, app, load_inference_models
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Generator[TestClient, None, None]:
+    monkeypatch.setenv("DISABLE_INFERENCE", "true")
+    monkeypatch.setenv("INFERENCE_MAX_WAIT_MS", "1")
+    with TestClient(app) as client:
+        yield client
+
+
+def test_concurrent_items_are_processed_in_batches() -> None:
+    batches: list[list[int]] = []
+
+    def process(items: list[int]) -> list[int]:
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    async def run() -> list[list[int]]:
+        batcher = DynamicBatcher("test", process, max_batch_size=3, max_wait_seconds=0.05)
+        results = await asyncio.gather(batcher.submit([1, 2]), batcher.submit([3]), batcher.submit([4]))
+        await batcher.close()
+        return list(results)
+
+    results = asyncio.run(run())
+
+    assert results == [[2, 4], [6], [8]]
+    assert batches == [[1, 2, 3], [4]]
+
+
+def test_errors_are_raised_to_all_submitters_of_a_batch() -> None:
+    def process(items: list[int]) -> list[int]:
+        raise ValueError("model failed")
+
+    async def run() -> None:
+        batcher = DynamicBatcher("test", process, max_batch_size=2, max_wait_seconds=0.01)
+        try:
+            with pytest.raises(ValueError):
+                await batcher.submit([1])
+            with pytest.raises(ValueError):
+                await batcher.submit([2])
+        finally:
+            await batcher.close()
+
+    asyncio.run(run())
+
+
+def test_missing_results_are_raised_to_all_submitters_of_a_batch() -> None:
+    def process(items: list[int]) -> list[int]:
+        return items[:1]
+
+    async def run() -> None:
+        batcher = DynamicBatcher("test", process, max_batch_size=2, max_wait_seconds=0.05)
+        try:
+            results = await asyncio.gather(batcher.submit([1]), batcher.submit([2]), return_exceptions=True)
+        finally:
+            await batcher.close()
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(run())
+
+
+def test_client_encodes_through_the_server(client: TestClient) -> None:
+    inference_client = InferenceClient("http://testserver", client=cast(httpx.Client, client))
+
+    encoded = inference_client.encode("text")
+    corpus = inference_client.encode_corpus(["a", "bb"], return_dense=False)
+
+    assert encoded["dense_vecs"].shape == (1024,)
+    # queries are encoded like by a local model and not as part of a corpus
+    assert encoded["lexical_weights"] == {"0": 1.0}
+    assert "dense_vecs" not in corpus
+    assert corpus["lexical_weights"] == [{"0": 1.0}, {"0": 2.0}]
+
+
+def test_client_reranks_through_the_server(client: TestClient) -> None:
+    inference_client = InferenceClient("http://testserver", client=cast(httpx.Client, client))
+
+    raw = inference_client.compute_score([("rente", "die rente"), ("rente", "pflege")], 16, 512, normalize=False)
+    normalized = inference_client.compute_score([("rente", "die rente")], 16, 512, normalize=True)
+
+    assert raw == [1.0, 0.0]
+    assert normalized == pytest.approx([1 / (1 + np.exp(-1.0))])
+
+
+def test_invalid_batch_settings_fall_back_to_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DISABLE_INFERENCE", "true")
+    monkeypatch.setenv("INFERENCE_MAX_BATCH_SIZE", "many")
+    monkeypatch.setenv("INFERENCE_MAX_WAIT_MS", "10ms")
+
+    models = load_inference_models()
+
+    assert models.max_batch_size == 32
+    assert models.max_wait_seconds == 0.01
@@ -0,0 +1,71 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from askpolis.search.onnx_models import (
+    BACKEND_ONNX_INT8,
+    BACKEND_TORCH,
+    OnnxEmbeddingModel,
+    OnnxReranker,
+    get_inference_backend,
+)
+
+
+def create_tokenizer(input_ids: list[list[int]], attention_mask: list[list[int]]) -> MagicMock:
+    tokenizer = MagicMock(cls_token_id=0, pad_token_id=1, eos_token_id=2, unk_token_id=3)
+    tokenizer.return_value = {"input_ids": np.array(input_ids), "attention_mask": np.array(attention_mask)}
+    return tokenizer
+
+
+def test_encode_corpus_computes_dense_and_lexical_weights_in_original_order() -> None:
+    # the second text is shorter, so it is tokenised first
+    tokenizer = create_tokenizer([[0, 7, 2, 1], [0, 5, 6, 5]], [[1, 1, 1, 0], [1, 1, 1, 1]])
+    session = MagicMock()
+    session.run.return_value = [
+        np.array([[1.0, 0.0], [0.0, 1.0]]),
+        np.array([[0.9, 0.4, 0.9, 0.9], [0.9, 0.2, 0.0, 0.7]]),
+    ]
+    model = OnnxEmbeddingModel(session, tokenizer, batch_size=2)
+
+    result = model.encode_corpus(["a longer text", "short"])
+
+    assert tokenizer.call_args.args[0] == ["short", "a longer text"]
+    np.testing.assert_array_equal(result["dense_vecs"][0], [0.0, 1.0])
+    np.testing.assert_array_equal(result["dense_vecs"][1], [1.0, 0.0])
+    assert result["lexical_weights"][0] == {"5": pytest.approx(0.7)}
+    assert result["lexical_weights"][1] == {"7": pytest.approx(0.4)}
+
+
+def test_encode_returns_single_vectors() -> None:
+    tokenizer = create_tokenizer([[0, 9, 2]], [[1, 1, 1]])
+    session = MagicMock()
+    session.run.return_value = [np.array([[0.6, 0.8]]), np.array([[0.1, 0.5, 0.1]])]
+
+    result = OnnxEmbeddingModel(session, tokenizer).encode("text", return_sparse=False)
+
+    np.testing.assert_array_almost_equal(result["dense_vecs"], [0.6, 0.8])
+    assert "lexical_weights" not in result
+
+
+def test_reranker_normalises_logits_in_batches() -> None:
+    tokenizer = create_tokenizer([[0, 1]], [[1, 1]])
+    session = MagicMock()
+    session.run.side_effect = [[np.array([0.0, 2.0])], [np.array([-2.0])]]
+    reranker = OnnxReranker(session, tokenizer)
+
+    scores = reranker.compute_score([("q", "a"), ("q", "b"), ("q", "c")], batch_size=2, max_length=16, normalize=True)
+
+    assert scores == pytest.approx([0.5, 1 / (1 + np.exp(-2.0)), 1 / (1 + np.exp(2.0))])
+    assert tokenizer.call_args.kwargs["truncation"] == "only_second"
+
+
+@pytest.mark.parametrize("value,expected", [(None, BACKEND_TORCH), ("ONNX-INT8", BACKEND_ONNX_INT8), ("tf", "torch")])
+def test_get_inference_backend(monkeypatch: pytest.MonkeyPatch, value: Any, expected: str) -> None:
+    if value is None:
+        monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    else:
+        monkeypatch.setenv("INFERENCE_BACKEND", value)
+
+    assert get_inference_backend() == expected
@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import ClauseElement
+
+from askpolis.search import EmbeddingsCollection, EmbeddingsRepository
+from askpolis.search.repositories import _select_similar_to
+
+query_vector = [0.5, -0.5] + [0.0] * 1022
+
+
+def to_sql(statement: ClauseElement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_collection_rejects_unknown_dense_index() -> None:
+    with pytest.raises(ValueError):
+        EmbeddingsCollection(name="test", version="v1", description="test", dense_index="int8")
+
+
+def test_vector_collection_is_searched_with_fp32_index() -> None:
+    collection = EmbeddingsCollection(name="test", version="v1", description="test")
+
+    sql = to_sql(_select_similar_to(collection, query_vector, 10))
+
+    assert "embeddings.dense_index = 'vector'" in sql
+    assert "ORDER BY embeddings.embedding <=>" in sql
+    assert "HALFVEC" not in sql
+
+
+def test_halfvec_collection_is_rescored_with_fp32_vectors() -> None:
+    collection = EmbeddingsCollection(name="test", version="v1", description="test", dense_index="halfvec")
+
+    sql = to_sql(_select_similar_to(collection, query_vector, 10))
+
+    assert "embeddings.dense_index = 'halfvec'" in sql
+    assert "ORDER BY CAST(embeddings.embedding AS HALFVEC(1024)) <=>" in sql
+    assert "LIMIT 20) ORDER BY embeddings.embedding <=>" in sql
+
+
+def test_binary_collection_is_searched_by_hamming_distance_of_quantised_query() -> None:
+    collection = EmbeddingsCollection(name="test", version="v1", description="test", dense_index="binary")
+
+    sql = to_sql(_select_similar_to(collection, query_vector, 10))
+
+    assert "embeddings.dense_index = 'binary'" in sql
+    quantised_query = "10" + "0" * 1022
+    assert f"CAST(binary_quantize(embeddings.embedding) AS BIT(1024)) <~> CAST('{quantised_query}' AS BIT(1024))" in sql
+    assert "LIMIT 100) ORDER BY embeddings.embedding <=>" in sql
+
+
+def test_prefix_collection_is_searched_by_leading_dimensions() -> None:
+    collection = EmbeddingsCollection(name="test", version="v1", description="test", dense_index="prefix-256")
+
+    sql = to_sql(_select_similar_to(collection, query_vector, 10))
+
+    assert "embeddings.dense_index = 'prefix-256'" in sql
+    assert "ORDER BY CAST(subvector(embeddings.embedding, 1, 256) AS VECTOR(256)) <=> '[0.5,-0.5,0.0" in sql
+    assert "LIMIT 100) ORDER BY embeddings.embedding <=>" in sql
+
+
+def test_rescore_factor_of_collection_overrides_default() -> None:
+    collection = EmbeddingsCollection(
+        name="test", version="v1", description="test", dense_index="prefix-512", rescore_factor=3
+    )
+
+    assert "LIMIT 30) ORDER BY embeddings.embedding <=>" in to_sql(_select_similar_to(collection, query_vector, 10))
+    with pytest.raises(ValueError):
+        EmbeddingsCollection(name="test", version="v1", description="test", rescore_factor=0)
+
+
+def test_ef_search_is_raised_for_candidates_of_compressed_index() -> None:
+    db = MagicMock()
+    db.execute.return_value.all.return_value = []
+    repository = EmbeddingsRepository(db)
+
+    repository.get_all_similar_to(EmbeddingsCollection(name="test", version="v1", description="test"), query_vector)
+    assert db.execute.call_count == 1
+
+    db.execute.reset_mock()
+    binary_collection = EmbeddingsCollection(name="test", version="v1", description="test", dense_index="binary")
+    repository.get_all_similar_to(binary_collection, query_vector, limit=200)
+    set_ef_search = db.execute.call_args_list[0].args[0]
+    assert "set_config('hnsw.ef_search'" in str(set_ef_search)
+    assert set_ef_search.compile().params == {"candidates": 1000}
+
+    db.execute.reset_mock()
+    repository.get_all_similar_to(binary_collection, {"1": 1.0})
+    assert db.execute.call_count == 1
@@ -0,0 +1,92 @@
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from askpolis.search import Embeddings, EmbeddingsCollection, RerankerService
+from askpolis.search.reranker_cache import RerankerScoreCache, get_reranker_score_cache
+from askpolis.search.reranker_service import RerankerSettings
+
+
+def test_scores_are_cached_by_normalised_query(create_embeddings: Callable[..., Embeddings]) -> None:
+    cache = RerankerScoreCache()
+    first = create_embeddings("first")
+    second = create_embeddings("second")
+    cache.set_many("model", "Wie steht die  Partei zur Rente?", [(first, 0.8)])
+
+    assert cache.get_many("model", "wie steht die partei zur rente? ", [second, first]) == {1: 0.8}
+    assert cache.get_many("model", "Was ist mit der Pflege?", [first]) == {}
+    assert cache.get_many("other-model", "Wie steht die Partei zur Rente?", [first]) == {}
+
+
+def test_least_recently_used_scores_are_evicted(create_embeddings: Callable[..., Embeddings]) -> None:
+    cache = RerankerScoreCache(max_entries=2)
+    first, second, third = create_embeddings("first"), create_embeddings("second"), create_embeddings("third")
+    cache.set_many("model", "query", [(first, 0.1), (second, 0.2)])
+    cache.get_many("model", "query", [first])
+    cache.set_many("model", "query", [(third, 0.3)])
+
+    assert cache.get_many("model", "query", [first, second, third]) == {0: 0.1, 2: 0.3}
+
+
+def test_scores_are_not_shared_between_collection_versions(create_embeddings: Callable[..., Embeddings]) -> None:
+    other_collection = EmbeddingsCollection(name="default", version="v2", description="test")
+    cache = RerankerScoreCache()
+    first = create_embeddings("first")
+    second = create_embeddings("first", other_collection)
+    second.id = first.id
+    cache.set_many("model", "query", [(first, 0.1)])
+
+    assert cache.get_many("model", "query", [first, second]) == {0: 0.1}
+
+
+def test_redis_tier_is_used_for_local_misses(create_embeddings: Callable[..., Embeddings]) -> None:
+    redis_client = MagicMock()
+    redis_client.mget.return_value = [b"0.5", None]
+    cache = RerankerScoreCache(redis_client=redis_client)
+    first, second = create_embeddings("first"), create_embeddings("second")
+
+    assert cache.get_many("model", "query", [first, second]) == {0: 0.5}
+    redis_client.mget.reset_mock()
+    assert cache.get_many("model", "query", [first]) == {0: 0.5}
+    redis_client.mget.assert_not_called()
+
+    cache.set_many("model", "query", [(second, 0.7)])
+    redis_client.pipeline.return_value.set.assert_called_once()
+    redis_client.pipeline.return_value.execute.assert_called_once()
+
+
+def test_redis_errors_are_cache_misses(create_embeddings: Callable[..., Embeddings]) -> None:
+    redis_client = MagicMock()
+    redis_client.mget.side_effect = ConnectionError("redis is down")
+    redis_client.pipeline.side_effect = ConnectionError("redis is down")
+    cache = RerankerScoreCache(redis_client=redis_client)
+    first = create_embeddings("first")
+
+    cache.set_many("model", "query", [(first, 0.5)])
+
+    assert cache.get_many("model", "query", [first, create_embeddings("second")]) == {0: 0.5}
+
+
+def test_reranker_only_scores_unseen_pairs(create_embeddings: Callable[..., Embeddings]) -> None:
+    reranker = MagicMock()
+    reranker.compute_score.side_effect = lambda pairs, **_: [float(len(passage)) for _, passage in pairs]
+    service = RerankerService(reranker, RerankerSettings(batch_size=4), RerankerScoreCache())
+    first, second = create_embeddings("a"), create_embeddings("bb")
+    service.rerank("query", [first], limit=1)
+
+    result = service.rerank("Query", [first, second], limit=2)
+
+    assert reranker.compute_score.call_args.args[0] == [("Query", "bb")]
+    assert [(e.chunk, score) for e, score in result] == [("bb", 2.0), ("a", 1.0)]
+
+
+def test_invalid_cache_size_falls_back_to_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RERANKER_CACHE_MAX_ENTRIES", "lots")
+    monkeypatch.delenv("RERANKER_CACHE_REDIS", raising=False)
+
+    assert get_reranker_score_cache() is not None
+
+    monkeypatch.setenv("RERANKER_CACHE_MAX_ENTRIES", "0")
+
+    assert get_reranker_score_cache() is None
@@ -0,0 +1,75 @@
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from askpolis.search import Embeddings, RerankerService
+from askpolis.search.reranker_service import FakeReranker, RerankerSettings, get_reranker_settings
+
+
+def score_by_length_reranker() -> MagicMock:
+    reranker = MagicMock()
+    reranker.compute_score.side_effect = lambda pairs, **_: [float(len(passage)) for _, passage in pairs]
+    return reranker
+
+
+def test_fake_reranker_ranks_by_query_words(create_embeddings: Callable[..., Embeddings]) -> None:
+    service = RerankerService(FakeReranker(), RerankerSettings(batch_size=2))
+    candidates = [create_embeddings("Nichts dazu"), create_embeddings("Die Rente steigt"), create_embeddings("Rente")]
+
+    result = service.rerank("Wie steigt die Rente?", candidates, limit=2)
+
+    assert [(e.chunk, score) for e, score in result] == [("Die Rente steigt", 0.75), ("Rente", 0.25)]
+
+
+def test_rerank_scores_batches_of_similar_length(create_embeddings: Callable[..., Embeddings]) -> None:
+    reranker = score_by_length_reranker()
+    service = RerankerService(reranker, RerankerSettings(batch_size=2, max_length=100))
+    candidates = [create_embeddings("x" * length) for length in [30, 1, 20, 2]]
+
+    result = service.rerank("query", candidates, limit=4)
+
+    batches = [[len(passage) for _, passage in call.args[0]] for call in reranker.compute_score.call_args_list]
+    assert batches == [[1, 2], [20, 30]]
+    assert [len(e.chunk) for e, _ in result] == [30, 20, 2, 1]
+    assert reranker.compute_score.call_args.kwargs == {"batch_size": 2, "max_length": 100, "normalize": True}
+
+
+def test_rerank_truncates_passages_at_word_boundary(create_embeddings: Callable[..., Embeddings]) -> None:
+    reranker = score_by_length_reranker()
+    service = RerankerService(reranker, RerankerSettings(batch_size=2, max_length=2))
+
+    service.rerank("query", [create_embeddings("abc defg hij"), create_embeddings("abc defghij")], limit=2)
+
+    assert reranker.compute_score.call_args.args[0] == [("query", "abc"), ("query", "abc defg")]
+
+
+def test_rerank_handles_single_score(create_embeddings: Callable[..., Embeddings]) -> None:
+    reranker = MagicMock()
+    reranker.compute_score.return_value = 0.5
+    service = RerankerService(reranker, RerankerSettings())
+
+    result = service.rerank("query", [create_embeddings("chunk")], limit=1)
+
+    assert result[0][1] == 0.5
+
+
+def test_rerank_stops_early_once_top_k_is_stable(create_embeddings: Callable[..., Embeddings]) -> None:
+    reranker = MagicMock()
+    # the first candidates score highest, so the top-k does not change after the first batch
+    reranker.compute_score.side_effect = lambda pairs, **_: [1.0 / int(passage) for _, passage in pairs]
+    service = RerankerService(reranker, RerankerSettings(batch_size=2, early_stop_patience=1))
+    candidates = [create_embeddings(str(i)) for i in range(1, 9)]
+
+    result = service.rerank("query", candidates, limit=2)
+
+    assert reranker.compute_score.call_count == 2
+    assert [e.chunk for e, _ in result] == ["1", "2"]
+
+
+def test_invalid_reranker_settings_fall_back_to_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RERANKER_BATCH_SIZE", "sixteen")
+    monkeypatch.setenv("RERANKER_MAX_LENGTH", "")
+    monkeypatch.setenv("RERANKER_EARLY_STOP_PATIENCE", "2")
+
+    assert get_reranker_settings() == RerankerSettings(batch_size=16, max_length=512, early_stop_patience=2)
@@ -0,0 +1,54 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock, MagicMock
+
+from askpolis.search import AsyncSearchService, Embeddings, EmbeddingsCollection, RerankerService
+from askpolis.search.embeddings_service import FakeModel
+
+
+def test_async_search_service_merges_dense_and_sparse_results(
+    collection: EmbeddingsCollection, create_embeddings: Callable[..., Embeddings]
+) -> None:
+    first = create_embeddings("first")
+    second = create_embeddings("second")
+
+    collections_repository = MagicMock()
+    collections_repository.get_most_recent_by_name = AsyncMock(return_value=collection)
+    embeddings_repository = MagicMock()
+    embeddings_repository.get_all_similar_to = AsyncMock(side_effect=[[(first, 0.9), (second, 0.8)], [(second, 0.7)]])
+    service = AsyncSearchService(collections_repository, embeddings_repository, FakeModel(), MagicMock())
+
+    results = asyncio.run(service.find_matching_texts("query", limit=2))
+
+    assert [r.matching_text for r in results] == ["second", "first"]
+    assert embeddings_repository.get_all_similar_to.await_count == 2
+
+
+def test_async_search_service_reranks_results(
+    collection: EmbeddingsCollection, create_embeddings: Callable[..., Embeddings]
+) -> None:
+    first = create_embeddings("first")
+
+    collections_repository = MagicMock()
+    collections_repository.get_most_recent_by_name = AsyncMock(return_value=collection)
+    embeddings_repository = MagicMock()
+    embeddings_repository.get_all_similar_to = AsyncMock(return_value=[(first, 0.9)])
+    reranker_service = MagicMock(spec=RerankerService)
+    reranker_service.rerank.return_value = [(first, 0.5)]
+    service = AsyncSearchService(collections_repository, embeddings_repository, FakeModel(), reranker_service)
+
+    results = asyncio.run(service.find_matching_texts("query", limit=1, use_reranker=True))
+
+    reranker_service.rerank.assert_called_once_with("query", [first], 1)
+    assert [r.score for r in results] == [0.5]
+
+
+def test_async_search_service_skips_unknown_indexes() -> None:
+    collections_repository = MagicMock()
+    collections_repository.get_most_recent_by_name = AsyncMock(return_value=None)
+    embeddings_repository = MagicMock()
+    embeddings_repository.get_all_similar_to = AsyncMock()
+    service = AsyncSearchService(collections_repository, embeddings_repository, FakeModel(), MagicMock())
+
+    assert asyncio.run(service.find_matching_texts("query", indexes=["unknown"])) == []
+    embeddings_repository.get_all_similar_to.assert_not_awaited()
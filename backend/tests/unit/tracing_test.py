@@ -0,0 +1,37 @@
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry import trace
+
+from askpolis import tracing
+from askpolis.tracing import traced
+
+
+def test_traced_records_span_and_duration(monkeypatch: pytest.MonkeyPatch) -> None:
+    tracer = MagicMock()
+    duration = MagicMock()
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+    monkeypatch.setattr(tracing, "_duration", duration)
+
+    with pytest.raises(ValueError), traced("search.dense", {"collection": "default"}):
+        raise ValueError("failed")
+
+    tracer.start_as_current_span.assert_called_once_with("askpolis.search.dense", attributes={"collection": "default"})
+    value, attributes = duration.record.call_args.args
+    assert value >= 0
+    assert attributes == {"operation": "search.dense"}
+
+
+def test_traced_can_be_switched_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    tracer = MagicMock()
+    duration = MagicMock()
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+    monkeypatch.setattr(tracing, "_duration", duration)
+    monkeypatch.setenv("TRACING_ENABLED", "false")
+
+    with traced("search.rerank") as span:
+        span.set_attribute("candidates", 10)
+
+    assert span is trace.INVALID_SPAN
+    tracer.start_as_current_span.assert_not_called()
+    duration.record.assert_not_called()